@@ -0,0 +1,88 @@
+import argparse
+import time
+
+import numpy as np
+import cv2
+
+import hand_detection as hd
+import graphical_user_interface as gui
+
+# Detection sizes (width, height) compared by the benchmark, all with the aspect ratio of the camera
+DETECTION_SIZES = [(1280, 720), (960, 540), (640, 360), (480, 270), (320, 180)]
+
+
+def load_frames(video_path: str, nb_frames: int) -> list[np.ndarray]:
+    '''Load the frames of a video at the camera size and in BGR, like the frames of the main loop. If no video is given, synthetic frames are created.'''
+    frames = []
+    if video_path is None:
+        rng = np.random.default_rng(0)
+        for _ in range(nb_frames):
+            frames.append(rng.integers(0, 256, (gui.HEIGHT_CAMERA, gui.WIDTH_CAMERA, 3), dtype=np.uint8))
+        return frames
+
+    cap = cv2.VideoCapture(video_path)
+    while len(frames) < nb_frames:
+        success, img = cap.read()
+        if not success:
+            break
+        frames.append(cv2.resize(img, (gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA)))
+    cap.release()
+    return frames
+
+
+def benchmark_detection(frames: list[np.ndarray], detection_size: tuple[int], nb_warmup: int) -> dict:
+    '''Measure the latency of HandDetector.process_image for a given detection size.
+
+    Parameters :
+        frames (list[np.ndarray]) : full size BGR frames
+        detection_size (tuple[int]) : size (width, height) of the image given to MediaPipe
+        nb_warmup (int) : number of frames processed before the measure
+
+    Returns :
+        results (dict) : median and 95th percentile of the latency (in ms), and ratio of frames with a hand
+    '''
+    # The tracking is disabled, so that MediaPipe runs on every frame
+    detector = hd.hand_detector.HandDetector(*detection_size, tracking=False)
+    for i in range(nb_warmup):
+        detector.img = frames[i % len(frames)]
+        detector.process_image()
+
+    latencies = np.empty(len(frames))
+    nb_detections = 0
+    for i, frame in enumerate(frames):
+        detector.img = frame
+        start = time.perf_counter()
+        detector.process_image()
+        latencies[i] = time.perf_counter() - start
+        if len(detector.landmarks) > 0:
+            nb_detections += 1
+
+    return {
+        "width": detection_size[0],
+        "height": detection_size[1],
+        "median_ms": 1000*float(np.median(latencies)),
+        "p95_ms": 1000*float(np.percentile(latencies, 95)),
+        "detection_rate": nb_detections / len(frames),
+    }
+
+
+def main():
+    '''This function compares the detection latency for several detection sizes, in order to choose the operating point of a machine.'''
+    parser = argparse.ArgumentParser(description="Benchmark of the hand detection latency against the detection size.")
+    parser.add_argument("--video", default=None, help="recorded video used as input (synthetic frames if not given)")
+    parser.add_argument("--frames", type=int, default=200, help="number of frames measured for each size")
+    parser.add_argument("--warmup", type=int, default=10, help="number of frames processed before the measure")
+    args = parser.parse_args()
+
+    frames = load_frames(args.video, args.frames)
+    if not frames:
+        raise ValueError("No frame could be read from {}".format(args.video))
+
+    print("{:>12} {:>12} {:>12} {:>12}".format("size", "median (ms)", "p95 (ms)", "detected"))
+    for detection_size in DETECTION_SIZES:
+        results = benchmark_detection(frames, detection_size, args.warmup)
+        print("{:>12} {:>12.2f} {:>12.2f} {:>11.0%}".format("{}x{}".format(results["width"], results["height"]), results["median_ms"], results["p95_ms"], results["detection_rate"]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+
+import cv2
+
+import capture
+import hand_detection as hd
+import graphical_user_interface as gui
+import utils.utils as utils
+from benchmarks import benchmark_detection as bd
+
+# Stages measured by the benchmark, in the order of the frame pipeline
+STAGES = ["conversions", "preparation", "detection", "hands", "grid", "draw_digit", "recognition"]
+# Sizes of the grid and lengths of the strokes (number of positions of the hand) measured
+GRID_SIZES = [4, 9]
+# Sizes of the frames for which the interface is measured, the interface being laid out for each one
+RESOLUTIONS = [(gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA), (640, 360)]
+STROKE_LENGTHS = [10, 50, 200]
+# Size (in bytes) from which an allocation is counted as an image : a BGR frame of 640x360
+MIN_IMAGE_BYTES = 640*360*3
+# Path of the model used by the digit recognition
+MODEL_PATH = "digit_recognition/model_digit_recognition.h5"
+
+
+def measure(function, setup=None, nb_runs: int = 100, nb_warmup: int = 5) -> dict:
+    '''This function measures a stage in isolation.
+
+    Parameters :
+        function (Callable) : stage measured, called with the result of setup (or without argument if there is no setup)
+        setup (Callable) : function preparing the input of each run, not measured
+        nb_runs (int) : number of runs measured
+        nb_warmup (int) : number of runs done before the measure
+
+    Returns :
+        results (dict) : median, 95th percentile and mean of the duration (in ms), peak of memory allocated by a run (in kB) and number of blocks it keeps alive
+    '''
+    def run() -> float:
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        function(*args)
+        return time.perf_counter() - start
+
+    for _ in range(nb_warmup):
+        run()
+    durations = np.array([run() for _ in range(nb_runs)])
+
+    # The allocations are measured on a separate run, tracemalloc slows down the code
+    args = (setup(),) if setup is not None else ()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    current, _ = tracemalloc.get_traced_memory()
+    function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    # Blocks still alive after the run : memory kept from one frame to another
+    nb_blocks = len(tracemalloc.take_snapshot().traces)
+    tracemalloc.stop()
+
+    return {
+        "median_ms": 1000*float(np.median(durations)),
+        "p95_ms": 1000*float(np.percentile(durations, 95)),
+        "mean_ms": 1000*float(np.mean(durations)),
+        "peak_alloc_kb": (peak - current) / 1024,
+        "retained_blocks": nb_blocks,
+        "nb_runs": nb_runs,
+    }
+
+
+@contextlib.contextmanager
+def grid_size(size: int):
+    '''This context manager changes the size of the sudoku (constants of the GUI) while a grid is measured.'''
+    saved = gui.constants.MAIN_GRID_SIZE
+    gui.constants.MAIN_GRID_SIZE = size
+    try:
+        yield
+    finally:
+        gui.constants.MAIN_GRID_SIZE = saved
+
+
+def create_layout(width: int = gui.WIDTH_CAMERA, height: int = gui.HEIGHT_CAMERA) -> gui.layout.Layout:
+    '''This function computes the geometry of the interface for frames of the given size.'''
+    return gui.layout.Layout(width, height)
+
+
+def create_grid(size: int, width: int = gui.WIDTH_CAMERA, height: int = gui.HEIGHT_CAMERA) -> gui.interface_grid.Grid:
+    '''This function creates a grid of the given size, with its initial digits, laid out for frames of the given size.'''
+    list_digits = gui.LIST_DIGITS_INITIAL_4 if size == 4 else gui.LIST_DIGITS_INITIAL_9
+    return gui.interface_grid.Grid(create_layout(width, height), list_digits)
+
+
+def stroke_positions(nb_positions: int) -> list[tuple[int]]:
+    '''This function returns the positions of the hand drawing a circle in the digit interface.'''
+    x_min, x_max, y_min, y_max = create_layout().panel_coordinates
+    angles = np.linspace(0, 2*np.pi, nb_positions, endpoint=False)
+    xs = (x_min + x_max)/2 + (x_max - x_min)/3*np.cos(angles)
+    ys = (y_min + y_max)/2 + (y_max - y_min)/3*np.sin(angles)
+    return [(int(x), int(y)) for x, y in zip(xs, ys)]
+
+
+def count_images(function) -> int:
+    '''This function counts the images allocated by a call, with tracemalloc : the allocations of at least the size of the smallest frame measured.
+    The function must return the images it allocates, so that they are still alive when they are counted.'''
+    tracemalloc.start()
+    images = function()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del images
+    return sum(1 for trace in snapshot.traces if trace.size >= MIN_IMAGE_BYTES)
+
+
+def draw_stroke(interface: gui.interface_digit.InterfaceDigit, positions: list[tuple[int]]) -> None:
+    '''This function gives the positions of a stroke to the digit interface, without drawing on the screen.'''
+    for position in positions:
+        interface.add_to_stroke(position)
+
+
+def benchmark_conversions(frames: list[np.ndarray], nb_runs: int) -> list[dict]:
+    '''This function measures the color conversions of utils.'''
+    frame = frames[0]
+    return [
+        {"stage": "conversions", "case": "convert_to_RGB", **measure(lambda: utils.convert_to_RGB(frame), nb_runs=nb_runs)},
+        {"stage": "conversions", "case": "convert_to_BGR", **measure(lambda: utils.convert_to_BGR(frame), nb_runs=nb_runs)},
+    ]
+
+
+def benchmark_preparation(frames: list[np.ndarray], nb_runs: int) -> list[dict]:
+    '''This function compares the preparation of a frame by the main loop before (flip, resize, RGB, and BGR for the display)
+    and with FramePreparation, with the number of images allocated per frame.'''
+    results = []
+    for width, height in [(gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA), (640, 480)]:
+        frame = cv2.resize(frames[0], (width, height))
+
+        # Each OpenCV call without dst allocates a new image : the images are returned, to be counted while they are alive
+        def legacy() -> tuple[np.ndarray]:
+            flipped = cv2.flip(frame, 1)
+            resized = cv2.resize(flipped, (gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA))
+            rgb = utils.convert_to_RGB(resized)
+            return flipped, resized, rgb, utils.convert_to_BGR(rgb)
+
+        preparation = capture.frame_preparation.FramePreparation(gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA)
+        result = measure(lambda: preparation.prepare(frame), nb_runs=nb_runs)
+        # The buffers are only allocated with the first frames
+        allocations = preparation.nb_allocations
+        preparation.prepare(frame)
+        source = "source {}x{}".format(width, height)
+        results.append({"stage": "preparation", "case": "flip, resize, RGB, BGR ({})".format(source), **measure(legacy, nb_runs=nb_runs), "allocations_per_frame": count_images(legacy)})
+        results.append({"stage": "preparation", "case": "FramePreparation ({})".format(source), **result, "allocations_per_frame": preparation.nb_allocations - allocations})
+    return results
+
+
+def benchmark_detection(frames: list[np.ndarray], nb_runs: int) -> list[dict]:
+    '''This function measures HandDetector.process_image, with and without the tracking between two detections.'''
+    results = []
+    for tracking in [False, True]:
+        detector = hd.hand_detector.HandDetector(tracking=tracking)
+        frame_index = itertools.count()
+
+        def setup() -> None:
+            detector.img = frames[next(frame_index) % len(frames)]
+
+        results.append({"stage": "detection", "case": "process_image (tracking {})".format("on" if tracking else "off"), **measure(lambda _: detector.process_image(), setup, nb_runs=nb_runs)})
+    return results
+
+
+def benchmark_hands(frames: list[np.ndarray], nb_runs: int) -> list[dict]:
+    '''This function measures the computations on the hands (positions, barycenters, fingers), for one and two hands.'''
+    results = []
+    rng = np.random.default_rng(0)
+    for nb_hands in [1, 2]:
+        hands = hd.hand_properties.Hands()
+        landmarks = rng.random((nb_hands, hd.NB_LANDMARKS, 2), dtype=np.float32)
+
+        def compute() -> None:
+            hands.update(landmarks)
+            hands.find_positions(frames[0])
+            hands.calculate_barycenters()
+            hands.fingers_up()
+
+        results.append({"stage": "hands", "case": "Hands ({} hand{})".format(nb_hands, "s" if nb_hands > 1 else ""), **measure(compute, nb_runs=nb_runs)})
+    return results
+
+
+def benchmark_grid(frames: list[np.ndarray], nb_runs: int) -> list[dict]:
+    '''This function measures Grid.draw_grid for each size of grid and each resolution : when nothing has changed, and when a cell is selected
+    (its background, the lines crossing it and its digit are drawn again).'''
+    results = []
+    for size, (width, height) in itertools.product(GRID_SIZES, RESOLUTIONS):
+        with grid_size(size):
+            grid = create_grid(size, width, height)
+            frame = cv2.resize(frames[0], (width, height))
+            resolution = "" if (width, height) == RESOLUTIONS[0] else " ({}x{})".format(width, height)
+            results.append({"stage": "grid", "case": "draw_grid {0}x{0}{1}".format(size, resolution), **measure(grid.draw_grid, frame.copy, nb_runs=nb_runs)})
+
+            def select_cell() -> np.ndarray:
+                cell = grid.cells[size // 2][size // 2]
+                cell.is_active = not cell.is_active
+                return frame.copy()
+            results.append({"stage": "grid", "case": "draw_grid {0}x{0}{1} cell selected".format(size, resolution), **measure(grid.draw_grid, select_cell, nb_runs=nb_runs)})
+    return results
+
+
+def benchmark_draw_digit(frames: list[np.ndarray], nb_runs: int) -> list[dict]:
+    '''This function measures InterfaceDigit.draw_digit for one new position of the hand, after strokes of several lengths.'''
+    results = []
+    for stroke_length in STROKE_LENGTHS:
+        positions = stroke_positions(stroke_length + 1)
+
+        def setup() -> tuple:
+            interface = gui.interface_digit.InterfaceDigit(create_layout())
+            interface.initialize_interface()
+            interface.is_drawing = True
+            draw_stroke(interface, positions[:-1])
+            return interface, frames[0].copy()
+
+        def draw(state: tuple) -> None:
+            interface, img = state
+            interface.draw_digit(img, positions[-1])
+
+        results.append({"stage": "draw_digit", "case": "draw_digit after {} positions".format(stroke_length), **measure(draw, setup, nb_runs=nb_runs)})
+        results.append({"stage": "draw_digit", "case": "rasterize_digit after {} positions".format(stroke_length), **measure(lambda state: state[0].rasterize_digit(), setup, nb_runs=nb_runs)})
+    return results
+
+
+def benchmark_recognition(frames: list[np.ndarray], nb_runs: int) -> list[dict]:
+    '''This function measures main_digit_recognition on a drawn digit. It is skipped if the model has not been trained.'''
+    if not os.path.exists(MODEL_PATH):
+        print("recognition skipped : {} not found (run digit_recognition/model.py first)".format(MODEL_PATH))
+        return []
+    from digit_recognition import main_digit_recognition as mdr
+    from digit_recognition import model_registry as mr
+
+    interface = gui.interface_digit.InterfaceDigit(create_layout())
+    interface.initialize_interface()
+    draw_stroke(interface, stroke_positions(50))
+    image = interface.rasterize_digit()
+    # The load of the model (with its warm-up) is measured apart : it is done once per process by the registry
+    results = [{"stage": "recognition", "case": "load and warm-up of the model", **measure(lambda state: mr.MODELS.get_model("main"), mr.MODELS.clear, nb_runs=3, nb_warmup=0)}]
+    results.append({"stage": "recognition", "case": "main_digit_recognition", **measure(lambda: mdr.main_digit_recognition(image, "main"), nb_runs=max(nb_runs // 10, 5), nb_warmup=1)})
+    return results
+
+
+def get_commit() -> str:
+    '''This function returns the current commit, to compare the results between commits.'''
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list[dict], reference_path: str) -> None:
+    '''This function prints the ratio between the median durations of the results and of a previous run.'''
+    with open(reference_path) as file:
+        reference = {(result["stage"], result["case"]): result for result in json.load(file)["results"]}
+    print("\nComparison with {} :".format(reference_path))
+    for result in results:
+        previous = reference.get((result["stage"], result["case"]))
+        if previous is not None and previous["median_ms"] > 0:
+            print("{:<45} {:>8.2f} ms -> {:>8.2f} ms  (x{:.2f})".format(result["case"], previous["median_ms"], result["median_ms"], result["median_ms"] / previous["median_ms"]))
+
+
+def main():
+    '''This function measures each stage of the frame pipeline in isolation, and writes the results in JSON.'''
+    parser = argparse.ArgumentParser(description="Benchmark of each stage of the frame pipeline.")
+    parser.add_argument("--video", default=None, help="recorded video used as input (synthetic frames if not given)")
+    parser.add_argument("--frames", type=int, default=30, help="number of frames loaded")
+    parser.add_argument("--runs", type=int, default=100, help="number of runs measured for each case")
+    parser.add_argument("--stages", nargs="+", default=STAGES, choices=STAGES, help="stages measured")
+    parser.add_argument("--output", default=None, help="JSON file in which the results are written")
+    parser.add_argument("--compare", default=None, help="JSON file of a previous run to compare with")
+    args = parser.parse_args()
+
+    frames = bd.load_frames(args.video, args.frames)
+    if not frames:
+        raise ValueError("No frame could be read from {}".format(args.video))
+
+    benchmarks = {
+        "conversions": benchmark_conversions,
+        "preparation": benchmark_preparation,
+        "detection": benchmark_detection,
+        "hands": benchmark_hands,
+        "grid": benchmark_grid,
+        "draw_digit": benchmark_draw_digit,
+        "recognition": benchmark_recognition,
+    }
+    results = []
+    print("{:<45} {:>12} {:>12} {:>14}".format("case", "median (ms)", "p95 (ms)", "alloc (kB)"))
+    for stage in args.stages:
+        for result in benchmarks[stage](frames, args.runs):
+            line = "{:<45} {:>12.3f} {:>12.3f} {:>14.1f}".format(result["case"], result["median_ms"], result["p95_ms"], result["peak_alloc_kb"])
+            if "allocations_per_frame" in result:
+                line += "   ({} images allocated per frame)".format(result["allocations_per_frame"])
+            print(line)
+            results.append(result)
+
+    if args.output is not None:
+        with open(args.output, "w") as file:
+            json.dump({"commit": get_commit(), "python": platform.python_version(), "numpy": np.__version__, "results": results}, file, indent=2)
+
+    if args.compare is not None:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
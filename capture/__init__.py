@@ -0,0 +1,2 @@
+from capture import camera, frame_sources, frame_preparation, constants
+from capture.constants import *
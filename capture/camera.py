@@ -0,0 +1,125 @@
+import threading
+import time
+
+import numpy as np
+import cv2
+
+from capture import constants
+
+
+class ThreadedCamera():
+    '''This class reads the frames of a camera on a background thread, and only keeps the newest one ("latest wins").
+    The main loop never waits for the camera to decode a frame : it takes the last captured frame, and the frames
+    captured while the main loop was busy are counted as dropped.
+
+    Attributes :
+        camera_number (int) : number of the camera
+        width (int) : width asked to the camera
+        height (int) : height asked to the camera
+        fps (int) : frame rate asked to the camera
+        buffer_size (int) : number of frames kept in the driver buffer
+        fourcc (str) : format asked to the camera
+        capture (cv2.VideoCapture) : object used to read the camera
+        frame (np.ndarray) : last frame captured
+        frame_id (int) : number of the last frame captured
+        last_read_id (int) : number of the last frame given to the main loop
+        timestamp (float) : time at which the last frame was captured
+        nb_captured (int) : number of frames captured since the start
+        nb_dropped (int) : number of frames captured but never given to the main loop
+        frame_age (float) : time (in seconds) between the capture and the reading of the last frame read
+        is_running (bool) : True if the capture thread is running, False otherwise
+        condition (threading.Condition) : condition used to share the frame between the two threads
+        thread (threading.Thread) : capture thread
+
+    Methods :
+        configure : configure the camera for a low latency
+        start : start the capture thread
+        update : loop of the capture thread
+        read : return the newest frame
+        get_stats : return the statistics of the capture
+        release : stop the capture thread and release the camera
+    '''
+
+    def __init__(self, camera_number: int, width: int, height: int, fps: int = constants.CAPTURE_FPS, buffer_size: int = constants.CAPTURE_BUFFER_SIZE, fourcc: str = constants.CAPTURE_FOURCC):
+        self.camera_number = camera_number
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.buffer_size = buffer_size
+        self.fourcc = fourcc
+        self.capture = cv2.VideoCapture(camera_number)
+        self.frame = None
+        self.frame_id = 0
+        self.last_read_id = 0
+        self.timestamp = 0.0
+        self.nb_captured = 0
+        self.nb_dropped = 0
+        self.frame_age = 0.0
+        self.is_running = False
+        self.condition = threading.Condition()
+        self.thread = None
+        self.configure()
+
+    def configure(self) -> None:
+        '''Configure the camera for a low latency : small buffer, compressed format and requested frame rate'''
+        # The fourcc must be set before the size, otherwise some drivers ignore it
+        self.capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*self.fourcc))
+        self.capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self.capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        self.capture.set(cv2.CAP_PROP_FPS, self.fps)
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, self.buffer_size)
+
+    def start(self) -> 'ThreadedCamera':
+        '''Start the capture thread'''
+        if not self.is_running:
+            self.is_running = True
+            self.thread = threading.Thread(target=self.update, name="ThreadedCamera", daemon=True)
+            self.thread.start()
+        return self
+
+    def update(self) -> None:
+        '''Loop of the capture thread : read the camera and replace the last frame by the new one'''
+        while self.is_running:
+            success, frame = self.capture.read()
+            timestamp = time.perf_counter()
+            with self.condition:
+                if not success:
+                    # The camera is not available anymore, we wake up the main loop so that it can stop
+                    self.is_running = False
+                    self.condition.notify_all()
+                    break
+                # The previous frame has never been read : it is dropped
+                if self.last_read_id < self.frame_id:
+                    self.nb_dropped += 1
+                self.frame = frame
+                self.timestamp = timestamp
+                self.frame_id += 1
+                self.nb_captured += 1
+                self.condition.notify_all()
+
+    def read(self, timeout: float = constants.CAPTURE_READ_TIMEOUT) -> tuple[bool, np.ndarray]:
+        '''Return the newest frame. We only wait if the last frame has already been read, so that the same frame is never processed twice.
+        We wait as long as the capture thread runs : a camera slow to open or a short stall does not end the game, only a stopped camera does.
+        '''
+        with self.condition:
+            # The timeout only checks again that the thread runs (release does not wake the main loop up)
+            while self.frame_id == self.last_read_id and self.is_running:
+                self.condition.wait(timeout)
+            if self.frame is None or self.frame_id == self.last_read_id:
+                return False, None
+            self.last_read_id = self.frame_id
+            self.frame_age = time.perf_counter() - self.timestamp
+            return True, self.frame
+
+    def get_stats(self) -> dict:
+        '''Return the statistics of the capture : frames captured, frames dropped and age of the last frame read (in ms)'''
+        with self.condition:
+            return {"captured": self.nb_captured, "dropped": self.nb_dropped, "age_ms": 1000*self.frame_age}
+
+    def release(self) -> None:
+        '''Stop the capture thread and release the camera'''
+        self.is_running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        self.capture.release()
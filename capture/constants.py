@@ -0,0 +1,31 @@
+#######################################
+#  GENERAL PARAMETERS OF THE CAPTURE  #
+#######################################
+
+# LOW LATENCY SETTINGS
+######################
+
+# Number of frames kept in the driver buffer (1 = always the freshest frame)
+CAPTURE_BUFFER_SIZE = 1
+# Compressed format asked to the camera, much cheaper on the USB bus than raw YUYV
+CAPTURE_FOURCC = "MJPG"
+# Frame rate requested to the camera
+CAPTURE_FPS = 30
+
+# THREAD
+########
+
+# Time (in seconds) after which the main loop, waiting for a new frame, checks again that the capture thread still runs
+CAPTURE_READ_TIMEOUT = 1.0
+
+# RECORDED SOURCES
+##################
+
+# Extensions of the images read in a directory
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# FRAME PREPARATION
+###################
+
+# Number of buffers in which the frames are prepared, used in turn (the previous frame stays valid while the next one is prepared)
+FRAME_POOL_SIZE = 2
@@ -0,0 +1,68 @@
+import numpy as np
+import cv2
+
+from capture import constants
+
+
+class FramePreparation():
+    '''This class prepares the frames given by the source for the main loop : resize to the size of the interface and horizontal flip.
+    The frames are written into a small pool of preallocated buffers with the dst outputs of OpenCV, so nothing is allocated per frame.
+    The frames stay in BGR, the color space of the sources and of the display : only the small image given to MediaPipe is converted.
+
+    Attributes :
+        width (int) : width of the prepared frames
+        height (int) : height of the prepared frames
+        flip (bool) : True to flip the frames horizontally (mirror)
+        pool (list[np.ndarray]) : buffers in which the frames are prepared, used in turn
+        index (int) : index of the next buffer of the pool
+        resized (np.ndarray) : buffer of the resized frame, only used when the source does not give the right size
+        nb_allocations (int) : number of buffers allocated since the start
+
+    Methods :
+        prepare : return the frame resized and flipped, in a buffer of the pool
+        get_buffer : return a buffer of the given shape, allocated only if needed
+        get_stats : return the statistics of the preparation
+    '''
+
+    def __init__(self, width: int, height: int, flip: bool = True, pool_size: int = constants.FRAME_POOL_SIZE):
+        self.width = width
+        self.height = height
+        self.flip = flip
+        self.pool = [None]*pool_size
+        self.index = 0
+        self.resized = None
+        self.nb_allocations = 0
+
+    def prepare(self, frame: np.ndarray) -> np.ndarray:
+        '''Return the frame resized and flipped, in the next buffer of the pool.
+        The buffer is not modified again before pool_size frames : the source frame and the previous frames are never overwritten.
+        '''
+        shape = (self.height, self.width, frame.shape[2])
+        self.pool[self.index] = output = self.get_buffer(self.pool[self.index], shape)
+        self.index = (self.index + 1) % len(self.pool)
+
+        # The resize is skipped when the source already gives the right size
+        if frame.shape != shape:
+            if not self.flip:
+                cv2.resize(frame, (self.width, self.height), dst=output)
+                return output
+            self.resized = self.get_buffer(self.resized, shape)
+            cv2.resize(frame, (self.width, self.height), dst=self.resized)
+            frame = self.resized
+
+        if self.flip:
+            cv2.flip(frame, 1, dst=output)  # 1 for horizontal flip
+        else:
+            np.copyto(output, frame)
+        return output
+
+    def get_buffer(self, buffer: np.ndarray, shape: tuple[int]) -> np.ndarray:
+        '''Return the buffer if it has the given shape, a new buffer otherwise'''
+        if buffer is None or buffer.shape != shape:
+            buffer = np.empty(shape, dtype=np.uint8)
+            self.nb_allocations += 1
+        return buffer
+
+    def get_stats(self) -> dict:
+        '''Return the statistics of the preparation : number of buffers allocated since the start'''
+        return {"allocations": self.nb_allocations}
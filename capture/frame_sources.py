@@ -0,0 +1,177 @@
+import abc
+import os
+import time
+
+import numpy as np
+import cv2
+
+from capture import constants
+from capture import camera
+
+
+class FrameSource(abc.ABC):
+    '''This class is the common interface of the recorded frame sources. They are read synchronously, frame after frame,
+    so that a recorded session always gives the same frames, whatever the speed of the main loop.
+
+    Attributes :
+        nb_captured (int) : number of frames read since the start
+        frame_age (float) : time (in seconds) spent to read the last frame
+
+    Methods :
+        start : start the source
+        read : return the next frame
+        read_frame : read the next frame (implemented by each source)
+        get_stats : return the statistics of the source
+        release : release the source
+    '''
+
+    def __init__(self):
+        self.nb_captured = 0
+        self.frame_age = 0.0
+
+    def start(self) -> 'FrameSource':
+        '''Start the source'''
+        return self
+
+    def read(self) -> tuple[bool, np.ndarray]:
+        '''Return the next frame, (False, None) at the end of the source'''
+        start = time.perf_counter()
+        success, frame = self.read_frame()
+        self.frame_age = time.perf_counter() - start
+        if success:
+            self.nb_captured += 1
+        return success, frame
+
+    @abc.abstractmethod
+    def read_frame(self) -> tuple[bool, np.ndarray]:
+        '''Read the next frame'''
+
+    def get_stats(self) -> dict:
+        '''Return the statistics of the source : frames read, frames dropped (always 0) and time spent to read the last frame (in ms)'''
+        return {"captured": self.nb_captured, "dropped": 0, "age_ms": 1000*self.frame_age}
+
+    def release(self) -> None:
+        '''Release the source'''
+        pass
+
+
+class VideoFileSource(FrameSource):
+    '''This class reads the frames of a video file.
+
+    Attributes :
+        path (str) : path of the video file
+        capture (cv2.VideoCapture) : object used to read the video
+    '''
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise ValueError("The video {} cannot be opened".format(path))
+
+    def read_frame(self) -> tuple[bool, np.ndarray]:
+        '''Read the next frame of the video'''
+        return self.capture.read()
+
+    def release(self) -> None:
+        '''Release the video'''
+        self.capture.release()
+
+
+class ImageSequenceSource(FrameSource):
+    '''This class reads the images of a directory, in the alphabetical order of their names.
+
+    Attributes :
+        directory (str) : path of the directory
+        paths (list[str]) : paths of the images
+        index (int) : index of the next image
+    '''
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.paths = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.lower().endswith(constants.IMAGE_EXTENSIONS))
+        if not self.paths:
+            raise ValueError("No image found in the directory {}".format(directory))
+        self.index = 0
+
+    def read_frame(self) -> tuple[bool, np.ndarray]:
+        '''Read the next image of the directory'''
+        if self.index >= len(self.paths):
+            return False, None
+        frame = cv2.imread(self.paths[self.index])
+        self.index += 1
+        return frame is not None, frame
+
+
+class NpyStackSource(FrameSource):
+    '''This class reads the frames of a .npy stack of BGR images, of shape (nb_frames, height, width, 3).
+    The file is memory mapped : the frames are only read from the disk when they are used.
+
+    Attributes :
+        path (str) : path of the .npy file
+        frames (np.ndarray) : memory mapped stack of frames
+        index (int) : index of the next frame
+    '''
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.frames = np.load(path, mmap_mode="r")
+        if self.frames.ndim != 4 or self.frames.shape[3] != 3:
+            raise ValueError("The stack {} must have the shape (nb_frames, height, width, 3), not {}".format(path, self.frames.shape))
+        self.index = 0
+
+    def read_frame(self) -> tuple[bool, np.ndarray]:
+        '''Read the next frame of the stack'''
+        if self.index >= len(self.frames):
+            return False, None
+        frame = self.frames[self.index]
+        self.index += 1
+        return True, frame
+
+
+class BlankSource(FrameSource):
+    '''This class gives black frames, for example when a landmark trace is replayed without its video.
+    The same frame is reused : it must not be modified by the main loop.
+
+    Attributes :
+        frame (np.ndarray) : black frame
+        nb_frames (int) : number of frames given
+        index (int) : index of the next frame
+    '''
+
+    def __init__(self, width: int, height: int, nb_frames: int):
+        super().__init__()
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self.nb_frames = nb_frames
+        self.index = 0
+
+    def read_frame(self) -> tuple[bool, np.ndarray]:
+        '''Give the black frame'''
+        if self.index >= self.nb_frames:
+            return False, None
+        self.index += 1
+        return True, self.frame
+
+
+def open_source(source, width: int, height: int):
+    '''This function opens the frame source described by source.
+
+    Parameters :
+        source (int or str) : number of a camera, directory of images, .npy stack or video file
+        width (int) : width asked to the camera
+        height (int) : height asked to the camera
+
+    Returns :
+        frame_source (ThreadedCamera or FrameSource) : source of frames, not started
+    '''
+    if isinstance(source, int) or str(source).isdigit():
+        return camera.ThreadedCamera(int(source), width, height)
+    if os.path.isdir(source):
+        return ImageSequenceSource(source)
+    if source.lower().endswith(".npy"):
+        return NpyStackSource(source)
+    return VideoFileSource(source)
+
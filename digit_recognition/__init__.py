@@ -1 +1,2 @@
-from digit_recognition import model, main_digit_recognition
\ No newline at end of file
+from digit_recognition import model, main_digit_recognition, model_registry, constants
+from digit_recognition.constants import *
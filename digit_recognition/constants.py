@@ -0,0 +1,26 @@
+#################################################
+#  GENERAL PARAMETERS OF THE DIGIT RECOGNITION  #
+#################################################
+
+# MODELS
+########
+
+# Path of the model of each method
+MODEL_PATHS = {
+    "main": 'digit_recognition/model_digit_recognition.h5',
+    "Canny": 'digit_recognition/model_Canny.h5',
+    "Sobel": 'digit_recognition/model_Sobel.h5',
+    "Laplacian": 'digit_recognition/model_Laplacian.h5',
+}
+
+# MODEL REGISTRY
+################
+
+# Number of models kept loaded in a process, the least recently used removed first
+MODEL_REGISTRY_SIZE = 2
+# Number of threads used by TensorFlow inside an operation and between operations (0 for the default of TensorFlow, one per core)
+# A single digit is small : more threads would only compete with the video loop
+MODEL_INTRA_OP_THREADS = 2
+MODEL_INTER_OP_THREADS = 1
+# Number of inference durations kept for the metrics
+MODEL_INFERENCE_WINDOW = 100
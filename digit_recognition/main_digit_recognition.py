@@ -1,23 +1,24 @@
 import numpy as np
 import cv2
-from tensorflow.keras.models import load_model
 
 from digit_recognition import model_edges as me
+from digit_recognition import model_registry as mr
 import graphical_user_interface as gui
 
-def main_digit_recognition(img : np.ndarray, method : str = "main") -> int:
+def main_digit_recognition(img : np.ndarray, method : str = "main", model = None) -> int:
     """This function is the main function of the digit recognition.
     
     Parameters :
         img (np.ndarray) : image of the digit
+        method (str) : model used, key of digit_recognition.constants.MODEL_PATHS
+        model (keras.Model) : model already loaded, taken from the registry of the process if None (loaded only the first time)
         
     Returns :
         digit (int) : The recognized digit
     """
     if method == "main":
-        model_used = load_model('digit_recognition/model_digit_recognition.h5') 
-        # Resize the image to 28x28 pixels
-        img_resized = cv2.resize(img, (28, 28))
+        # Resize the image to 28x28 pixels, only if it is not already prepared at this size (a larger image is averaged, not squashed)
+        img_resized = img if img.shape[:2] == (28, 28) else cv2.resize(img, (28, 28), interpolation=cv2.INTER_AREA)
 
         # Check if the image has multiple channels (e.g., BGR)
         if len(img_resized.shape) == 3 and img_resized.shape[2] == 3:
@@ -31,17 +32,10 @@ def main_digit_recognition(img : np.ndarray, method : str = "main") -> int:
         # Add batch dimension
         img_array = np.expand_dims(img_array, axis=0)
 
-        # Make the prediction
-        prediction = model_used.predict(img_array)
+        # Make the prediction (with the model kept loaded by the registry)
+        prediction = mr.MODELS.predict(method, img_array, model)
     
     else:
-        if method == "Canny":
-            model_used = load_model('digit_recognition/model_Canny.h5')
-        elif method == "Sobel":
-            model_used = load_model('digit_recognition/model_Sobel.h5')
-        elif method == "Laplacian":
-            model_used = load_model('digit_recognition/model_Laplacian.h5')
-
         # Resize the image to 28x28 pixels
         img_resized = cv2.resize(img, (28, 28))
 
@@ -57,8 +51,8 @@ def main_digit_recognition(img : np.ndarray, method : str = "main") -> int:
         # Add batch dimension
         img_array = np.expand_dims(img_normalized, axis=0)
 
-        # Make the prediction
-        prediction = model_used.predict(img_array)
+        # Make the prediction (with the model kept loaded by the registry)
+        prediction = mr.MODELS.predict(method, img_array, model)
 
     # Get the index of the predicted class (the recognized digit)
     digit = np.argmax(prediction)
@@ -0,0 +1,128 @@
+import collections
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+from digit_recognition import constants
+from utils import profiling
+from utils import events
+
+
+class ModelRegistry():
+    '''This class loads the models of the digit recognition once per process, instead of once per digit recognized.
+    Each model is warmed up with a dummy batch when it is loaded (the first prediction builds the graph and is much slower),
+    and kept in a bounded cache, the least recently used model being removed first.
+    TensorFlow is given an explicit number of threads before its first operation.
+
+    Attributes :
+        cache_size (int) : number of models kept loaded
+        intra_op_threads (int) : number of threads used by TensorFlow inside an operation (0 for the default)
+        inter_op_threads (int) : number of threads used by TensorFlow between operations (0 for the default)
+        models (collections.OrderedDict) : models loaded for each method, from the least to the most recently used
+        load_times (dict[str, float]) : time (in seconds) taken to load and warm up the model of each method, at its last load
+        inference_stats (dict[str, profiling.RollingStats]) : last durations of the inference of each method
+        nb_loads (int) : number of models loaded
+        nb_hits (int) : number of models found in the cache
+        threads_configured (bool) : True once the threads of TensorFlow have been set
+        lock (threading.Lock) : lock protecting the cache, the models being used by several threads
+
+    Methods :
+        configure_threads : set the number of threads of TensorFlow, before its first operation
+        get_model : return the model of a method, loaded and warmed up only the first time
+        load : load the model of a method and warm it up
+        predict : return the prediction of the model of a method for a batch of images
+        get_stats : return the metrics of the registry
+        clear : remove all the models
+    '''
+
+    def __init__(self, cache_size: int = constants.MODEL_REGISTRY_SIZE, intra_op_threads: int = constants.MODEL_INTRA_OP_THREADS, inter_op_threads: int = constants.MODEL_INTER_OP_THREADS):
+        self.cache_size = cache_size
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.models = collections.OrderedDict()
+        self.load_times = {}
+        self.inference_stats = {}
+        self.nb_loads = 0
+        self.nb_hits = 0
+        self.threads_configured = False
+        self.lock = threading.Lock()
+
+    def configure_threads(self) -> None:
+        '''Set the number of threads of TensorFlow. It only works before its first operation : it is done with the first model loaded.'''
+        if self.threads_configured:
+            return
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(self.intra_op_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(self.inter_op_threads)
+        except RuntimeError:
+            # TensorFlow has already been initialized in this process, with its own settings
+            events.EVENTS.emit("threads_not_configured", x=self.intra_op_threads, y=self.inter_op_threads)
+        self.threads_configured = True
+
+    def get_model(self, method: str = "main"):
+        '''Return the model of a method (key of digit_recognition.constants.MODEL_PATHS), loaded and warmed up only the first time'''
+        with self.lock:
+            model = self.models.get(method)
+            if model is not None:
+                self.models.move_to_end(method)
+                self.nb_hits += 1
+                return model
+            model = self.load(method)
+            self.models[method] = model
+            # The least recently used models are removed
+            while len(self.models) > self.cache_size:
+                self.models.popitem(last=False)
+            return model
+
+    def load(self, method: str):
+        '''Load the model of a method and warm it up with a dummy batch'''
+        self.configure_threads()
+        start = time.perf_counter()
+        model = load_model(constants.MODEL_PATHS[method])
+        model(np.zeros((1,) + tuple(model.input_shape[1:]), dtype=np.float32), training=False)
+        self.load_times[method] = time.perf_counter() - start
+        self.nb_loads += 1
+        return model
+
+    def predict(self, method: str, batch: np.ndarray, model = None) -> np.ndarray:
+        '''Return the prediction of the model of a method for a batch of images.
+        The model is called directly : model.predict prepares a whole dataset pipeline, much slower for a single image.
+
+        Parameters :
+            method (str) : method of digit recognition, key of digit_recognition.constants.MODEL_PATHS
+            batch (np.ndarray) : batch of images, of shape (nb_images, 28, 28, 1)
+            model (keras.Model) : model already loaded, taken from the registry if None
+
+        Returns :
+            prediction (np.ndarray) : probability of each digit for each image
+        '''
+        model = self.get_model(method) if model is None else model
+        start = time.perf_counter()
+        prediction = np.asarray(model(np.asarray(batch, dtype=np.float32), training=False))
+        stats = self.inference_stats.get(method)
+        if stats is None:
+            stats = self.inference_stats[method] = profiling.RollingStats(constants.MODEL_INFERENCE_WINDOW)
+        stats.add(time.perf_counter() - start)
+        return prediction
+
+    def get_stats(self) -> dict:
+        '''Return the metrics of the registry : models loaded, loads and cache hits, load time and percentiles of the inference time (in ms)'''
+        return {
+            "models": list(self.models),
+            "loads": self.nb_loads,
+            "hits": self.nb_hits,
+            "load_ms": {method: 1000*duration for method, duration in self.load_times.items()},
+            "inference_ms": {method: [float(value) for value in stats.percentiles((50, 95))] for method, stats in self.inference_stats.items()},
+        }
+
+    def clear(self) -> None:
+        '''Remove all the models'''
+        with self.lock:
+            self.models.clear()
+
+
+# Registry of the process, shared by all its digit recognitions
+MODELS = ModelRegistry()
@@ -1,2 +1,2 @@
-from graphical_user_interface import interface_cell, interface_grid, main_interface, constants, global_variable, interface_digit, interface_buttons
+from graphical_user_interface import interface_cell, interface_grid, main_interface, constants, interface_digit, interface_buttons, glyph_cache, overlay, compositor, scene, hit_test, layout, stroke, recognition_worker
 from graphical_user_interface.constants import *
@@ -0,0 +1,40 @@
+import numpy as np
+
+from graphical_user_interface import overlay as ov
+
+
+class Compositor():
+    '''This class blends the layers of a scene onto the frame : one layer per group of elements (the grid, the column of buttons,
+    the completion message), each one limited to the region of its group, instead of a single layer covering all of them.
+    The space between the groups is never blended, and a layer in which nothing is drawn (the completion message before
+    the grid is validated) is not blended at all. The layers are blended in the order of their groups, from the bottom to the top.
+
+    Attributes :
+        layers (dict[str, ov.Overlay]) : layer of each group, covering the regions of its elements
+
+    Methods :
+        get_layer : return the layer of a group
+        reset : remove all the shapes of the layers
+        composite : blend the layers in which something is drawn onto the frame
+    '''
+
+    def __init__(self, groups: dict[str, list[tuple[int]]]):
+        self.layers = {}
+        for group, regions in groups.items():
+            regions = np.array(regions)
+            self.layers[group] = ov.Overlay((regions[:, 0].min(), regions[:, 1].max(), regions[:, 2].min(), regions[:, 3].max()))
+
+    def get_layer(self, group: str) -> ov.Overlay:
+        '''Return the layer of a group'''
+        return self.layers[group]
+
+    def reset(self) -> None:
+        '''Remove all the shapes of the layers'''
+        for layer in self.layers.values():
+            layer.reset()
+
+    def composite(self, screen: np.ndarray) -> None:
+        '''Blend the layers in which something is drawn onto the frame, each one in its region only'''
+        for layer in self.layers.values():
+            if not layer.is_blank:
+                layer.composite(screen)
@@ -34,6 +34,8 @@ LIST_DIGITS_INITIAL_9 = [[1, 0, 0, 0, 0, 0, 0, 0, 6],
 # GRID INTERFACE
 ################
 
+# The colors are given in BGR, the color space of the frames
+
 # MAIN_GRID
 MAIN_GRID_SIZE = 4
 MAIN_GRID_COLOR = (0, 0, 0)
@@ -49,19 +51,22 @@ OTHER_LINES_THICKNESS = 1
 
 # CELLS
 CELLS_COLOR = (255, 255, 255)
-CELLS_COLOR_ACTIVE = (255, 0, 0)
+CELLS_COLOR_ACTIVE = (0, 0, 255)
+CELLS_COLOR_HOVER = (0, 255, 255)
 CELLS_THICKNESS = -1
 CELL_TRANSPARENCY = 0.3
 
 # DIGITS
 INITIAL_DIGITS_COLOR = (0, 0, 0)
-OTHER_DIGITS_COLOR = (0, 0, 255)
+OTHER_DIGITS_COLOR = (255, 0, 0)
 DIGITS_THICKNESS = 2
-DIGITS_FONTSCALE = 4 - np.sqrt(MAIN_GRID_SIZE) if np.sqrt(MAIN_GRID_SIZE) < 3 else 1
+# Text displayed in a cell while its digit is being recognized
+RECOGNIZING_TEXT = "..."
+RECOGNIZING_COLOR = (128, 128, 128)
 
 # DISPLAY COMPLETION
 COMPLETION_COLOR_TRUE = (0, 255, 0)
-COMPLETION_COLOR_FALSE = (255, 0, 0)
+COMPLETION_COLOR_FALSE = (0, 0, 255)
 COMPLETION_FONTSCALE = 3
 COMPLETION_THICKNESS = 3
 
@@ -79,26 +84,22 @@ RADIUS_PIXELS = 30
 # KERNEL FILTER
 KERNEL_FILTER = 1/9*np.ones((3,3), np.uint8)
 
-# COORDINATES
-#############
-
-# MAIN GRID
-MAIN_GRID_COORDINATES = [WIDTH_CAMERA//2 - HEIGHT_CAMERA//2, WIDTH_CAMERA//2 + HEIGHT_CAMERA//2, HEIGHT_CAMERA//20, 19*HEIGHT_CAMERA//20]
-
-# BUTTON VALIDATE GRID
-BUTTON_VALIDATE_GRID_COORDINATES = [int(1/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], int(19/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], MAIN_GRID_COORDINATES[2] + int(1/7*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2])), MAIN_GRID_COORDINATES[2] + int(2/7*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2]))]
-
-# BUTTON DRAW DIGIT
-BUTTON_DRAW_DIGIT_COORDINATES = [int(1/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], int(19/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], MAIN_GRID_COORDINATES[2] + int(3/7*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2])), MAIN_GRID_COORDINATES[2] + int(4/7*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2]))]
-
-# BUTTON DELETE CELL
-BUTTON_DELETE_CELL_COORDINATES = [int(1/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], int(19/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], MAIN_GRID_COORDINATES[2] + int(5/7*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2])), MAIN_GRID_COORDINATES[2] + int(6/7*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2]))]
-
-# BUTTON VALIDATE DIGIT
-BUTTON_VALIDATE_DIGIT_COORDINATES = [int(1/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], int(19/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], MAIN_GRID_COORDINATES[2] + int(1/5*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2])), MAIN_GRID_COORDINATES[2] + int(2/5*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2]))]
-
-# BUTTON ERASE DIGIT
-BUTTON_ERASE_DIGIT_COORDINATES = [int(1/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], int(19/20*(WIDTH_CAMERA - MAIN_GRID_COORDINATES[1])) + MAIN_GRID_COORDINATES[1], MAIN_GRID_COORDINATES[2] + int(3/5*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2])), MAIN_GRID_COORDINATES[2] + int(4/5*(MAIN_GRID_COORDINATES[3] - MAIN_GRID_COORDINATES[2]))]
+# STROKE
+# Weight of a new position of the hand against the previous point of the stroke (1 for no smoothing)
+STROKE_SMOOTHING = 0.5
+# Time (in seconds) without position of the hand after which a new segment starts, shorter losses being bridged by a line
+STROKE_MAX_GAP = 0.25
+# Number of points of the stroke allocated at first, doubled when it is full
+STROKE_CAPACITY = 256
+
+# RECOGNITION IMAGE
+# Size of the image given to the model, and of the box in which the digit fits (like the digits of MNIST)
+RECOGNITION_IMAGE_SIZE = 28
+RECOGNITION_DIGIT_SIZE = 20
+# Factor of the resolution at which the stroke is drawn before being averaged (anti-aliasing)
+RECOGNITION_SUPERSAMPLING = 2
+# Minimum and maximum width (in pixels of a 28x28 image) of the stroke, the widths of the digits of MNIST
+RECOGNITION_STROKE_WIDTH = (1.5, 3.5)
 
 # BUTTONS
 #########
@@ -109,6 +110,7 @@ BUTTONS_FONTSCALE = 1
 BUTTONS_TEXT_THICKNESS = 2
 BUTTONS_TRANSPARENCY_ACTIVE = 0.5
 BUTTONS_TRANSPARENCY_INACTIVE = 0.2
+BUTTONS_TRANSPARENCY_HOVER = 0.7
 
 # VALIDATE THE ENTIRE GRID
 BUTTON_VALIDATE_GRID_COLOR = (0, 255, 0)
@@ -146,3 +148,23 @@ BUTTON_ERASE_DIGIT_TEXT = "Erase digit"
 
 
 
+
+# LAYOUT
+########
+
+# The geometry of the interface is computed at runtime from the size of the frames (see layout.py) :
+# it is placed in a canvas of this aspect ratio, and the font scales, thicknesses and radius above are given for a canvas of this height
+LAYOUT_ASPECT_RATIO = (16, 9)
+LAYOUT_REFERENCE_HEIGHT = 720
+
+# HIT TEST
+##########
+
+# Size (in pixels) of the square buckets of the table giving the buttons under a point
+HIT_TEST_BUCKET_SIZE = 32
+
+# GLYPH CACHE
+#############
+
+# Number of texts (digits and labels, for each font, size and color) kept pre-rasterized, the least recently used removed first
+GLYPH_CACHE_SIZE = 256
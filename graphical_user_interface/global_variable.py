@@ -1,6 +0,0 @@
-####################
-# GLOBAL VARIABLES #
-#################### 
-
-# Global variable to store the digit recognized by the neural network
-digit = None
\ No newline at end of file
@@ -0,0 +1,103 @@
+import collections
+
+import numpy as np
+import cv2
+
+from graphical_user_interface import constants
+
+
+class Glyph():
+    '''This class is a text rasterized once with its anti-aliasing, into a small color and opacity patch (BGRA),
+    blended onto the frame afterwards in fixed point instead of being drawn again by cv2.putText.
+
+    Attributes :
+        coordinates (tuple[int]) : region of the patch relative to the origin of the text (x_min, x_max, y_min, y_max), excluded maximums
+        patch (np.ndarray) : color and opacity of the text, of shape (height, width, 4)
+        keep (np.ndarray) : fraction of the frame kept under the text, in 256th, of shape (height, width, 3)
+        color (np.ndarray) : color of the text multiplied by its opacity, in 256th (rounding included), of shape (height, width, 3)
+        buffer (np.ndarray) : buffer used to blend the region of the frame
+
+    Methods :
+        draw : blend the text onto the frame at the given origin
+    '''
+
+    def __init__(self, text: str, font: int, font_scale: float, color: tuple[int], thickness: int):
+        (width, height), baseline = cv2.getTextSize(text, font, font_scale, thickness)
+        # The strokes and their anti-aliased edges go beyond the size given by OpenCV
+        margin = thickness + 2
+        self.coordinates = (-margin, width + margin, -height - margin, baseline + margin)
+        mask = np.zeros((self.coordinates[3] - self.coordinates[2], self.coordinates[1] - self.coordinates[0]), dtype=np.uint8)
+        cv2.putText(mask, text, (margin, height + margin), font, font_scale, 255, thickness, cv2.LINE_AA)
+
+        self.patch = np.dstack((np.full(mask.shape + (3,), color, dtype=np.uint8), mask))
+        # The opacity goes from 0 to 256 so that the division by 256 is a shift
+        alpha = ((mask.astype(np.uint16)*256 + 127)//255)[:, :, None]
+        self.keep = np.repeat(256 - alpha, 3, axis=2)
+        self.color = alpha*np.asarray(color, dtype=np.uint16) + 128
+        self.buffer = np.empty(self.keep.shape, dtype=np.uint16)
+
+    def draw(self, screen: np.ndarray, origin: tuple[int]) -> None:
+        '''Blend the text onto the frame, its origin (bottom left corner) at the given point, like cv2.putText'''
+        x_min, x_max, y_min, y_max = self.coordinates[0] + origin[0], self.coordinates[1] + origin[0], self.coordinates[2] + origin[1], self.coordinates[3] + origin[1]
+        # The region is clipped to the frame
+        x0, y0 = max(x_min, 0), max(y_min, 0)
+        x1, y1 = min(x_max, screen.shape[1]), min(y_max, screen.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = screen[y0:y1, x0:x1]
+        region = (slice(y0 - y_min, y1 - y_min), slice(x0 - x_min, x1 - x_min))
+        buffer = self.buffer[region]
+        np.multiply(roi, self.keep[region], out=buffer)
+        np.add(buffer, self.color[region], out=buffer)
+        np.right_shift(buffer, 8, out=buffer)
+        np.copyto(roi, buffer, casting="unsafe")
+
+
+class GlyphCache():
+    '''This class keeps the texts of the interface (digits of the cells, labels of the buttons, messages) rasterized,
+    so that cv2.putText is called once per text instead of once per frame.
+    The cache is bounded : the text used the least recently is removed first, so that large grids with many values stay cheap.
+
+    Attributes :
+        glyphs (collections.OrderedDict) : glyph of each text (text, font, font scale, color, thickness), from the least to the most recently used
+        cache_size (int) : maximum number of texts kept
+        nb_hits (int) : number of texts found in the cache
+        nb_misses (int) : number of texts rasterized
+
+    Methods :
+        get_glyph : return the glyph of a text, rasterized if it is not in the cache
+        draw : draw a text on the frame, like cv2.putText with cv2.LINE_AA
+        get_stats : return the statistics of the cache
+    '''
+
+    def __init__(self, cache_size: int = constants.GLYPH_CACHE_SIZE):
+        self.glyphs = collections.OrderedDict()
+        self.cache_size = cache_size
+        self.nb_hits = 0
+        self.nb_misses = 0
+
+    def get_glyph(self, text: str, font: int, font_scale: float, color: tuple[int], thickness: int) -> Glyph:
+        '''Return the glyph of a text, rasterized if it is not in the cache'''
+        key = (text, font, float(font_scale), tuple(color), thickness)
+        glyph = self.glyphs.get(key)
+        if glyph is not None:
+            self.glyphs.move_to_end(key)
+            self.nb_hits += 1
+            return glyph
+        self.nb_misses += 1
+        glyph = self.glyphs[key] = Glyph(*key)
+        if len(self.glyphs) > self.cache_size:
+            self.glyphs.popitem(last=False)
+        return glyph
+
+    def draw(self, screen: np.ndarray, text: str, origin: tuple[int], font: int, font_scale: float, color: tuple[int], thickness: int) -> None:
+        '''Draw a text on the frame, like cv2.putText with cv2.LINE_AA'''
+        self.get_glyph(text, font, font_scale, color, thickness).draw(screen, origin)
+
+    def get_stats(self) -> dict:
+        '''Return the statistics of the cache : texts kept, found and rasterized'''
+        return {"size": len(self.glyphs), "hits": self.nb_hits, "misses": self.nb_misses}
+
+
+# Cache shared by all the texts of the interface
+GLYPHS = GlyphCache()
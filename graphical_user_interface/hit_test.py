@@ -0,0 +1,64 @@
+from graphical_user_interface import constants
+
+
+class HitTestIndex():
+    '''This class finds the cell or the button under a point without scanning them : it is built once from the coordinates of the grid
+    and of the buttons. The cell is computed arithmetically from the point, and the buttons are found through a table of buckets
+    covering the frame, each bucket giving the few buttons that cover it.
+
+    Attributes :
+        grid_coordinates (list[int]) : coordinates of the grid (x_min, x_max, y_min, y_max), None if there is no grid
+        grid_size (int) : number of rows and columns of the grid
+        buttons_coordinates (list[list[int]]) : coordinates of each button (x_min, x_max, y_min, y_max), maximums excluded
+        bucket_size (int) : size (in pixels) of the square buckets of the table
+        buckets (dict[tuple[int], tuple[int]]) : indexes of the buttons covering each bucket (x // bucket_size, y // bucket_size)
+
+    Methods :
+        find_cell : return the row and the column of the cell under a point
+        find_button : return the index of the button under a point
+        hover : return what is under a point : a cell, a button or nothing
+    '''
+
+    def __init__(self, grid_coordinates: list[int], grid_size: int, buttons_coordinates: list[list[int]], bucket_size: int = constants.HIT_TEST_BUCKET_SIZE):
+        self.grid_coordinates = grid_coordinates
+        self.grid_size = grid_size
+        self.buttons_coordinates = buttons_coordinates
+        self.bucket_size = bucket_size
+        self.buckets = {}
+        for index, (x_min, x_max, y_min, y_max) in enumerate(buttons_coordinates):
+            for i in range(x_min // bucket_size, (x_max - 1) // bucket_size + 1):
+                for j in range(y_min // bucket_size, (y_max - 1) // bucket_size + 1):
+                    self.buckets[(i, j)] = self.buckets.get((i, j), ()) + (index,)
+
+    def find_cell(self, point: tuple[int]) -> tuple[int]:
+        '''Return the row and the column of the cell under the point, None if the point is outside of the grid.
+        The limits of the cells are those of Cell.calculate_coordinates : x_min + i*width // size.
+        '''
+        if self.grid_coordinates is None or point is None:
+            return None
+        x_min, x_max, y_min, y_max = self.grid_coordinates
+        x, y = point[0] - x_min, point[1] - y_min
+        if not (0 <= x < x_max - x_min and 0 <= y < y_max - y_min):
+            return None
+        # Largest i such that i*width // size <= x
+        return ((y + 1)*self.grid_size - 1) // (y_max - y_min), ((x + 1)*self.grid_size - 1) // (x_max - x_min)
+
+    def find_button(self, point: tuple[int]) -> int:
+        '''Return the index of the button under the point, None if there is no button'''
+        if point is None:
+            return None
+        for index in self.buckets.get((point[0] // self.bucket_size, point[1] // self.bucket_size), ()):
+            x_min, x_max, y_min, y_max = self.buttons_coordinates[index]
+            if x_min <= point[0] < x_max and y_min <= point[1] < y_max:
+                return index
+        return None
+
+    def hover(self, point: tuple[int]) -> tuple:
+        '''Return what is under the point : ("cell", (row, column)), ("button", index), or None'''
+        button = self.find_button(point)
+        if button is not None:
+            return ("button", button)
+        cell = self.find_cell(point)
+        if cell is not None:
+            return ("cell", cell)
+        return None
@@ -1,8 +1,10 @@
 from typing import Callable
 
-import numpy as np
 import cv2
 
+from graphical_user_interface import constants
+from graphical_user_interface import overlay as ov
+
 class Button():
     '''This class represents a button in the graphical user interface.
     
@@ -18,11 +20,13 @@ class Button():
         transparency_active (int): transparency of the button when it is active
         transparency_inactive (int): transparency of the button when it is inactive
         is_active (bool): True if the button is active, False otherwise
+        is_hovered (bool): True if the hand is over the button, False otherwise
 
     Methods:
-        draw: draw the button on the screen
+        set_geometry: set the coordinates of the button and the size of its text, for a new layout
+        get_region: return the region of the frame covered by the button
+        draw: draw the button into the layer of the interface
         update_button_status: update the status of the button
-        is_clicked: check if the button is clicked
     '''
 
     def __init__(self, coordinates: list[int], color: tuple[int], thickness: int, text: str, text_font_scale: int, text_thickness: int, font_color_active: tuple[int], font_color_inactive: tuple[int], transparency_active: int, transparency_inactive: int):
@@ -37,19 +41,28 @@ class Button():
         self.transparency_active = transparency_active
         self.transparency_inactive = transparency_inactive
         self.is_active = False
+        self.is_hovered = False
+
+    def set_geometry(self, coordinates: list[int], text_font_scale: float, text_thickness: int) -> None:
+        '''Set the coordinates of the button and the size of its text, for a new layout. Its status is kept.'''
+        self.coordinates = coordinates
+        self.text_font_scale = text_font_scale
+        self.text_thickness = text_thickness
+
+    def get_region(self) -> tuple[int]:
+        '''Return the region of the frame covered by the button (the rectangle of the button includes its maximums)'''
+        return (self.coordinates[0], self.coordinates[1] + 1, self.coordinates[2], self.coordinates[3] + 1)
 
-    def draw(self, screen:np.ndarray) -> None:
-        '''Draw the button on the screen'''
-        screen1 = screen.copy()
+    def draw(self, layer: ov.Overlay) -> None:
+        '''Draw the button into the layer of the interface'''
         if self.is_active:
             color_text = self.text_color_active
-            transparency = self.transparency_active
+            transparency = constants.BUTTONS_TRANSPARENCY_HOVER if self.is_hovered else self.transparency_active
         else:
             color_text = self.text_color_inactive
             transparency = self.transparency_inactive
-        cv2.rectangle(screen1,(self.coordinates[0], self.coordinates[2]), (self.coordinates[1], self.coordinates[3]), self.color, self.thickness)
-        cv2.addWeighted(screen1, transparency, screen, 1 - transparency, 0, screen)
-        cv2.putText(screen, self.text, (self.coordinates[0] + int(1/20*(self.coordinates[1] - self.coordinates[0])), self.coordinates[2] + int(17/28*(self.coordinates[3] - self.coordinates[2]))), cv2.FONT_HERSHEY_SIMPLEX, self.text_font_scale, color_text, self.text_thickness, cv2.LINE_AA)
+        layer.rectangle((self.coordinates[0], self.coordinates[2]), (self.coordinates[1], self.coordinates[3]), self.color, self.thickness, transparency)
+        layer.text(self.text, (self.coordinates[0] + int(1/20*(self.coordinates[1] - self.coordinates[0])), self.coordinates[2] + int(17/28*(self.coordinates[3] - self.coordinates[2]))), cv2.FONT_HERSHEY_SIMPLEX, self.text_font_scale, color_text, self.text_thickness)
 
     def update_button_status(self, activation_button: Callable) -> None:
         '''Update the status of the button'''
@@ -57,10 +70,3 @@ class Button():
             self.is_active = True
         else:
             self.is_active = False
-
-    def is_clicked(self, coordinates_click: tuple[int]) -> bool:
-        '''Return True if the button is clicked'''
-        if self.is_active:
-            if coordinates_click[0] >= self.coordinates[0] and coordinates_click[0] < self.coordinates[1] and coordinates_click[1] >= self.coordinates[2] and coordinates_click[1] < self.coordinates[3]:
-                return True
-        return False
\ No newline at end of file
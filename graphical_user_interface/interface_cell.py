@@ -1,7 +1,8 @@
 import cv2
-import numpy as np
 
 from graphical_user_interface import constants
+from graphical_user_interface import overlay as ov
+from graphical_user_interface import layout as lo
 
 class Cell():
     '''This class represents a cell of the sudoku. It is composed of a value and coordinates.
@@ -12,50 +13,75 @@ class Cell():
         initial (bool) : True if the cell is an initial cell, False otherwise
         is_drawn (bool) : True if the cell is drawn, False otherwise
         is_active (bool) : True if the cell is active, False otherwise
+        is_hovered (bool) : True if the hand is over the cell, False otherwise
+        is_recognizing (bool) : True if the digit drawn for the cell is being recognized, False otherwise
+        layout (lo.Layout) : geometry of the interface, giving the coordinates and the font scale of the cell
         size_cell (int) : size of the cell
         coordinates (tuple[int]) : coordinates of the cell
 
     Methods :
+        set_layout : compute again the geometry of the cell, for a new layout
         calculate_size_cell : calculate the size of a cell
         calculate_coordinates : calculate the coordinates of the cell
-        display_cell : display a number in a given cell
-        is_clicked : return True if a cell is clicked. An ititial cell cannot be clicked
+        get_region : return the region of the frame covered by the cell
+        draw_cell : draw the background of the cell, whose color shows if it is active
+        display_cell : display a number in a given cell, or that its digit is being recognized
         erase_cell : erase the number in a given cell
     '''
 
-    def __init__(self, position_in_grid : tuple[int], value : int = None, initial : bool = False):
+    def __init__(self, position_in_grid : tuple[int], layout : lo.Layout, value : int = None, initial : bool = False):
         self.position_in_grid = position_in_grid
         self.value = value
         self.initial = initial
         self.is_drawn = False
         self.is_active = False
+        self.is_hovered = False
+        self.is_recognizing = False
+        self.layout = None
+        self.size_cell = None
+        self.coordinates = None
+        self.set_layout(layout)
+
+    def set_layout(self, layout : lo.Layout) -> None:
+        '''Compute again the geometry of the cell, for a new layout. Its value and its status are kept.'''
+        self.layout = layout
         self.size_cell = self.calculate_size_cell()
         self.coordinates = self.calculate_coordinates()
 
     def calculate_size_cell(self) -> int:
         '''Calculate the size of a cell'''
-        return (constants.MAIN_GRID_COORDINATES[1] - constants.MAIN_GRID_COORDINATES[0]) // constants.MAIN_GRID_SIZE
+        return self.layout.get_size_cell()
 
     def calculate_coordinates(self) -> tuple[int]:
         '''Calculate the coordinates of the cell'''
-        return (constants.MAIN_GRID_COORDINATES[0] + self.position_in_grid[1]*(constants.MAIN_GRID_COORDINATES[1] - constants.MAIN_GRID_COORDINATES[0])//constants.MAIN_GRID_SIZE, constants.MAIN_GRID_COORDINATES[0] + (self.position_in_grid[1] + 1)*(constants.MAIN_GRID_COORDINATES[1] - constants.MAIN_GRID_COORDINATES[0])//constants.MAIN_GRID_SIZE, constants.MAIN_GRID_COORDINATES[2] + self.position_in_grid[0]*(constants.MAIN_GRID_COORDINATES[3] - constants.MAIN_GRID_COORDINATES[2])//constants.MAIN_GRID_SIZE, constants.MAIN_GRID_COORDINATES[2] + (self.position_in_grid[0] + 1)*(constants.MAIN_GRID_COORDINATES[3] - constants.MAIN_GRID_COORDINATES[2])//constants.MAIN_GRID_SIZE)
+        return self.layout.get_cell_coordinates(self.position_in_grid)
+
+    def get_region(self) -> tuple[int]:
+        '''Return the region of the frame covered by the cell (the rectangle of the cell includes its maximums)'''
+        return (self.coordinates[0], self.coordinates[1] + 1, self.coordinates[2], self.coordinates[3] + 1)
+
+    def draw_cell(self, layer : ov.Overlay) -> None:
+        '''Draw the background of the cell, whose color shows if it is active or under the hand'''
+        if self.is_active:
+            color = constants.CELLS_COLOR_ACTIVE
+        elif self.is_hovered:
+            color = constants.CELLS_COLOR_HOVER
+        else:
+            color = constants.CELLS_COLOR
+        layer.rectangle((self.coordinates[0], self.coordinates[2]), (self.coordinates[1], self.coordinates[3]), color, constants.CELLS_THICKNESS, constants.CELL_TRANSPARENCY)
 
-    def display_cell(self, screen : np.ndarray) -> None:
-        '''Display a number in a given cell'''
+    def display_cell(self, layer : ov.Overlay) -> None:
+        '''Display a number in a given cell, or that its digit is being recognized'''
+        origin = (self.coordinates[0] + int(2/5*self.size_cell), self.coordinates[2] + int(3/5*self.size_cell))
         if self.value is not None:
             if self.initial : 
                 color = constants.INITIAL_DIGITS_COLOR
             else:
                 color = constants.OTHER_DIGITS_COLOR
-            cv2.putText(screen, str(self.value), (self.coordinates[0] + int(2/5*self.size_cell), self.coordinates[2] + int(3/5*self.size_cell)), cv2.FONT_HERSHEY_SIMPLEX, constants.DIGITS_FONTSCALE, color, constants.DIGITS_THICKNESS, cv2.LINE_AA)
+            layer.text(str(self.value), origin, cv2.FONT_HERSHEY_SIMPLEX, self.layout.digits_font_scale, color, self.layout.digits_thickness)
             self.is_drawn = True
-
-    def is_clicked(self, coordinates_click : tuple[int]) -> bool:
-        '''Return True if a cell is clicked. An ititial cell cannot be clicked'''
-        if coordinates_click[0] >= self.coordinates[0] and coordinates_click[0] < self.coordinates[1] and coordinates_click[1] >= self.coordinates[2] and coordinates_click[1] < self.coordinates[3] and not self.initial:
-            return True
-        else:
-            return False
+        elif self.is_recognizing:
+            layer.text(constants.RECOGNIZING_TEXT, origin, cv2.FONT_HERSHEY_SIMPLEX, self.layout.digits_font_scale, constants.RECOGNIZING_COLOR, self.layout.digits_thickness)
 
     def erase_cell(self) -> None:
         '''Erase the number in a given cell'''
@@ -1,97 +1,148 @@
+import time
+import concurrent.futures
+
 import numpy as np
 import cv2
 
 from graphical_user_interface import constants
 from graphical_user_interface import interface_buttons as ib
-from digit_recognition import main_digit_recognition as mdr
+from graphical_user_interface import overlay as ov
+from graphical_user_interface import scene as sc
+from graphical_user_interface import hit_test as ht
+from graphical_user_interface import layout as lo
+from graphical_user_interface import stroke as st
+from graphical_user_interface import recognition_worker as rw
 
 
 class InterfaceDigit():
     '''This class represents the interface of a digit in the graphical user interface.
 
     Attributes :
+        layout (lo.Layout) : geometry of the interface, computed from the size of the frames
         main_coordinates (tuple[int]) : coordinates of the main interface
         buttons (np.ndarray) : buttons of the interface
-        pixels (list[list[int]]) : pixels of the digit
-        final_image_digit (np.ndarray) : final image of the digit
-        digit (int) : digit drawn
+        stroke (st.Stroke) : polyline of the digit drawn, in the coordinates of the interface
+        stroke_mask (np.ndarray) : mask of the stroke displayed (255 where it is drawn), of the size of the interface
+        stroke_coordinates (list[int]) : bounding box of the stroke in the mask (x_min, x_max, y_min, y_max), None if nothing is drawn
+        final_image_digit (np.ndarray) : final image of the digit given to the recognition (28x28, rasterized from the stroke), None before
+        digit (int) : digit drawn, set when its recognition is over
         is_active (bool) : True if the interface is active, False otherwise
         is_drawing (bool) : True if the digit is being drawn, False otherwise
         is_drawn (bool) : True if the digit is drawn, False otherwise
+        recognizer (Callable) : function returning the digit of an image (the model server in a session), main_digit_recognition if None
+        worker (rw.RecognitionWorker) : background thread recognizing the digits, so the frames never wait for the model
+        scene (sc.Scene) : interface and buttons, rendered again only when they change
+        hit_test (ht.HitTestIndex) : index giving the button under a point
+        hovered (ib.Button) : button under the hand, None if there is none
 
     Methods :
+        set_layout : compute again the cached geometry (buttons, scene and hit test) for a new layout
         create_buttons : create the buttons of the interface
-        initialize_final_image_digit : create the final image of the digit
+        create_scene : create the scene of the interface, from the bottom to the top
+        create_hit_test : create the index giving the button under a point
+        initialize_stroke : create an empty stroke and its mask
         initialize_interface : initialize the interface
         draw_main : draw the interface and the buttons
         draw_interface : draw the interface
-        draw_buttons : draw the buttons
         click_on_grid : check if the click is on the grid. We don't return anything, but we know if we are drawing or if the draw is over
         update_buttons_status : update the status of the buttons
         activate_validate_digit : activate the button "validate digit" if the digit is drawn
-        activate_erase_digit : activate the button "erase digit" if the list of pixels is not empty
-        click_on_buttons : return the digit if the button "validate digit" is clicked, None otherwise
+        activate_erase_digit : activate the button "erase digit" if something is drawn
+        click_on_buttons : start the recognition of the digit if the button "validate digit" is clicked and return its future, None otherwise
+        update_hover : highlight the button under the hand
+        rasterize_digit : rasterize the stroke into the final image of the digit
+        recognize_digit : return the digit of the final image, without the background thread
         draw_digit : draw the digit
-        keep_pixels : memorize the pixels of the digit in order to plot them afterwards
-        modify_final_image : modify the final image
-        draw_digit_on_screen : draw the final image of the digit on the screen, with transparency
+        is_stroke_empty : return True if nothing is drawn
+        erase_stroke : erase the stroke
+        add_to_stroke : add the new position of the hand to the stroke, and the new segment to its mask
+        draw_digit_on_screen : draw the stroke on the screen
     '''
 
-    def __init__(self, main_coordinates : tuple[int]):
-        self.main_coordinates = main_coordinates
+    def __init__(self, layout : lo.Layout, recognizer = None):
+        self.layout = layout
+        self.main_coordinates = layout.panel_coordinates
+        self.recognizer = recognizer
+        self.worker = rw.RecognitionWorker(recognizer)
+        self.scene = sc.Scene()
+        self.hit_test = None
+        self.hovered = None
         self.buttons = np.ndarray(2, dtype=ib.Button)
-        self.pixels = []
+        self.stroke = st.Stroke()
+        self.stroke_mask = None
+        self.stroke_coordinates = None
         self.final_image_digit = None
         self.digit = None
         self.is_active = False
         self.is_drawing = False
         self.is_drawn = False
         self.create_buttons()
-        self.initialize_final_image_digit() 
+        self.create_scene()
+        self.create_hit_test()
+        self.initialize_stroke()
+
+    def set_layout(self, layout : lo.Layout) -> None:
+        '''Compute again the cached geometry for a new layout : coordinates of the interface and of the buttons, scene and hit test'''
+        self.layout = layout
+        self.main_coordinates = layout.panel_coordinates
+        for button, coordinates in zip(self.buttons, layout.digit_buttons_coordinates):
+            button.set_geometry(coordinates, layout.buttons_font_scale, layout.buttons_text_thickness)
+        self.scene.clear()
+        self.create_scene()
+        self.create_hit_test()
+
+        # The stroke was drawn in the coordinates of the previous layout : it is started again
+        self.is_drawing = False
+        self.is_drawn = False
+        self.initialize_stroke()
 
     def create_buttons(self) -> None:
         '''Create the buttons of the interface'''
         # Button validate digit
-        self.buttons[0] = ib.Button(constants.BUTTON_VALIDATE_DIGIT_COORDINATES, constants.BUTTON_VALIDATE_DIGIT_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_VALIDATE_DIGIT_TEXT, constants.BUTTONS_FONTSCALE, constants.BUTTONS_TEXT_THICKNESS, constants.BUTTON_VALIDATE_DIGIT_TEXT_COLOR_ACTIVE, constants.BUTTON_VALIDATE_DIGIT_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
+        self.buttons[0] = ib.Button(self.layout.digit_buttons_coordinates[0], constants.BUTTON_VALIDATE_DIGIT_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_VALIDATE_DIGIT_TEXT, self.layout.buttons_font_scale, self.layout.buttons_text_thickness, constants.BUTTON_VALIDATE_DIGIT_TEXT_COLOR_ACTIVE, constants.BUTTON_VALIDATE_DIGIT_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
 
         # Button erase digit
-        self.buttons[1] = ib.Button(constants.BUTTON_ERASE_DIGIT_COORDINATES, constants.BUTTON_ERASE_DIGIT_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_ERASE_DIGIT_TEXT, constants.BUTTONS_FONTSCALE, constants.BUTTONS_TEXT_THICKNESS, constants.BUTTON_ERASE_DIGIT_TEXT_COLOR_ACTIVE, constants.BUTTON_ERASE_DIGIT_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
+        self.buttons[1] = ib.Button(self.layout.digit_buttons_coordinates[1], constants.BUTTON_ERASE_DIGIT_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_ERASE_DIGIT_TEXT, self.layout.buttons_font_scale, self.layout.buttons_text_thickness, constants.BUTTON_ERASE_DIGIT_TEXT_COLOR_ACTIVE, constants.BUTTON_ERASE_DIGIT_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
 
-    def initialize_final_image_digit(self) -> None:
-        '''Create the final image of the digit'''
-        self.final_image_digit = np.zeros((self.main_coordinates[3] - self.main_coordinates[2], self.main_coordinates[1] - self.main_coordinates[0]), dtype=np.uint8)
+    def create_scene(self) -> None:
+        '''Create the scene of the interface : the buttons are drawn again only when their status changes'''
+        self.scene.add("interface digit", (self.main_coordinates[0], self.main_coordinates[1] + 1, self.main_coordinates[2], self.main_coordinates[3] + 1), lambda: True, self.draw_interface, "panel")
+        for button in self.buttons:
+            self.scene.add("button " + button.text, button.get_region(), lambda button=button: (button.is_active, button.is_hovered), button.draw, "buttons")
+
+    def create_hit_test(self) -> None:
+        '''Create the index giving the button under a point (the interface has no cell)'''
+        self.hit_test = ht.HitTestIndex(None, 0, [button.coordinates for button in self.buttons])
+
+    def initialize_stroke(self) -> None:
+        '''Create an empty stroke and its mask, of the size of the interface'''
+        self.stroke.clear()
+        self.stroke_mask = np.zeros((self.main_coordinates[3] - self.main_coordinates[2], self.main_coordinates[1] - self.main_coordinates[0]), dtype=np.uint8)
+        self.stroke_coordinates = None
+        self.final_image_digit = None
 
     def initialize_interface(self) -> None:
         '''Initialize the interface'''
-        self.pixels = []
-        self.final_image_digit = np.zeros((self.main_coordinates[3] - self.main_coordinates[2], self.main_coordinates[1] - self.main_coordinates[0]), dtype=np.uint8)
+        self.initialize_stroke()
         self.digit = None
         self.is_active = True
         self.is_drawing = False
         self.is_drawn = False
 
-    def draw_main(self, screen : np.ndarray) -> None:
-        '''Draw the interface and the buttons'''
-        self.draw_interface(screen)
-        self.draw_buttons(screen)
+    def draw_main(self, screen : np.ndarray) -> int:
+        '''Draw the interface and the buttons, only those that have changed being drawn again. Return the number of elements drawn again.'''
+        return self.scene.draw(screen)
 
-    def draw_interface(self, screen : np.ndarray) -> None:
+    def draw_interface(self, layer : ov.Overlay) -> None:
         '''Draw the interface'''
-        screen1 = screen.copy()
-        cv2.rectangle(screen1,(self.main_coordinates[0], self.main_coordinates[2]), (self.main_coordinates[1], self.main_coordinates[3]), constants.MAIN_INTERFACE_DIGIT_COLOR, constants.MAIN_INTERFACE_DIGIT_THICKNESS)
-        cv2.addWeighted(screen1, constants.MAIN_INTERFACE_DIGIT_TRANSPARENCY, screen, 1 - constants.MAIN_INTERFACE_DIGIT_TRANSPARENCY, 0, screen)
-
-    def draw_buttons(self, screen : np.ndarray) -> None:
-        '''Draw the buttons'''
-        for i in range(len(self.buttons)):
-            self.buttons[i].draw(screen)
+        layer.rectangle((self.main_coordinates[0], self.main_coordinates[2]), (self.main_coordinates[1], self.main_coordinates[3]), constants.MAIN_INTERFACE_DIGIT_COLOR, constants.MAIN_INTERFACE_DIGIT_THICKNESS, constants.MAIN_INTERFACE_DIGIT_TRANSPARENCY)
 
     def click_on_grid(self, coordinates_click : tuple[int]) -> None:
         '''Check if the click is on the grid. We don't return anything, but we know if we are drawing or if the draw is over'''
         if self.main_coordinates[0] <= coordinates_click[0] < self.main_coordinates[1] and self.main_coordinates[2] <= coordinates_click[1] < self.main_coordinates[3] and not self.is_drawing:
             self.is_drawing = True
             self.is_drawn = False
-        elif self.main_coordinates[0] <= coordinates_click[0] < self.main_coordinates[1] and self.main_coordinates[2] <= coordinates_click[1] < self.main_coordinates[3] and self.is_drawing and self.pixels != []:
+        elif self.main_coordinates[0] <= coordinates_click[0] < self.main_coordinates[1] and self.main_coordinates[2] <= coordinates_click[1] < self.main_coordinates[3] and self.is_drawing and not self.is_stroke_empty():
             self.is_drawing = False
             self.is_drawn = True
 
@@ -105,59 +156,106 @@ class InterfaceDigit():
         return self.is_drawn 
     
     def activate_erase_digit(self) -> bool:
-        '''Activate the button "erase digit" if the list of pixels is not empty'''
-        return self.pixels != []
+        '''Activate the button "erase digit" if something is drawn'''
+        return not self.is_stroke_empty()
     
-    def click_on_buttons(self, coordinates_click : tuple[int]) -> int:
-        '''Return the digit if the button "validate digit" is clicked, None otherwise'''
-        for i in range(len(self.buttons)):
-            if self.buttons[i].is_clicked(coordinates_click):
-                if i == 0:
-                    self.digit = mdr.main_digit_recognition(self.final_image_digit, "main")
-                    print("The recognized digit is :", self.digit)
-                    self.is_active = False
-                    return self.digit
-                elif i == 1:
-                    self.pixels = []
-                    self.is_drawn = False
-                    self.is_drawing = False
-                    self.initialize_final_image_digit()
+    def click_on_buttons(self, coordinates_click : tuple[int]) -> concurrent.futures.Future:
+        '''Start the recognition of the digit if the button "validate digit" is clicked and return its future, None otherwise.
+        The stroke is rasterized in the frame (it is cheap), only the model runs in the background.
+        '''
+        i = self.hit_test.find_button(coordinates_click)
+        if i is None or not self.buttons[i].is_active:
+            return None
+        if i == 0:
+            self.digit = None
+            self.is_active = False
+            return self.worker.submit(self.rasterize_digit())
+        elif i == 1:
+            self.is_drawn = False
+            self.is_drawing = False
+            self.erase_stroke()
         return None
 
+    def update_hover(self, coordinates_hand : tuple[int]) -> None:
+        '''Highlight the button under the hand'''
+        i = self.hit_test.find_button(coordinates_hand)
+        hovered = self.buttons[i] if i is not None else None
+        if hovered is not self.hovered:
+            if self.hovered is not None:
+                self.hovered.is_hovered = False
+            if hovered is not None:
+                hovered.is_hovered = True
+            self.hovered = hovered
+
+    def rasterize_digit(self) -> np.ndarray:
+        '''Rasterize the stroke into the final image of the digit, prepared like the images the model was trained on'''
+        self.final_image_digit = self.stroke.rasterize(self.layout.radius_pixels)
+        return self.final_image_digit
+
+    def recognize_digit(self) -> int:
+        '''Return the digit of the final image, recognized in the calling thread (the frames use the background thread instead)'''
+        return self.worker.recognize(self.rasterize_digit())
+
     def draw_digit(self, img : np.ndarray, coordinates_hand : tuple[int]) -> None:
         '''Draw the digit'''
-        if self.is_drawing:
-            if coordinates_hand is not None:
-                # We memorize the pixels of the digit
-                self.keep_pixels(coordinates_hand)
-
-                # We modify final image to color the pixels in black
-                self.modify_final_image()
+        if self.is_drawing and coordinates_hand is not None:
+            # We add the new position of the hand to the stroke
+            self.add_to_stroke(coordinates_hand)
+        elif not self.is_drawing:
+            # The drawing is over : the next position starts a new segment (a short loss of the hand is bridged by the stroke)
+            self.stroke.interrupt()
 
         if self.is_drawn or self.is_drawing:
             # We draw the digit
             self.draw_digit_on_screen(img)
 
-    def keep_pixels(self, coordinates_hand : tuple[int]) -> None:
-        '''Memorize the pixels of the digit in order to plot them afterwards'''
-        for i in range(coordinates_hand[0] - constants.RADIUS_PIXELS, coordinates_hand[0] + constants.RADIUS_PIXELS + 1):
-            for j in range(coordinates_hand[1] - constants.RADIUS_PIXELS, coordinates_hand[1] + constants.RADIUS_PIXELS + 1):
-                if self.main_coordinates[0] <= i < self.main_coordinates[1] and self.main_coordinates[2] <= j < self.main_coordinates[3] and np.sqrt((i - coordinates_hand[0])**2 + (j - coordinates_hand[1])**2) <= constants.RADIUS_PIXELS:
-                    self.pixels.append([i, j])
+    def is_stroke_empty(self) -> bool:
+        '''Return True if nothing is drawn'''
+        return self.stroke.is_empty()
 
-    def modify_final_image(self) -> None:
-        '''Modify the final image'''
-        for pixel in self.pixels:
-            self.final_image_digit[pixel[1] - self.main_coordinates[2], pixel[0] - self.main_coordinates[0]] = 255
+    def erase_stroke(self) -> None:
+        '''Erase the stroke : only the part of the mask covered by the stroke is cleared'''
+        if self.stroke_coordinates is not None:
+            x_min, x_max, y_min, y_max = self.stroke_coordinates
+            self.stroke_mask[y_min:y_max, x_min:x_max] = 0
+        self.stroke.clear()
+        self.stroke_coordinates = None
+        self.final_image_digit = None
 
-    def draw_digit_on_screen(self, img : np.ndarray) -> None:
-        '''Draw the final image of the digit on the screen, with transparency'''
-        for pixel in self.pixels:
-            img[pixel[1], pixel[0]] = 0
+    def add_to_stroke(self, coordinates_hand : tuple[int], timestamp : float = None) -> None:
+        '''Add the new position of the hand to the stroke, and the segment from the previous point (a disc for the first point) to its mask.
+        Only the new segment is drawn, so the cost of a frame does not depend on the length of the stroke.
+        A position outside of the interface is skipped : like a short loss of the hand, it is bridged by the stroke.
+        '''
+        height, width = self.stroke_mask.shape
+        position = (coordinates_hand[0] - self.main_coordinates[0], coordinates_hand[1] - self.main_coordinates[2])
+        if not (0 <= position[0] < width and 0 <= position[1] < height):
+            # The next position inside continues the segment if it comes within the maximum gap of the stroke
+            return
+        previous, point = self.stroke.add_point(position, time.perf_counter() if timestamp is None else timestamp)
 
-        
+        radius = self.layout.radius_pixels
+        end = (int(round(point[0])), int(round(point[1])))
+        start = end if previous is None else (int(round(previous[0])), int(round(previous[1])))
+        # The round ends of a line of thickness 2*radius are the discs of the brush
+        if previous is None:
+            cv2.circle(self.stroke_mask, end, radius, 255, -1)
+        else:
+            cv2.line(self.stroke_mask, start, end, 255, 2*radius)
 
-    
-        
+        # Bounding box of the stroke, with the new segment, clipped to the mask
+        x_min, x_max = max(min(start[0], end[0]) - radius, 0), min(max(start[0], end[0]) + radius + 1, width)
+        y_min, y_max = max(min(start[1], end[1]) - radius, 0), min(max(start[1], end[1]) + radius + 1, height)
+        if self.stroke_coordinates is not None:
+            x_min, x_max = min(x_min, self.stroke_coordinates[0]), max(x_max, self.stroke_coordinates[1])
+            y_min, y_max = min(y_min, self.stroke_coordinates[2]), max(y_max, self.stroke_coordinates[3])
+        self.stroke_coordinates = [x_min, x_max, y_min, y_max]
 
-    
\ No newline at end of file
+    def draw_digit_on_screen(self, img : np.ndarray) -> None:
+        '''Draw the stroke on the screen, in black : a single masked assignment over the bounding box of the stroke'''
+        if self.stroke_coordinates is None:
+            return
+        x_min, x_max, y_min, y_max = self.stroke_coordinates
+        roi = img[self.main_coordinates[2] + y_min:self.main_coordinates[2] + y_max, self.main_coordinates[0] + x_min:self.main_coordinates[0] + x_max]
+        # roi - roi = 0 where the mask is set, the other pixels are not modified (in place, without the boolean array of numpy)
+        cv2.subtract(roi, roi, dst=roi, mask=self.stroke_mask[y_min:y_max, x_min:x_max])
@@ -1,3 +1,5 @@
+import concurrent.futures
+
 import numpy as np
 import cv2
 
@@ -5,6 +7,12 @@ from graphical_user_interface import constants
 from graphical_user_interface import interface_cell as ic
 from graphical_user_interface import interface_buttons as ib
 from graphical_user_interface import interface_digit as id
+from graphical_user_interface import overlay as ov
+from graphical_user_interface import glyph_cache as gc
+from graphical_user_interface import scene as sc
+from graphical_user_interface import hit_test as ht
+from graphical_user_interface import layout as lo
+from utils import events
 
 class Grid():
     '''This class represents the grid of the sudoku. It is composed of cells.
@@ -12,6 +20,7 @@ class Grid():
     The grid is completed when all the cells have a value.
     
     Attributes : 
+        layout (lo.Layout) : geometry of the interface, computed from the size of the frames
         main_coordinates (list[int]) : coordinates of the main grid
         list_cells_origin (list[list[int]]) : list of the cells of the grid
         cells (np.ndarray) : cells of the grid
@@ -19,38 +28,84 @@ class Grid():
         interface_digit (id.InterfaceDigit) : interface to write the digit
         completed (bool) : True if the grid is completed, False otherwise
         active_cell (ic.Cell) : cell that is active
+        recognition (concurrent.futures.Future) : recognition of the digit running in the background, None if there is none
+        recognizing_cell (ic.Cell) : cell that receives the digit being recognized, None if there is none
+        recognizer (Callable) : function returning the digit of an image, given to the interface digit (None for main_digit_recognition)
+        scene (sc.Scene) : cells, lines, buttons, completion message and digits, rendered again only when they change
+        nb_redrawn (int) : number of elements of the interface drawn again during the last frame
+        hit_test (ht.HitTestIndex) : index giving the cell or the button under a point
+        hovered (Cell or Button) : cell or button under the hand, None if there is none
 
     Methods :
+        update_layout : compute again the geometry of the interface if the size of the frames has changed
+        set_layout : compute again the cached geometry (cells, buttons, interface digit, scene and hit test) for a new layout
         create_cells : create the objects "cell" of the grid
         create_buttons : create the buttons of the sudoku interface
         create_interface_digit : create the interface to write the digit
-        draw_grid : draw the grid on the screen and the empty cells
+        create_scene : create the scene of the sudoku interface, from the bottom to the top
+        create_hit_test : create the index giving the cell or the button under a point
+        draw_grid : draw the grid, its digits, its buttons and the completion message on the screen
+        draw_main_grid : draw the main grid and its lines
         draw_lines : draw the main lines of the grid
-        draw_cells : draw the cells of the grid
-        draw_buttons : draw the buttons of the sudoku interface
-        display_digits_grid : display the digits of the grid
+        get_completion_state : return the state of the completion message
+        get_render_stats : return the number of elements drawn again, in the grid and in the interface digit
         find_clicked_cell : find the cell that has been clicked
+        update_hover : highlight the cell or the button under the hand
         update_buttons_status : update the status of the buttons
         activate_validate_grid : activate the button "Validate grid" if the grid is completed
         activate_draw_digit : activate the button "Draw digit" if a cell is active and if it has not been drawn
         activate_delete_cell : activate the button "Delete cell" if there a cell is drawn and if it's not an initial cell
         click_on_buttons : check if the user has clicked on a button, and execute the action associated
+        wait_for_digit : keep the recognition started for the active cell, which shows that its digit is being recognized
+        apply_recognized_digit : give the digit recognized to its cell, if its recognition is over
+        release : stop the background thread of the recognition
         display_completion : display the message "Sudoku Completed" if the grid is completed
         is_validate : check if the sudoku grid is correct
         is_list_correct : check if a list of values is correct, which means not twice the same number and a max value of size_grid
     '''
 
-    def __init__(self, main_coordinates:list[int], list_cells_origin :list[list[int]]):
-        self.main_coordinates = main_coordinates
+    def __init__(self, layout:lo.Layout, list_cells_origin :list[list[int]], recognizer = None):
+        self.layout = layout
+        self.main_coordinates = layout.grid_coordinates
         self.list_cells_origin = list_cells_origin
+        self.recognizer = recognizer
         self.cells = np.ndarray((constants.MAIN_GRID_SIZE, constants.MAIN_GRID_SIZE), dtype=ic.Cell)
         self.buttons = np.ndarray(3, dtype=ib.Button)
         self.interface_digit = None
         self.completed = False
         self.active_cell = None
+        self.recognition = None
+        self.recognizing_cell = None
+        self.scene = sc.Scene()
+        self.nb_redrawn = 0
+        self.hit_test = None
+        self.hovered = None
         self.create_cells()
         self.create_buttons()
         self.create_interface_digit()
+        self.create_scene()
+        self.create_hit_test()
+
+    def update_layout(self, width : int, height : int) -> None:
+        '''Compute again the geometry of the interface if the size of the frames has changed (the first frames, or a new resolution of the source)'''
+        if not self.layout.matches(width, height):
+            self.set_layout(lo.Layout(width, height, self.layout.grid_size))
+            events.EVENTS.emit("layout_changed", x=width, y=height)
+
+    def set_layout(self, layout : lo.Layout) -> None:
+        '''Compute again the cached geometry for a new layout : coordinates of the cells and of the buttons, interface digit, scene and hit test.
+        The state of the game (values, active cell, status of the buttons) is kept.
+        '''
+        self.layout = layout
+        self.main_coordinates = layout.grid_coordinates
+        for cell in self.cells.flat:
+            cell.set_layout(layout)
+        for button, coordinates in zip(self.buttons, layout.grid_buttons_coordinates):
+            button.set_geometry(coordinates, layout.buttons_font_scale, layout.buttons_text_thickness)
+        self.interface_digit.set_layout(layout)
+        self.scene.clear()
+        self.create_scene()
+        self.create_hit_test()
 
     def create_cells(self) -> None:
         '''Create the objects "cell" of the grid'''
@@ -64,88 +119,116 @@ class Grid():
         for i in range(constants.MAIN_GRID_SIZE):
             for j in range(constants.MAIN_GRID_SIZE):
                 if self.list_cells_origin[i][j] != 0:
-                    self.cells[i][j] = ic.Cell((i, j), self.list_cells_origin[i][j], True)
+                    self.cells[i][j] = ic.Cell((i, j), self.layout, self.list_cells_origin[i][j], True)
                 else:
-                    self.cells[i][j] = ic.Cell((i, j))
+                    self.cells[i][j] = ic.Cell((i, j), self.layout)
 
     def create_buttons(self) -> None:
         '''Create the buttons of the sudoku interface'''
         # Create the button "Validate grid"
-        self.buttons[0] = ib.Button(constants.BUTTON_VALIDATE_GRID_COORDINATES, constants.BUTTON_VALIDATE_GRID_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_VALIDATE_GRID_TEXT, constants.BUTTONS_FONTSCALE, constants.BUTTONS_TEXT_THICKNESS, constants.BUTTON_VALIDATE_GRID_TEXT_COLOR_ACTIVE, constants.BUTTON_VALIDATE_GRID_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
+        self.buttons[0] = ib.Button(self.layout.grid_buttons_coordinates[0], constants.BUTTON_VALIDATE_GRID_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_VALIDATE_GRID_TEXT, self.layout.buttons_font_scale, self.layout.buttons_text_thickness, constants.BUTTON_VALIDATE_GRID_TEXT_COLOR_ACTIVE, constants.BUTTON_VALIDATE_GRID_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
 
         # Create the button "Draw digit"
-        self.buttons[1] = ib.Button(constants.BUTTON_DRAW_DIGIT_COORDINATES, constants.BUTTON_DRAW_DIGIT_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_DRAW_DIGIT_TEXT, constants.BUTTONS_FONTSCALE, constants.BUTTONS_TEXT_THICKNESS, constants.BUTTON_DRAW_DIGIT_TEXT_COLOR_ACTIVE, constants.BUTTON_DRAW_DIGIT_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
+        self.buttons[1] = ib.Button(self.layout.grid_buttons_coordinates[1], constants.BUTTON_DRAW_DIGIT_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_DRAW_DIGIT_TEXT, self.layout.buttons_font_scale, self.layout.buttons_text_thickness, constants.BUTTON_DRAW_DIGIT_TEXT_COLOR_ACTIVE, constants.BUTTON_DRAW_DIGIT_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
 
         # Create the button "Delete cell"
-        self.buttons[2] = ib.Button(constants.BUTTON_DELETE_CELL_COORDINATES, constants.BUTTON_DELETE_CELL_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_DELETE_CELL_TEXT, constants.BUTTONS_FONTSCALE, constants.BUTTONS_TEXT_THICKNESS, constants.BUTTON_DELETE_CELL_TEXT_COLOR_ACTIVE, constants.BUTTON_DELETE_CELL_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
+        self.buttons[2] = ib.Button(self.layout.grid_buttons_coordinates[2], constants.BUTTON_DELETE_CELL_COLOR, constants.BUTTONS_THICKNESS, constants.BUTTON_DELETE_CELL_TEXT, self.layout.buttons_font_scale, self.layout.buttons_text_thickness, constants.BUTTON_DELETE_CELL_TEXT_COLOR_ACTIVE, constants.BUTTON_DELETE_CELL_TEXT_COLOR_INACTIVE, constants.BUTTONS_TRANSPARENCY_ACTIVE, constants.BUTTONS_TRANSPARENCY_INACTIVE)
 
     def create_interface_digit(self):
         '''Create the interface to write the digit'''
-        self.interface_digit = id.InterfaceDigit(constants.MAIN_GRID_COORDINATES)
+        self.interface_digit = id.InterfaceDigit(self.layout, self.recognizer)
     
-    def draw_grid(self, screen: np.ndarray) -> None:
-        '''Draw the grid on the screen and the empty cells'''
+    def create_scene(self) -> None:
+        '''Create the scene of the sudoku interface : each element gives its state, and is drawn again only when it changes'''
         # Draw the cells
-        self.draw_cells(screen, constants.CELLS_THICKNESS, constants.CELL_TRANSPARENCY)
+        for cell in self.cells.flat:
+            self.scene.add("cell {} {}".format(*cell.position_in_grid), cell.get_region(), lambda cell=cell: (cell.is_active, cell.is_hovered), cell.draw_cell, "grid")
+
+        # Draw the main grid and its lines, which cover the half of its border drawn outside
+        margin = self.layout.main_grid_thickness//2 + 1
+        self.scene.add("grid", (self.main_coordinates[0] - margin, self.main_coordinates[1] + margin, self.main_coordinates[2] - margin, self.main_coordinates[3] + margin), lambda: True, self.draw_main_grid, "grid")
+
+        # Draw the buttons of the sudoku interface
+        for button in self.buttons:
+            self.scene.add("button " + button.text, button.get_region(), lambda button=button: (button.is_active, button.is_hovered), button.draw, "buttons")
+
+        # Draw the completion message, over the region of the longest message
+        origin = self.layout.completion_origin
+        glyphs = [gc.GLYPHS.get_glyph(text, cv2.FONT_HERSHEY_DUPLEX, self.layout.completion_font_scale, color, self.layout.completion_thickness) for text, color in (("Sudoku Completed !", constants.COMPLETION_COLOR_TRUE), ("Sudoku Wrong !", constants.COMPLETION_COLOR_FALSE))]
+        coordinates = (origin[0] + min(glyph.coordinates[0] for glyph in glyphs), origin[0] + max(glyph.coordinates[1] for glyph in glyphs), origin[1] + min(glyph.coordinates[2] for glyph in glyphs), origin[1] + max(glyph.coordinates[3] for glyph in glyphs))
+        self.scene.add("completion", coordinates, self.get_completion_state, self.display_completion, "completion")
 
+        # Draw the digits of the grid
+        for cell in self.cells.flat:
+            self.scene.add("digit {} {}".format(*cell.position_in_grid), cell.get_region(), lambda cell=cell: (cell.value, cell.initial, cell.is_recognizing), cell.display_cell, "grid")
+
+    def create_hit_test(self) -> None:
+        '''Create the index giving the cell or the button under a point, once for all the clicks and the positions of the hand'''
+        self.hit_test = ht.HitTestIndex(self.main_coordinates, constants.MAIN_GRID_SIZE, [button.coordinates for button in self.buttons])
+
+    def draw_grid(self, screen: np.ndarray) -> int:
+        '''Draw the grid, its digits, its buttons and the completion message on the screen. Only the elements that have changed
+        are drawn again in the layer of the scene, which is then blended in a single pass. Return the number of elements drawn again.
+        '''
+        return self.scene.draw(screen)
+
+    def draw_main_grid(self, layer : ov.Overlay) -> None:
+        '''Draw the main grid and its lines'''
         # Draw the main grid
-        cv2.rectangle(screen,(self.main_coordinates[0], self.main_coordinates[2]), (self.main_coordinates[1], self.main_coordinates[3]), constants.MAIN_GRID_COLOR, constants.MAIN_GRID_THICKNESS)
+        layer.rectangle((self.main_coordinates[0], self.main_coordinates[2]), (self.main_coordinates[1], self.main_coordinates[3]), constants.MAIN_GRID_COLOR, self.layout.main_grid_thickness)
 
         # Draw the main lines
         sqrt_sudoku_size = int(np.sqrt(constants.MAIN_GRID_SIZE))
-        self.draw_lines(screen, sqrt_sudoku_size, constants.MAIN_LINES_COLOR, constants.MAIN_LINES_THICKNESS)
+        self.draw_lines(layer, sqrt_sudoku_size, constants.MAIN_LINES_COLOR, self.layout.main_lines_thickness)
 
         # Draw the other lines
-        self.draw_lines(screen, constants.MAIN_GRID_SIZE, constants.OTHER_LINES_COLOR, constants.OTHER_LINES_THICKNESS)
+        self.draw_lines(layer, constants.MAIN_GRID_SIZE, constants.OTHER_LINES_COLOR, self.layout.other_lines_thickness)
 
-        # Draw the buttons of the sudoku interface
-        self.draw_buttons(screen)
-
-    def draw_lines(self, screen : np.ndarray, size : int, color : tuple[int], thickness : int) -> None:
+    def draw_lines(self, layer : ov.Overlay, size : int, color : tuple[int], thickness : int) -> None:
         '''Draw the main lines of the grid'''
         for i in range(size + 1):
             x = self.main_coordinates[0] + i * (self.main_coordinates[1] - self.main_coordinates[0]) // size
             y = self.main_coordinates[2] + i * (self.main_coordinates[3] - self.main_coordinates[2]) // size
-            cv2.line(screen, (x, self.main_coordinates[2]), (x, self.main_coordinates[3]), color, thickness)
-            cv2.line(screen, (self.main_coordinates[0], y), (self.main_coordinates[1], y), color, thickness)
+            layer.line((x, self.main_coordinates[2]), (x, self.main_coordinates[3]), color, thickness)
+            layer.line((self.main_coordinates[0], y), (self.main_coordinates[1], y), color, thickness)
 
-    def draw_cells(self, screen : np.ndarray, thickness : int, transparency : float) -> None:
-        '''Draw the cells of the grid'''
-        for i in range(constants.MAIN_GRID_SIZE):
-            for j in range(constants.MAIN_GRID_SIZE):
-                xmin = self.main_coordinates[0] + i * (self.main_coordinates[1] - self.main_coordinates[0]) // constants.MAIN_GRID_SIZE
-                xmax = self.main_coordinates[0] + (i + 1) * (self.main_coordinates[1] - self.main_coordinates[0]) // constants.MAIN_GRID_SIZE
-                ymin = self.main_coordinates[2] + j * (self.main_coordinates[3] - self.main_coordinates[2]) // constants.MAIN_GRID_SIZE
-                ymax = self.main_coordinates[2] + (j + 1) * (self.main_coordinates[3] - self.main_coordinates[2]) // constants.MAIN_GRID_SIZE
-                screen1 = screen.copy()
-                if self.cells[j][i].is_active:
-                    color = constants.CELLS_COLOR_ACTIVE
-                else:
-                    color = constants.CELLS_COLOR
-                cv2.rectangle(screen1, (xmin, ymin), (xmax, ymax), color, thickness)
-                cv2.addWeighted(screen1, transparency, screen, 1 - transparency, 0, screen)
-
-    def draw_buttons(self, screen : np.ndarray) -> None:
-        '''Draw the buttons of the sudoku interface'''
-        for i in range(len(self.buttons)):
-            self.buttons[i].draw(screen)
+    def get_completion_state(self) -> tuple[bool]:
+        '''Return the state of the completion message : shown or not, and correct or not'''
+        return (self.completed, self.completed and self.is_validate())
 
-    def display_digits_grid(self, screen : np.ndarray) -> None:
-        '''Display the digits of the grid'''
-        for i in range(constants.MAIN_GRID_SIZE):
-            for j in range(constants.MAIN_GRID_SIZE):
-                self.cells[i][j].display_cell(screen)
+    def get_render_stats(self) -> dict:
+        '''Return the number of elements drawn again, in the grid and in the interface digit (during the last frame, and per frame on average)'''
+        nb_frames = self.scene.nb_frames + self.interface_digit.scene.nb_frames
+        total_redrawn = self.scene.total_redrawn + self.interface_digit.scene.total_redrawn
+        return {"redrawn": self.nb_redrawn, "redrawn_per_frame": total_redrawn / nb_frames if nb_frames else 0.0}
 
     def find_clicked_cell(self, coordinates_click: tuple[int]) -> None:
-        '''Find the cell that has been clicked'''
-        for i in range(constants.MAIN_GRID_SIZE):
-            for j in range(constants.MAIN_GRID_SIZE):
-                if self.cells[i][j].is_clicked(coordinates_click):
-                    if not self.active_cell is None:
-                        self.active_cell.is_active = False
-                    self.cells[i][j].is_active = True
-                    self.active_cell = self.cells[i][j]
-                    break
+        '''Find the cell that has been clicked. An initial cell cannot be clicked.'''
+        position = self.hit_test.find_cell(coordinates_click)
+        if position is None or self.cells[position].initial:
+            return
+        i, j = position
+        if not self.active_cell is None:
+            self.active_cell.is_active = False
+        self.cells[i][j].is_active = True
+        self.active_cell = self.cells[i][j]
+        events.EVENTS.emit("cell_selected", x=i, y=j)
+
+    def update_hover(self, coordinates_hand: tuple[int]) -> None:
+        '''Highlight the cell (if it can be clicked) or the button under the hand'''
+        target = self.hit_test.hover(coordinates_hand)
+        if target is None:
+            hovered = None
+        elif target[0] == "button":
+            hovered = self.buttons[target[1]]
+        else:
+            hovered = self.cells[target[1]] if not self.cells[target[1]].initial else None
+        if hovered is not self.hovered:
+            if self.hovered is not None:
+                self.hovered.is_hovered = False
+            if hovered is not None:
+                hovered.is_hovered = True
+            self.hovered = hovered
         
     def update_buttons_status(self) -> None:
         '''Return the status of the buttons'''
@@ -163,8 +246,8 @@ class Grid():
         return True
 
     def activate_draw_digit(self) -> bool:
-        '''Activate the button "Draw digit" if a cell is active and if it has not been drawn'''
-        if self.active_cell is not None and self.active_cell.is_active and not self.active_cell.is_drawn:
+        '''Activate the button "Draw digit" if a cell is active and if it has not been drawn, once the previous digit is recognized'''
+        if self.active_cell is not None and self.active_cell.is_active and not self.active_cell.is_drawn and self.recognition is None:
             return True
         return False
 
@@ -176,26 +259,68 @@ class Grid():
     
     def click_on_buttons(self, coordinates_click : tuple[int]) -> None:
         '''Check if the user has clicked on a button, and execute the action associated'''
-        for i in range(len(self.buttons)):
-            if self.buttons[i].is_active and self.buttons[i].is_clicked(coordinates_click):
-                if i == 0:
-                    self.completed = True
-                    if self.active_cell is not None:
-                        self.active_cell.is_active = False
-                        self.active_cell = None
-                elif i == 1:
-                    self.interface_digit.initialize_interface()
-                elif i == 2:
-                    self.active_cell.erase_cell()
-                    self.active_cell.is_active = False
-                    self.active_cell = None
-    
-    def display_completion(self, screen : np.ndarray) -> None:
+        i = self.hit_test.find_button(coordinates_click)
+        if i is None or not self.buttons[i].is_active:
+            return
+        if i == 0:
+            self.completed = True
+            events.EVENTS.emit("grid_validated", value=int(self.is_validate()))
+            if self.active_cell is not None:
+                self.active_cell.is_active = False
+                self.active_cell = None
+        elif i == 1:
+            self.interface_digit.initialize_interface()
+        elif i == 2:
+            self.active_cell.erase_cell()
+            self.active_cell.is_active = False
+            self.active_cell = None
+
+    def wait_for_digit(self, recognition : concurrent.futures.Future) -> None:
+        '''Keep the recognition started for the active cell, which shows that its digit is being recognized until it arrives'''
+        self.recognition = recognition
+        self.recognizing_cell = self.active_cell
+        if self.recognizing_cell is not None:
+            self.recognizing_cell.is_recognizing = True
+
+    def apply_recognized_digit(self) -> None:
+        '''Give the digit recognized to its cell if its recognition is over, without waiting for it.
+        The cell stays active if no digit has been recognized (the model server did not answer in time, or the recognition failed).
+        '''
+        if self.recognition is None or not self.recognition.done():
+            return
+        recognition, cell = self.recognition, self.recognizing_cell
+        self.recognition = None
+        self.recognizing_cell = None
+        if cell is not None:
+            cell.is_recognizing = False
+        try:
+            digit = recognition.result()
+        except Exception:
+            # A missing model or an error of TensorFlow must not stop the game : the digit can be drawn again
+            digit = None
+            if cell is not None:
+                events.EVENTS.emit("recognition_failed", x=cell.position_in_grid[0], y=cell.position_in_grid[1])
+        self.interface_digit.digit = digit
+        if digit is None or cell is None:
+            return
+        events.EVENTS.emit("digit_recognized", value=int(digit))
+        cell.value = digit
+        cell.is_active = False
+        if self.active_cell is cell:
+            self.active_cell = None
+
+    def release(self) -> None:
+        '''Stop the background thread of the recognition'''
+        self.interface_digit.worker.shutdown()
+
+    def display_completion(self, layer : ov.Overlay) -> None:
         '''Display the message "Sudoku Completed" if the grid is completed'''
+        if not self.completed:
+            return
         if self.is_validate():
-            cv2.putText(screen, "Sudoku Completed !", (constants.WIDTH_CAMERA//10, constants.HEIGHT_CAMERA//2), cv2.FONT_HERSHEY_DUPLEX, constants.COMPLETION_FONTSCALE, constants.COMPLETION_COLOR_TRUE, constants.COMPLETION_THICKNESS, cv2.LINE_AA)
+            layer.text("Sudoku Completed !", self.layout.completion_origin, cv2.FONT_HERSHEY_DUPLEX, self.layout.completion_font_scale, constants.COMPLETION_COLOR_TRUE, self.layout.completion_thickness)
         else:
-            cv2.putText(screen, "Sudoku Wrong !", (constants.WIDTH_CAMERA//10, constants.HEIGHT_CAMERA//2), cv2.FONT_HERSHEY_DUPLEX, constants.COMPLETION_FONTSCALE, constants.COMPLETION_COLOR_FALSE, constants.COMPLETION_THICKNESS, cv2.LINE_AA)
+            layer.text("Sudoku Wrong !", self.layout.completion_origin, cv2.FONT_HERSHEY_DUPLEX, self.layout.completion_font_scale, constants.COMPLETION_COLOR_FALSE, self.layout.completion_thickness)
 
     def is_validate(self) -> bool:
         '''Check if the sudoku grid is correct'''
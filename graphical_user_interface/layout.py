@@ -0,0 +1,123 @@
+import numpy as np
+
+from graphical_user_interface import constants
+
+
+def parse_resolution(text: str) -> tuple[int]:
+    '''This function reads a resolution given on the command line.
+
+    Parameters :
+        text (str) : resolution, as WIDTHxHEIGHT (for example 640x360)
+
+    Returns :
+        resolution (tuple[int]) : width and height
+    '''
+    try:
+        width, height = (int(value) for value in text.lower().split("x"))
+    except ValueError:
+        raise ValueError("The resolution must be given as WIDTHxHEIGHT : {}".format(text))
+    if width <= 0 or height <= 0:
+        raise ValueError("The resolution must be positive : {}".format(text))
+    return width, height
+
+
+class Layout():
+    '''This class computes the geometry of the interface from the size of the frames and the size of the grid, at runtime :
+    the rectangles of the grid, of the cells, of the buttons and of the digit interface, and the font scales and thicknesses.
+    The interface is placed in a canvas of the aspect ratio LAYOUT_ASPECT_RATIO, as large as possible and centered in the frame.
+    For a canvas of LAYOUT_REFERENCE_HEIGHT pixels (frames of 1280x720), the geometry is exactly the one the interface was designed for,
+    and the font scales and thicknesses of the constants are used as they are : they are scaled with the height of the canvas otherwise.
+
+    Attributes :
+        width (int) : width of the frames
+        height (int) : height of the frames
+        grid_size (int) : number of rows and columns of the grid
+        canvas_coordinates (tuple[int]) : region of the frame in which the interface is placed (x_min, x_max, y_min, y_max)
+        scale (float) : ratio between the height of the canvas and LAYOUT_REFERENCE_HEIGHT
+        grid_coordinates (list[int]) : coordinates of the main grid (x_min, x_max, y_min, y_max)
+        panel_coordinates (list[int]) : coordinates of the digit interface, over the grid
+        grid_buttons_coordinates (list[list[int]]) : coordinates of the buttons of the grid : validate grid, draw digit, delete cell
+        digit_buttons_coordinates (list[list[int]]) : coordinates of the buttons of the digit interface : validate digit, erase digit
+        buttons_font_scale (float) : font scale of the texts of the buttons
+        buttons_text_thickness (int) : thickness of the texts of the buttons
+        digits_font_scale (float) : font scale of the digits of the grid
+        digits_thickness (int) : thickness of the digits of the grid
+        main_grid_thickness (int) : thickness of the border of the grid
+        main_lines_thickness (int) : thickness of the lines between the squares of the grid
+        other_lines_thickness (int) : thickness of the lines between the cells
+        completion_origin (tuple[int]) : origin of the completion message
+        completion_font_scale (float) : font scale of the completion message
+        completion_thickness (int) : thickness of the completion message
+        radius_pixels (int) : radius of the brush drawing the digit
+
+    Methods :
+        calculate_canvas : calculate the region of the frame in which the interface is placed
+        calculate_button : calculate the coordinates of a button on the right of the grid
+        scale_thickness : return a thickness scaled with the canvas
+        get_size_cell : return the size of a cell
+        get_cell_coordinates : return the coordinates of a cell
+        matches : return True if the layout has been computed for this size of frame
+    '''
+
+    def __init__(self, width: int, height: int, grid_size: int = None):
+        self.width = width
+        self.height = height
+        self.grid_size = constants.MAIN_GRID_SIZE if grid_size is None else grid_size
+        self.canvas_coordinates = self.calculate_canvas()
+        x_min, x_max, y_min, y_max = self.canvas_coordinates
+        canvas_width, canvas_height = x_max - x_min, y_max - y_min
+        self.scale = canvas_height / constants.LAYOUT_REFERENCE_HEIGHT
+
+        # The grid is in the middle of the canvas, and the buttons on its right
+        self.grid_coordinates = [x_min + canvas_width//2 - canvas_height//2, x_min + canvas_width//2 + canvas_height//2, y_min + canvas_height//20, y_min + 19*canvas_height//20]
+        self.panel_coordinates = list(self.grid_coordinates)
+        self.grid_buttons_coordinates = [self.calculate_button(1/7, 2/7), self.calculate_button(3/7, 4/7), self.calculate_button(5/7, 6/7)]
+        self.digit_buttons_coordinates = [self.calculate_button(1/5, 2/5), self.calculate_button(3/5, 4/5)]
+
+        # Texts and lines
+        sqrt_grid_size = np.sqrt(self.grid_size)
+        self.buttons_font_scale = constants.BUTTONS_FONTSCALE*self.scale
+        self.buttons_text_thickness = self.scale_thickness(constants.BUTTONS_TEXT_THICKNESS)
+        self.digits_font_scale = (4 - sqrt_grid_size if sqrt_grid_size < 3 else 1)*self.scale
+        self.digits_thickness = self.scale_thickness(constants.DIGITS_THICKNESS)
+        self.main_grid_thickness = self.scale_thickness(constants.MAIN_GRID_THICKNESS)
+        self.main_lines_thickness = self.scale_thickness(constants.MAIN_LINES_THICKNESS)
+        self.other_lines_thickness = self.scale_thickness(constants.OTHER_LINES_THICKNESS)
+        self.completion_origin = (x_min + canvas_width//10, y_min + canvas_height//2)
+        self.completion_font_scale = constants.COMPLETION_FONTSCALE*self.scale
+        self.completion_thickness = self.scale_thickness(constants.COMPLETION_THICKNESS)
+        self.radius_pixels = self.scale_thickness(constants.RADIUS_PIXELS)
+
+    def calculate_canvas(self) -> tuple[int]:
+        '''Calculate the region of the frame in which the interface is placed : the largest region of the aspect ratio of the layout, centered'''
+        ratio_width, ratio_height = constants.LAYOUT_ASPECT_RATIO
+        if self.width*ratio_height >= self.height*ratio_width:
+            canvas_width, canvas_height = self.height*ratio_width//ratio_height, self.height
+        else:
+            canvas_width, canvas_height = self.width, self.width*ratio_height//ratio_width
+        x_min, y_min = (self.width - canvas_width)//2, (self.height - canvas_height)//2
+        return (x_min, x_min + canvas_width, y_min, y_min + canvas_height)
+
+    def calculate_button(self, top: float, bottom: float) -> list[int]:
+        '''Calculate the coordinates of a button on the right of the grid, between two fractions of the height of the grid'''
+        x_max = self.canvas_coordinates[1]
+        grid_x_max, grid_y_min, grid_y_max = self.grid_coordinates[1], self.grid_coordinates[2], self.grid_coordinates[3]
+        return [int(1/20*(x_max - grid_x_max)) + grid_x_max, int(19/20*(x_max - grid_x_max)) + grid_x_max, grid_y_min + int(top*(grid_y_max - grid_y_min)), grid_y_min + int(bottom*(grid_y_max - grid_y_min))]
+
+    def scale_thickness(self, thickness: int) -> int:
+        '''Return a thickness of the reference canvas scaled with the canvas, at least one pixel'''
+        return max(int(round(thickness*self.scale)), 1)
+
+    def get_size_cell(self) -> int:
+        '''Return the size of a cell'''
+        return (self.grid_coordinates[1] - self.grid_coordinates[0]) // self.grid_size
+
+    def get_cell_coordinates(self, position_in_grid: tuple[int]) -> tuple[int]:
+        '''Return the coordinates of the cell at a position of the grid (row, column)'''
+        x_min, x_max, y_min, y_max = self.grid_coordinates
+        row, column = position_in_grid
+        return (x_min + column*(x_max - x_min)//self.grid_size, x_min + (column + 1)*(x_max - x_min)//self.grid_size, y_min + row*(y_max - y_min)//self.grid_size, y_min + (row + 1)*(y_max - y_min)//self.grid_size)
+
+    def matches(self, width: int, height: int) -> bool:
+        '''Return True if the layout has been computed for frames of this size'''
+        return self.width == width and self.height == height
@@ -1,7 +1,6 @@
 import numpy as np
 
 from graphical_user_interface import interface_grid as ig
-from graphical_user_interface import global_variable as gv
 
 
 def main_interface(img:np.ndarray, grid:ig, coordinates_click: tuple[int], coordinates_hand: tuple[int]) -> np.ndarray:
@@ -16,14 +15,21 @@ def main_interface(img:np.ndarray, grid:ig, coordinates_click: tuple[int], coord
     Returns :
         img (np.ndarray) : image on which we draw the interface
     '''
+    # The geometry of the interface follows the size of the frames (only computed again when it changes)
+    grid.update_layout(img.shape[1], img.shape[0])
+
     if grid.interface_digit.is_active:
-        # We draw the main digit interface
-        grid.interface_digit.draw_main(img)
+        # We draw the main digit interface (only the elements that have changed are rendered again)
+        grid.interface_digit.update_hover(coordinates_hand)
+        grid.nb_redrawn = grid.interface_digit.draw_main(img)
 
         if coordinates_click is not None:
             grid.interface_digit.click_on_grid(coordinates_click)
 
-            gv.digit = grid.interface_digit.click_on_buttons(coordinates_click)
+            # The digit is recognized in the background : the cell shows that it is being recognized, the frames go on
+            recognition = grid.interface_digit.click_on_buttons(coordinates_click)
+            if recognition is not None:
+                grid.wait_for_digit(recognition)
 
         else:
             grid.interface_digit.draw_digit(img, coordinates_hand)  
@@ -31,20 +37,12 @@ def main_interface(img:np.ndarray, grid:ig, coordinates_click: tuple[int], coord
         grid.interface_digit.update_buttons_status()      
 
     else:
-        # We draw the grid
-        grid.draw_grid(img)
-
-        if gv.digit is not None:
-            if grid.active_cell is not None:
-                grid.active_cell.value = gv.digit
-                grid.active_cell.is_active = False
-                grid.active_cell = None
-
-        if grid.completed:
-            grid.display_completion(img)
-
+        # The digit recognized in the background is given to its cell as soon as it arrives
+        grid.apply_recognized_digit()
 
-        grid.display_digits_grid(img)
+        # We draw the grid, its digits, its buttons and the completion message (only the elements that have changed are rendered again)
+        grid.update_hover(coordinates_hand)
+        grid.nb_redrawn = grid.draw_grid(img)
 
         # We check where the click is (if there was one)
         if coordinates_click is not None:
@@ -53,7 +51,6 @@ def main_interface(img:np.ndarray, grid:ig, coordinates_click: tuple[int], coord
             grid.click_on_buttons(coordinates_click)
 
         grid.update_buttons_status()  
-        gv.digit = None
 
     return img
 
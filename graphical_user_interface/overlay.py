@@ -0,0 +1,132 @@
+import numpy as np
+import cv2
+
+from graphical_user_interface import glyph_cache as gc
+
+
+class Overlay():
+    '''This class is a pre-rendered layer of the interface, composited onto the camera frame in a single blend limited to its region (ROI).
+    Its shapes are drawn once, each one with its transparency, into a premultiplied color image and the fraction of the frame kept
+    under it : compositing the layer gives the same result as drawing the shapes one after the other with cv2.addWeighted,
+    without copying and blending the full frame for each shape.
+    A part of the layer can be drawn again alone : after reset(coordinates), the shapes are clipped to this part.
+
+    Attributes :
+        coordinates (tuple[int]) : region of the layer in the frame (x_min, x_max, y_min, y_max), excluded maximums
+        color (np.ndarray) : premultiplied color of the layer, of shape (height, width, 3)
+        keep (np.ndarray) : fraction of the frame kept under the layer, of shape (height, width, 3)
+        mask (np.ndarray) : buffer in which each shape is drawn, its values being the opacity of the shape (anti-aliased edges)
+        buffer (np.ndarray) : buffer used to blend the region of the frame
+        clip (tuple[slice]) : part of the layer to which the shapes are limited (rows, columns)
+        is_blank (bool) : True if no shape has been drawn since the whole layer was reset, it does not need to be composited
+
+    Methods :
+        reset : remove all the shapes of the layer, or only those of a part of it
+        get_origin : return the point of the frame at the top left corner of the part drawn
+        get_area : return the part of the mask covered by a shape
+        add_mask : add the shape drawn in the mask, with its color and its transparency
+        rectangle : add a rectangle to the layer
+        line : add a line to the layer
+        text : add an anti-aliased text to the layer, from the glyph cache
+        composite : blend the layer onto the frame, in its region only
+    '''
+
+    def __init__(self, coordinates: tuple[int]):
+        self.coordinates = coordinates
+        height, width = coordinates[3] - coordinates[2], coordinates[1] - coordinates[0]
+        self.color = np.zeros((height, width, 3), dtype=np.float32)
+        self.keep = np.ones((height, width, 3), dtype=np.float32)
+        self.mask = np.zeros((height, width), dtype=np.uint8)
+        self.buffer = np.zeros((height, width, 3), dtype=np.float32)
+        self.clip = (slice(0, height), slice(0, width))
+        self.is_blank = True
+
+    def reset(self, coordinates: tuple[int] = None) -> None:
+        '''Remove all the shapes of the layer, or only those of the region given (x_min, x_max, y_min, y_max in the frame).
+        The shapes added afterwards are clipped to this region, so that it is drawn again without touching the rest of the layer.
+        '''
+        height, width = self.color.shape[:2]
+        if coordinates is None:
+            self.clip = (slice(0, height), slice(0, width))
+        else:
+            x0, x1 = min(max(coordinates[0] - self.coordinates[0], 0), width), min(max(coordinates[1] - self.coordinates[0], 0), width)
+            y0, y1 = min(max(coordinates[2] - self.coordinates[2], 0), height), min(max(coordinates[3] - self.coordinates[2], 0), height)
+            self.clip = (slice(y0, y1), slice(x0, x1))
+        self.color[self.clip] = 0
+        self.keep[self.clip] = 1
+        # The layer is only known to be blank when all of it is reset
+        if self.clip == (slice(0, height), slice(0, width)):
+            self.is_blank = True
+
+    def get_origin(self) -> tuple[int]:
+        '''Return the point of the frame at the top left corner of the part drawn : the shapes are drawn in the mask relatively to it'''
+        return self.coordinates[0] + self.clip[1].start, self.coordinates[2] + self.clip[0].start
+
+    def get_area(self, x_min: int, x_max: int, y_min: int, y_max: int) -> tuple[slice]:
+        '''Return the part of the mask covered by a shape (bounding box given relatively to the origin of the part drawn), None if it is empty'''
+        mask = self.mask[self.clip]
+        x0, y0 = max(x_min, 0), max(y_min, 0)
+        x1, y1 = min(x_max, mask.shape[1]), min(y_max, mask.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return (slice(y0, y1), slice(x0, x1))
+
+    def add_mask(self, color: tuple[int], transparency: float, area: tuple[slice]) -> None:
+        '''Add the shape drawn in the area of the mask over the previous shapes, like cv2.addWeighted(shape, transparency, frame, 1 - transparency)'''
+        mask, color_area, keep_area = self.mask[self.clip][area], self.color[self.clip][area], self.keep[self.clip][area]
+        # The opacity of the anti-aliased edges is given by the mask (0 outside of the shape, where nothing changes)
+        alpha = mask[:, :, None]*np.float32(transparency/255)
+        opposite = 1 - alpha
+        np.multiply(color_area, opposite, out=color_area)
+        color_area += alpha*np.asarray(color, dtype=np.float32)
+        keep_area *= opposite
+        mask[:] = 0
+        self.is_blank = False
+
+    def rectangle(self, pt1: tuple[int], pt2: tuple[int], color: tuple[int], thickness: int, transparency: float = 1.0) -> None:
+        '''Add a rectangle to the layer (points given in the frame)'''
+        x, y = self.get_origin()
+        margin = max(thickness, 0)//2 + 1
+        area = self.get_area(min(pt1[0], pt2[0]) - x - margin, max(pt1[0], pt2[0]) - x + margin + 1, min(pt1[1], pt2[1]) - y - margin, max(pt1[1], pt2[1]) - y + margin + 1)
+        if area is not None:
+            # The shape is drawn in its area only, so that the mask is cleared entirely afterwards
+            x, y = x + area[1].start, y + area[0].start
+            cv2.rectangle(self.mask[self.clip][area], (pt1[0] - x, pt1[1] - y), (pt2[0] - x, pt2[1] - y), 255, thickness)
+            self.add_mask(color, transparency, area)
+
+    def line(self, pt1: tuple[int], pt2: tuple[int], color: tuple[int], thickness: int, transparency: float = 1.0) -> None:
+        '''Add a line to the layer (points given in the frame)'''
+        x, y = self.get_origin()
+        margin = thickness//2 + 1
+        area = self.get_area(min(pt1[0], pt2[0]) - x - margin, max(pt1[0], pt2[0]) - x + margin + 1, min(pt1[1], pt2[1]) - y - margin, max(pt1[1], pt2[1]) - y + margin + 1)
+        if area is not None:
+            x, y = x + area[1].start, y + area[0].start
+            cv2.line(self.mask[self.clip][area], (pt1[0] - x, pt1[1] - y), (pt2[0] - x, pt2[1] - y), 255, thickness)
+            self.add_mask(color, transparency, area)
+
+    def text(self, text: str, origin: tuple[int], font: int, font_scale: float, color: tuple[int], thickness: int, transparency: float = 1.0) -> None:
+        '''Add an anti-aliased text to the layer (origin given in the frame), like cv2.putText with cv2.LINE_AA. It is rasterized once, in the glyph cache.'''
+        glyph = gc.GLYPHS.get_glyph(text, font, font_scale, color, thickness)
+        x, y = self.get_origin()
+        x_min, y_min = glyph.coordinates[0] + origin[0] - x, glyph.coordinates[2] + origin[1] - y
+        # The glyph is clipped to the part drawn
+        area = self.get_area(x_min, glyph.coordinates[1] + origin[0] - x, y_min, glyph.coordinates[3] + origin[1] - y)
+        if area is not None:
+            self.mask[self.clip][area] = glyph.patch[area[0].start - y_min:area[0].stop - y_min, area[1].start - x_min:area[1].stop - x_min, 3]
+            self.add_mask(color, transparency, area)
+
+    def composite(self, screen: np.ndarray) -> None:
+        '''Blend the layer onto the frame, in its region only : frame = color + keep * frame'''
+        x_min, x_max, y_min, y_max = self.coordinates
+        # The region is clipped to the frame
+        x0, y0 = max(x_min, 0), max(y_min, 0)
+        x1, y1 = min(x_max, screen.shape[1]), min(y_max, screen.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = screen[y0:y1, x0:x1]
+        region = (slice(y0 - y_min, y1 - y_min), slice(x0 - x_min, x1 - x_min))
+        # The operations of OpenCV are vectorized and run on several threads, much faster than numpy on large regions
+        buffer = cv2.multiply(roi, self.keep[region], self.buffer[region], dtype=cv2.CV_32F)
+        buffer = cv2.add(buffer, self.color[region], buffer)
+        # Rounded to the nearest integer, like cv2.addWeighted, and written directly into the frame (no image allocated per frame)
+        cv2.convertScaleAbs(buffer, roi)
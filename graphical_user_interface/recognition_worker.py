@@ -0,0 +1,47 @@
+import concurrent.futures
+
+import numpy as np
+
+from utils import profiling
+
+
+class RecognitionWorker():
+    '''This class recognizes the digits in a background thread, so the video loop never waits for the model :
+    an image is submitted, and a future gives its digit when the recognition is over.
+    A thread is enough : TensorFlow releases the GIL during the inference, and the client of the model server only waits for its answer.
+    The images are recognized one after the other, in the order they are submitted.
+
+    Attributes :
+        recognizer (Callable) : function returning the digit of an image (the model server in a session), main_digit_recognition if None
+        executor (concurrent.futures.ThreadPoolExecutor) : thread of the recognition, created with the first image submitted
+
+    Methods :
+        submit : start the recognition of an image in the background and return its future
+        recognize : return the digit of an image (called in the thread of the recognition)
+        shutdown : stop the thread of the recognition, the recognitions not started being cancelled
+    '''
+
+    def __init__(self, recognizer = None):
+        self.recognizer = recognizer
+        self.executor = None
+
+    def submit(self, img : np.ndarray) -> concurrent.futures.Future:
+        '''Start the recognition of an image in the background and return its future, whose result is the digit'''
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="recognition")
+        return self.executor.submit(self.recognize, img)
+
+    def recognize(self, img : np.ndarray) -> int:
+        '''Return the digit of an image. The duration is measured in the thread of the recognition, outside of the frames.'''
+        with profiling.PROFILER.span("recognition"):
+            if self.recognizer is None:
+                # TensorFlow is only imported by the processes that recognize the digits themselves
+                from digit_recognition import main_digit_recognition as mdr
+                return mdr.main_digit_recognition(img, "main")
+            return self.recognizer(img)
+
+    def shutdown(self) -> None:
+        '''Stop the thread of the recognition, the recognitions not started being cancelled'''
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,124 @@
+from typing import Callable
+
+import numpy as np
+
+from graphical_user_interface import compositor as co
+
+
+class SceneElement():
+    '''This class is an element of a scene (a cell, a line, a button, a message) : its region, its state, and the function drawing it.
+
+    Attributes :
+        name (str) : name of the element
+        coordinates (tuple[int]) : region of the frame covered by the element (x_min, x_max, y_min, y_max), excluded maximums
+        get_state (Callable) : function returning the state of the element : it is drawn again when its state changes
+        render (Callable) : function drawing the element into a layer
+        group (str) : group of the element, whose layer it is drawn into
+        state : state of the element when it was drawn (None before the first drawing)
+
+    Methods :
+        intersects : return True if the element covers a part of the region given, in the layer of a group
+    '''
+
+    def __init__(self, name: str, coordinates: tuple[int], get_state: Callable, render: Callable, group: str):
+        self.name = name
+        self.coordinates = coordinates
+        self.get_state = get_state
+        self.render = render
+        self.group = group
+        self.state = None
+
+    def intersects(self, coordinates: tuple[int], group: str) -> bool:
+        '''Return True if the element covers a part of the region given, in the layer of the group given'''
+        return self.group == group and self.coordinates[0] < coordinates[1] and coordinates[0] < self.coordinates[1] and self.coordinates[2] < coordinates[3] and coordinates[2] < self.coordinates[3]
+
+
+class Scene():
+    '''This class keeps an interface rendered (retained mode) : its elements are drawn into the layer of their group, and only the elements
+    whose state has changed (with the elements above or below them in their region) are drawn again.
+    The layers are then composited onto each frame, each one in the region of its group. The dynamic elements (landmarks, stroke) are drawn above them afterwards.
+
+    Attributes :
+        elements (list[SceneElement]) : elements of the scene, from the bottom to the top
+        compositor (co.Compositor) : layers in which the elements are rendered, one per group (created with the first frame)
+        nb_redrawn (int) : number of elements drawn again during the last frame
+        total_redrawn (int) : number of elements drawn again since the start
+        nb_frames (int) : number of frames drawn
+
+    Methods :
+        add : add an element above the others
+        clear : remove all the elements and the layers, the statistics being kept
+        get_dirty : return the elements whose state has changed, and memorize their new state
+        render : draw again the elements covering the regions of the elements that have changed
+        draw : render the elements that have changed and composite the layers onto the frame
+        get_stats : return the number of elements drawn again
+    '''
+
+    def __init__(self):
+        self.elements = []
+        self.compositor = None
+        self.nb_redrawn = 0
+        self.total_redrawn = 0
+        self.nb_frames = 0
+
+    def add(self, name: str, coordinates: tuple[int], get_state: Callable, render: Callable, group: str) -> SceneElement:
+        '''Add an element above the others, in the layer of its group (the groups are composited in the order of their first element)'''
+        element = SceneElement(name, tuple(coordinates), get_state, render, group)
+        self.elements.append(element)
+        self.compositor = None
+        return element
+
+    def clear(self) -> None:
+        '''Remove all the elements and the layers (when the layout changes), the statistics being kept : the elements added afterwards are all drawn with the next frame'''
+        self.elements = []
+        self.compositor = None
+
+    def get_dirty(self) -> list[SceneElement]:
+        '''Return the elements whose state has changed since they were drawn, and memorize their new state'''
+        dirty = []
+        for element in self.elements:
+            state = element.get_state()
+            if state != element.state:
+                element.state = state
+                dirty.append(element)
+        return dirty
+
+    def render(self, dirty: list[SceneElement]) -> int:
+        '''Draw again the region of each element that has changed : the elements covering this region are drawn again in order,
+        clipped to it. The whole layer is drawn again if most of the elements have changed. Return the number of elements drawn.
+        '''
+        if self.compositor is None:
+            groups = {}
+            for element in self.elements:
+                groups.setdefault(element.group, []).append(element.coordinates)
+            self.compositor = co.Compositor(groups)
+            dirty = self.elements
+
+        if 2*len(dirty) > len(self.elements):
+            self.compositor.reset()
+            for element in self.elements:
+                element.render(self.compositor.get_layer(element.group))
+            return len(self.elements)
+
+        nb_redrawn = 0
+        for dirty_element in dirty:
+            layer = self.compositor.get_layer(dirty_element.group)
+            layer.reset(dirty_element.coordinates)
+            for element in self.elements:
+                if element.intersects(dirty_element.coordinates, dirty_element.group):
+                    element.render(layer)
+                    nb_redrawn += 1
+        return nb_redrawn
+
+    def draw(self, screen: np.ndarray) -> int:
+        '''Render the elements that have changed, composite the layers onto the frame, and return the number of elements drawn again'''
+        dirty = self.get_dirty()
+        self.nb_redrawn = self.render(dirty) if dirty or self.compositor is None else 0
+        self.compositor.composite(screen)
+        self.total_redrawn += self.nb_redrawn
+        self.nb_frames += 1
+        return self.nb_redrawn
+
+    def get_stats(self) -> dict:
+        '''Return the number of elements of the scene, drawn again during the last frame and per frame on average'''
+        return {"elements": len(self.elements), "redrawn": self.nb_redrawn, "redrawn_per_frame": self.total_redrawn / self.nb_frames if self.nb_frames else 0.0}
@@ -0,0 +1,120 @@
+import numpy as np
+import cv2
+
+from graphical_user_interface import constants
+
+
+class Stroke():
+    '''This class records the digit drawn as a polyline : the smoothed positions of the hand with their time, in a compact float32 array.
+    The positions are grouped in segments : a new segment starts when the hand has been lost for more than max_gap seconds.
+    A shorter loss (a few frames dropped) is bridged by the straight line between the two positions, which interpolates the missing ones.
+    The polyline is rasterized directly into a small image for the recognition, like the digits of MNIST.
+
+    Attributes :
+        points (np.ndarray) : positions (x, y) and time of the points, of shape (capacity, 3), doubled when it is full
+        nb_points (int) : number of points recorded
+        segments (list[int]) : index of the first point of each segment
+        smoothing (float) : weight of a new position against the previous point (1 for no smoothing)
+        max_gap (float) : time (in seconds) without position after which a new segment starts
+        is_interrupted (bool) : True if the next position starts a new segment
+
+    Methods :
+        add_point : record a new position of the hand and return the segment to draw
+        interrupt : start a new segment with the next position
+        clear : remove all the points
+        is_empty : return True if no point has been recorded
+        get_segments : return the points (x, y) of each segment
+        rasterize : draw the polyline into a small image centered like the digits of MNIST
+    '''
+
+    def __init__(self, smoothing: float = constants.STROKE_SMOOTHING, max_gap: float = constants.STROKE_MAX_GAP, capacity: int = constants.STROKE_CAPACITY):
+        self.points = np.zeros((capacity, 3), dtype=np.float32)
+        self.nb_points = 0
+        self.segments = []
+        self.smoothing = smoothing
+        self.max_gap = max_gap
+        self.is_interrupted = True
+
+    def add_point(self, position: tuple[int], timestamp: float) -> tuple[np.ndarray]:
+        '''Record a new position of the hand (smoothed with the previous point of the segment).
+        Return the previous point and the new one (x, y), the previous point being None if a new segment starts.
+        '''
+        previous = self.points[self.nb_points - 1] if self.nb_points else None
+        if self.is_interrupted or previous is None or timestamp - previous[2] > self.max_gap:
+            self.segments.append(self.nb_points)
+            self.is_interrupted = False
+            previous = None
+            point = np.array(position, dtype=np.float32)
+        else:
+            # Exponential smoothing : the jitter of the landmarks is removed from the stroke
+            point = previous[:2] + self.smoothing*(np.array(position, dtype=np.float32) - previous[:2])
+
+        if self.nb_points == len(self.points):
+            self.points = np.concatenate([self.points, np.zeros_like(self.points)])
+        self.points[self.nb_points] = point[0], point[1], timestamp
+        self.nb_points += 1
+        return (None if previous is None else previous[:2].copy()), point
+
+    def interrupt(self) -> None:
+        '''Start a new segment with the next position (the hand has left the interface)'''
+        self.is_interrupted = True
+
+    def clear(self) -> None:
+        '''Remove all the points'''
+        self.nb_points = 0
+        self.segments = []
+        self.is_interrupted = True
+
+    def is_empty(self) -> bool:
+        '''Return True if no point has been recorded'''
+        return self.nb_points == 0
+
+    def get_segments(self) -> list[np.ndarray]:
+        '''Return the points (x, y) of each segment'''
+        limits = self.segments + [self.nb_points]
+        return [self.points[limits[i]:limits[i + 1], :2] for i in range(len(self.segments))]
+
+    def rasterize(self, radius: float, size: int = constants.RECOGNITION_IMAGE_SIZE, supersampling: int = constants.RECOGNITION_SUPERSAMPLING) -> np.ndarray:
+        '''Draw the polyline into an image of size x size, as the digits of MNIST were prepared : the digit (with the width of its stroke)
+        fits in a box of 20/28 of the image keeping its aspect ratio, it is anti-aliased, and its center of mass is at the center of the image.
+        The polyline is drawn directly at a low resolution (supersampling times the size, then averaged), without a large intermediate image.
+
+        Parameters :
+            radius (float) : radius of the brush, in the coordinates of the points
+            size (int) : size of the image (28 for the model, 56 for a finer image)
+            supersampling (int) : factor of the resolution at which the polyline is drawn before being averaged
+
+        Returns :
+            image (np.ndarray) : image of the digit (uint8, white on black), empty if no point has been recorded
+        '''
+        image = np.zeros((size, size), dtype=np.uint8)
+        if self.nb_points == 0:
+            return image
+        points = self.points[:self.nb_points, :2]
+        x_min, y_min = points.min(axis=0)
+        x_max, y_max = points.max(axis=0)
+        extent = max(x_max - x_min, y_max - y_min)
+
+        # Width of the stroke in the image, limited to the widths of the digits of MNIST (a small digit would be a blob otherwise)
+        box = constants.RECOGNITION_DIGIT_SIZE*size/constants.RECOGNITION_IMAGE_SIZE
+        width = float(np.clip(2*radius*box/(extent + 2*radius), constants.RECOGNITION_STROKE_WIDTH[0]*size/constants.RECOGNITION_IMAGE_SIZE, constants.RECOGNITION_STROKE_WIDTH[1]*size/constants.RECOGNITION_IMAGE_SIZE))
+        scale = (box - width)/extent if extent > 0 else 0.0
+
+        # The points are drawn with a sub-pixel precision (shift of 4 bits), the box being centered in the canvas
+        canvas = np.zeros((size*supersampling, size*supersampling), dtype=np.uint8)
+        center = np.array([(x_min + x_max)/2, (y_min + y_max)/2], dtype=np.float32)
+        thickness = max(int(round(width*supersampling)), 1)
+        for segment in self.get_segments():
+            fixed = np.round(((segment - center)*scale + size/2)*supersampling*16).astype(np.int32)
+            if len(segment) == 1:
+                cv2.circle(canvas, tuple(fixed[0]), int(round(width*supersampling*8)), 255, -1, cv2.LINE_AA, 4)
+            else:
+                cv2.polylines(canvas, [fixed], False, 255, thickness, cv2.LINE_AA, 4)
+        cv2.resize(canvas, (size, size), dst=image, interpolation=cv2.INTER_AREA)
+
+        # The center of mass is moved to the center of the image
+        moments = cv2.moments(image)
+        if moments["m00"] > 0:
+            shift = np.float32([[1, 0, size/2 - moments["m10"]/moments["m00"]], [0, 1, size/2 - moments["m01"]/moments["m00"]]])
+            image = cv2.warpAffine(image, shift, (size, size), flags=cv2.INTER_LINEAR, borderValue=0)
+        return image
@@ -1,2 +1,2 @@
-from hand_detection import hand_detector, hand_properties, hand_display, main_hand_detection, constants
+from hand_detection import hand_detector, hand_tracker, hand_properties, gesture_engine, landmark_trace, hand_display, main_hand_detection, constants
 from hand_detection.constants import *
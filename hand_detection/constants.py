@@ -1,3 +1,5 @@
+import numpy as np
+
 #############################################
 #  GENERAL PARAMETERS OF THE HAND DETECTION #
 #############################################
@@ -7,6 +9,36 @@ NB_WEIGHS_BARYCENTER = 7
 NB_FINGERS_CLICK = 4
 HAND_NUMBER = 0
 
+# SEVERAL HANDS
+# Maximum number of hands detected and processed together
+MAX_HANDS = 2
+# Maximum move of the barycenter between two frames (normalized by the size of the image) to keep the same hand id
+HAND_ID_MAX_DISTANCE = 0.2
+
+# DETECTION RESOLUTION
+# MediaPipe runs on a downscaled copy of the frame : the landmarks are normalized, so they are mapped back to the full frame.
+# Set both values to None to run the detection on the full frame.
+DETECTION_WIDTH = 640
+DETECTION_HEIGHT = 360
+
+# TRACKING BETWEEN DETECTIONS
+# MediaPipe only runs every TRACKING_DETECTION_INTERVAL frames, the landmarks are followed with optical flow in between.
+TRACKING_ENABLED = True
+TRACKING_DETECTION_INTERVAL = 5
+# Ratio of landmarks that must be tracked, under which the hand is detected again
+TRACKING_MIN_CONFIDENCE = 0.8
+# Maximum error of the optical flow for a landmark to be considered as tracked
+TRACKING_MAX_ERROR = 20
+# Margin of the region of interest around the last hand, relative to the size of the hand
+TRACKING_ROI_MARGIN = 0.5
+# Parameters of the Lucas-Kanade optical flow
+TRACKING_WINDOW_SIZE = 15
+TRACKING_PYRAMID_LEVELS = 2
+
+# LANDMARK TRACES
+# Type used to store the landmarks in the traces ("float16" or "float32")
+TRACE_LANDMARKS_DTYPE = "float16"
+
 LANDMARKS = {
     "WRIST": 0,
     "THUMB_CMC": 1,
@@ -39,3 +71,36 @@ LIST_ARTICULATIONS = [
     "PINKY_MCP"
 ]
 
+NB_LANDMARKS = len(LANDMARKS)
+
+# GESTURES
+##########
+
+# Hysteresis on the number of fingers up : the hand is bent under the first value, open above the second one,
+# and keeps its previous state in between
+GESTURE_BENT_MAX_FINGERS_UP = 1
+GESTURE_OPEN_MIN_FINGERS_UP = 3
+# Time (in ms) a new state must last before being taken into account
+GESTURE_DEBOUNCE_MS = 30
+
+# Table of the gestures. A gesture is either :
+#   - a "transition" to a state ("open" or "bent"), triggered once if the previous state lasted at least min_previous_ms
+#   - a "state", triggered once (or at each frame if repeat is True) when the state has lasted at least min_duration_ms
+GESTURES = [
+    {"name": "click", "kind": "transition", "state": "bent", "min_previous_ms": 130},
+    {"name": "release", "kind": "transition", "state": "open", "min_previous_ms": 0},
+    {"name": "hold", "kind": "state", "state": "bent", "min_duration_ms": 600, "repeat": False},
+    {"name": "drag", "kind": "state", "state": "bent", "min_duration_ms": 600, "repeat": True},
+]
+
+# WEIGHTS OF THE BARYCENTER
+# Weight of 3 on the wrist, and of 1 on the MCP of the index, middle, ring and pinky, normalized by NB_WEIGHS_BARYCENTER.
+BARYCENTER_WEIGHTS = np.zeros(NB_LANDMARKS, dtype=np.float32)
+BARYCENTER_WEIGHTS[LANDMARKS["WRIST"]] = WEIGHTS_WRIST
+BARYCENTER_WEIGHTS[[LANDMARKS["INDEX_FINGER_MCP"], LANDMARKS["MIDDLE_FINGER_MCP"], LANDMARKS["RING_FINGER_MCP"], LANDMARKS["PINKY_MCP"]]] = 1
+BARYCENTER_WEIGHTS /= NB_WEIGHS_BARYCENTER
+
+# TIP AND PIP OF THE FINGERS (index, middle, ring, pinky)
+# The landmarks of a finger are 4 apart, so slices give views of the positions without any copy.
+FINGERS_TIP = slice(LANDMARKS["INDEX_FINGER_TIP"], LANDMARKS["PINKY_TIP"] + 1, 4)
+FINGERS_PIP = slice(LANDMARKS["INDEX_FINGER_PIP"], LANDMARKS["PINKY_PIP"] + 1, 4)
@@ -0,0 +1,145 @@
+import time
+
+import numpy as np
+
+from hand_detection import hand_properties as hp
+from hand_detection import constants
+
+
+class GestureEngine():
+    '''This class is used to recognize the gestures of each hand (click, hold, release, drag), from the state of its fingers.
+    The gestures are defined in milliseconds by the table GESTURES, so they do not depend on the frame rate.
+    Each hand is a small state machine (open or bent), with hysteresis on the number of fingers up and debouncing.
+    All the arrays are preallocated and indexed by the id of the hand : nothing is allocated at each frame.
+
+    Attributes:
+        gestures (list[dict]): table of the gestures recognized
+        gesture_index (dict[str, int]): index of each gesture in the table
+        debounce (float): time (in s) a new state must last before being taken into account
+        nb_fingers_up (np.ndarray): number of fingers up of each hand
+        is_bent (np.ndarray): True for the hands that are bent in the current frame (after hysteresis)
+        candidate (np.ndarray): state of each hand waiting for the debouncing (True if bent)
+        candidate_since (np.ndarray): time at which each candidate state started
+        state (np.ndarray): state of each hand (True if bent)
+        state_since (np.ndarray): time at which the state of each hand started (beginning of the gesture)
+        previous_duration (np.ndarray): duration of the previous state of each hand
+        changed (np.ndarray): True for the hands whose state has changed in the current frame
+        fired (np.ndarray): True for the gestures already triggered during the current state of each hand
+        events (np.ndarray): True for the gestures triggered in the current frame, of shape (max_hands, nb_gestures)
+        latencies (np.ndarray): last time (in ms) between the completion of each gesture by the hand and its event, of shape (max_hands, nb_gestures)
+        age (np.ndarray): buffer used for the durations
+        mask (np.ndarray): buffer used for the conditions
+
+    Methods:
+        update: update the state of each hand and the gestures triggered
+        reset: forget the state of the hands that are not present or that are new
+        detect_gesture: check if a gesture of the table is triggered for each hand
+        is_triggered: return True for each hand that has triggered a gesture in the current frame
+        get_latency: return the last latency (in ms) of a gesture
+    '''
+
+    def __init__(self, max_hands: int = constants.MAX_HANDS, gestures: list[dict] = constants.GESTURES, debounce_ms: float = constants.GESTURE_DEBOUNCE_MS) -> None:
+        self.gestures = gestures
+        self.gesture_index = {gesture["name"]: i for i, gesture in enumerate(gestures)}
+        self.debounce = debounce_ms / 1000
+        self.nb_fingers_up = np.zeros(max_hands, dtype=np.intp)
+        self.is_bent = np.zeros(max_hands, dtype=bool)
+        self.candidate = np.zeros(max_hands, dtype=bool)
+        self.candidate_since = np.zeros(max_hands, dtype=np.float64)
+        self.state = np.zeros(max_hands, dtype=bool)
+        self.state_since = np.zeros(max_hands, dtype=np.float64)
+        self.previous_duration = np.zeros(max_hands, dtype=np.float64)
+        self.changed = np.zeros(max_hands, dtype=bool)
+        self.fired = np.zeros((max_hands, len(gestures)), dtype=bool)
+        self.events = np.zeros((max_hands, len(gestures)), dtype=bool)
+        self.latencies = np.zeros((max_hands, len(gestures)), dtype=np.float64)
+        self.age = np.zeros(max_hands, dtype=np.float64)
+        self.mask = np.zeros(max_hands, dtype=bool)
+
+    def update(self, hands: hp.Hands, now: float = None) -> None:
+        '''Update the state of each hand from its fingers, and the gestures triggered in the current frame.
+
+        Parameters :
+            hands (Hands) : hands of the current frame
+            now (float) : time of the frame (time.perf_counter() if not given)
+        '''
+        if now is None:
+            now = time.perf_counter()
+        self.reset(hands, now)
+
+        # Hysteresis : between the two thresholds, the hand keeps its candidate state
+        np.sum(hands.fingers, axis=1, out=self.nb_fingers_up)
+        np.copyto(self.is_bent, self.candidate)
+        np.less_equal(self.nb_fingers_up, constants.GESTURE_BENT_MAX_FINGERS_UP, out=self.mask)
+        np.copyto(self.is_bent, True, where=self.mask)
+        np.greater_equal(self.nb_fingers_up, constants.GESTURE_OPEN_MIN_FINGERS_UP, out=self.mask)
+        np.copyto(self.is_bent, False, where=self.mask)
+
+        # A new candidate state starts now
+        np.not_equal(self.is_bent, self.candidate, out=self.mask)
+        np.copyto(self.candidate_since, now, where=self.mask)
+        np.copyto(self.candidate, self.is_bent)
+
+        # Debouncing : the state changes when the candidate has lasted long enough. The gesture starts with the candidate.
+        np.subtract(now, self.candidate_since, out=self.age)
+        np.greater_equal(self.age, self.debounce, out=self.mask)
+        np.not_equal(self.candidate, self.state, out=self.changed)
+        np.logical_and(self.changed, self.mask, out=self.changed)
+        np.logical_and(self.changed, hands.is_present, out=self.changed)
+        np.subtract(self.candidate_since, self.state_since, out=self.age)
+        np.copyto(self.previous_duration, self.age, where=self.changed)
+        np.copyto(self.state_since, self.candidate_since, where=self.changed)
+        np.copyto(self.state, self.candidate, where=self.changed)
+        np.copyto(self.fired, False, where=self.changed[:, None])
+
+        for i, gesture in enumerate(self.gestures):
+            self.detect_gesture(i, gesture, hands, now)
+
+    def reset(self, hands: hp.Hands, now: float) -> None:
+        '''Forget the state of the hands that are not present or that are new : they start open, from now.'''
+        np.logical_not(hands.is_present, out=self.mask)
+        np.logical_or(self.mask, hands.is_new, out=self.mask)
+        np.copyto(self.candidate, False, where=self.mask)
+        np.copyto(self.state, False, where=self.mask)
+        np.copyto(self.candidate_since, now, where=self.mask)
+        np.copyto(self.state_since, now, where=self.mask)
+        np.copyto(self.previous_duration, 0, where=self.mask)
+        np.copyto(self.fired, False, where=self.mask[:, None])
+
+    def detect_gesture(self, i: int, gesture: dict, hands: hp.Hands, now: float) -> None:
+        '''Check if the gesture number i of the table is triggered for each hand, and measure its latency.'''
+        events = self.events[:, i]
+        if gesture["state"] == "bent":
+            np.copyto(events, self.state)
+        else:
+            np.logical_not(self.state, out=events)
+        np.logical_and(events, hands.is_present, out=events)
+
+        # Time since the beginning of the gesture
+        np.subtract(now, self.state_since, out=self.age)
+        if gesture["kind"] == "transition":
+            # Triggered once, when the state starts, if the previous state lasted long enough
+            np.logical_and(events, self.changed, out=events)
+            np.greater_equal(self.previous_duration, gesture["min_previous_ms"] / 1000, out=self.mask)
+            np.logical_and(events, self.mask, out=events)
+        else:
+            # Triggered when the state has lasted long enough, once or at each frame
+            np.subtract(self.age, gesture["min_duration_ms"] / 1000, out=self.age)
+            np.greater_equal(self.age, 0, out=self.mask)
+            np.logical_and(events, self.mask, out=events)
+            if not gesture.get("repeat", False):
+                np.logical_not(self.fired[:, i], out=self.mask)
+                np.logical_and(events, self.mask, out=events)
+                np.logical_or(self.fired[:, i], events, out=self.fired[:, i])
+
+        # Latency between the moment the gesture is complete and the event
+        np.multiply(self.age, 1000, out=self.age)
+        np.copyto(self.latencies[:, i], self.age, where=events)
+
+    def is_triggered(self, name: str) -> np.ndarray:
+        '''Return True for each hand that has triggered the gesture in the current frame (indexed by the id of the hand).'''
+        return self.events[:, self.gesture_index[name]]
+
+    def get_latency(self, name: str, hand_id: int) -> float:
+        '''Return the last latency (in ms) between the completion of the gesture by the hand and its event.'''
+        return float(self.latencies[hand_id, self.gesture_index[name]])
@@ -1,45 +1,138 @@
+import time
+
 import mediapipe as mp
 import numpy as np
+import cv2
 
 from hand_detection import hand_properties as hp
+from hand_detection import hand_tracker as ht
+from hand_detection import gesture_engine as ge
+from hand_detection import landmark_trace as lt
+from hand_detection import constants
 
 class HandDetector():
     '''This class is used to detect hands in an image/video and perform actions.
     
     Attributes:
-        img (np.ndarray): image in which we detect hands
+        img (np.ndarray): image in which we detect hands, in BGR
+        detection_size (tuple[int]): size (width, height) of the image given to MediaPipe, None to use the full image
+        detection_img (np.ndarray): downscaled copy of the image, reused from one frame to another
+        rgb_img (np.ndarray): image given to MediaPipe, converted in RGB in a buffer reused from one frame to another
         mpHands (mediapipe.solutions.hands): object used to detect hands
         hands (mediapipe.solutions.hands.Hands): object used to detect hands
-        results (mediapipe.framework.formats.landmark.LandmarkList): results of the hand detection
-        list_actions (np.ndarray): list of the actions performed by the hand
+        results (mediapipe.framework.formats.landmark.LandmarkList): results of the last full hand detection
+        landmarks (np.ndarray): normalized landmarks of the hands in the image, of shape (nb_hands, 21, 2), detected or tracked
+        depths (np.ndarray): depth of the landmarks given by MediaPipe, of shape (nb_hands, 21), NaN when the landmarks are tracked
+        timestamp (float): time of the image (time of the record when a trace is replayed)
+        recorder (TraceRecorder): object used to record the landmarks of each image in a trace, None not to record
+        replay (TraceReplay): trace whose landmarks are used instead of MediaPipe, None to detect the hands
+        tracker (HandTracker): object used to follow the landmarks between two detections, None to detect on every frame
+        detected_hands (Hands): hands of the image, updated at each frame and processed together
+        gesture_engine (GestureEngine): object used to recognize the gestures (click, hold, release, drag) of each hand
 
     Methods:
         process_image: process an image in order to detect hands in it
-        fingers_bent: return True if at least three of the fingers are bent
-        click: return True if the hand is in a click position
+        find_landmarks: detect or track the landmarks of the hands in the image
+        replay_landmarks: take the landmarks of the next record of the trace
+        downscale_image: return the image given to MediaPipe, downscaled to the detection size
+        convert_to_RGB: convert the downscaled image in RGB, the only image MediaPipe needs in this color space
+        detect: run MediaPipe on an image and keep the normalized landmarks
+        click: return True for each hand that has clicked in the current frame
     '''
 
-    def __init__(self):
+    def __init__(self, detection_width: int = constants.DETECTION_WIDTH, detection_height: int = constants.DETECTION_HEIGHT, tracking: bool = constants.TRACKING_ENABLED, max_hands: int = constants.MAX_HANDS, recorder: lt.TraceRecorder = None, replay: lt.TraceReplay = None):
         self.img = None
+        self.detection_size = (detection_width, detection_height) if detection_width is not None and detection_height is not None else None
+        self.detection_img = None
+        self.rgb_img = None
         self.mpHands = mp.solutions.hands
-        self.hands = self.mpHands.Hands()
+        # MediaPipe is not needed when a trace is replayed
+        self.hands = self.mpHands.Hands(max_num_hands=max_hands) if replay is None else None
         self.results = None
-        self.list_actions = np.asarray([False, False, False, False, False])
+        self.landmarks = np.empty((0, constants.NB_LANDMARKS, 2), dtype=np.float32)
+        self.depths = np.empty((0, constants.NB_LANDMARKS), dtype=np.float32)
+        self.timestamp = 0.0
+        self.recorder = recorder
+        self.replay = replay
+        self.tracker = ht.HandTracker() if tracking and replay is None else None
+        self.detected_hands = hp.Hands(max_hands)
+        self.gesture_engine = ge.GestureEngine(max_hands)
 
     def process_image(self) -> None:
-        '''This function processes an image in order to detect hands in it.'''
-        self.results = self.hands.process(self.img)
-
-    def fingers_bent(self, hand:hp.Hand) -> None:
-        '''This function returns True if at least three of the fingers are bent.'''
-        self.list_actions = np.roll(self.list_actions, -1)
-        if hand.fingers.sum() >= 2:
-            self.list_actions[4] = False
-        else:
-            self.list_actions[4] = True
+        '''This function processes an image in order to detect hands in it.
+        The landmarks given by MediaPipe are normalized, so they stay valid for the full image.
+        In tracking mode, MediaPipe only runs when the tracker asks for it, the landmarks are tracked otherwise.
+        When a trace is replayed, the landmarks come from the trace and the image is not used.
+        '''
+        if self.replay is not None:
+            self.replay_landmarks()
+            return
+
+        self.timestamp = time.perf_counter()
+        self.find_landmarks()
+        if self.recorder is not None:
+            self.recorder.write(self.timestamp, self.landmarks, self.depths)
+
+    def find_landmarks(self) -> None:
+        '''This function detects or tracks the landmarks of the hands in the image.'''
+        img = self.downscale_image()
+        if self.tracker is None:
+            self.detect(self.convert_to_RGB(img))
+            return
+
+        self.tracker.convert_to_gray(img)
+        if not self.tracker.needs_detection():
+            landmarks = self.tracker.track()
+            if landmarks is not None:
+                self.landmarks = landmarks
+                # The optical flow gives no depth : the one of the last detection is not recorded as if it was measured
+                self.depths = np.full(landmarks.shape[:2], np.nan, dtype=np.float32)
+                return
 
-    def click(self) -> bool: 
-        if not self.list_actions[0] and not self.list_actions[1] and not self.list_actions[2] and not self.list_actions[3] and self.list_actions[4]:
-            return True
+        # No hand to track, tracking lost or detection interval reached : full detection
+        self.detect(self.convert_to_RGB(img))
+        self.tracker.initialize(self.landmarks)
+
+    def detect(self, img: np.ndarray) -> None:
+        '''This function runs MediaPipe on an image and keeps the normalized landmarks of each hand.'''
+        self.results = self.hands.process(img)
+        if self.results.multi_hand_landmarks:
+            landmarks = np.array([[(lm.x, lm.y, lm.z) for lm in hand_lm.landmark] for hand_lm in self.results.multi_hand_landmarks], dtype=np.float32)
+            self.landmarks = landmarks[:, :, :2]
+            self.depths = landmarks[:, :, 2]
         else:
-            return False
+            self.landmarks = np.empty((0, constants.NB_LANDMARKS, 2), dtype=np.float32)
+            self.depths = np.empty((0, constants.NB_LANDMARKS), dtype=np.float32)
+
+    def replay_landmarks(self) -> None:
+        '''This function takes the landmarks of the next record of the trace, instead of calling MediaPipe. No hand at the end of the trace.'''
+        record = self.replay.read()
+        if record is None:
+            self.landmarks = np.empty((0, constants.NB_LANDMARKS, 2), dtype=np.float32)
+            self.depths = np.empty((0, constants.NB_LANDMARKS), dtype=np.float32)
+            return
+        self.timestamp, self.landmarks, self.depths = record
+
+    def downscale_image(self) -> np.ndarray:
+        '''This function returns the image given to MediaPipe, downscaled to the detection size.'''
+        if self.detection_size is None or self.img.shape[1::-1] == self.detection_size:
+            return self.img
+        # We reuse the same buffer from one frame to another
+        shape = (self.detection_size[1], self.detection_size[0], self.img.shape[2])
+        if self.detection_img is None or self.detection_img.shape != shape:
+            self.detection_img = np.empty(shape, dtype=self.img.dtype)
+        cv2.resize(self.img, self.detection_size, dst=self.detection_img, interpolation=cv2.INTER_LINEAR)
+        return self.detection_img
+
+    def convert_to_RGB(self, img: np.ndarray) -> np.ndarray:
+        '''This function converts the downscaled image in RGB for MediaPipe, in a buffer reused from one frame to another.
+        The rest of the pipeline stays in BGR : only this small image is converted.
+        '''
+        if self.rgb_img is None or self.rgb_img.shape != img.shape:
+            self.rgb_img = np.empty_like(img)
+        cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=self.rgb_img)
+        return self.rgb_img
+
+    def click(self) -> np.ndarray:
+        '''This function returns True for each hand that has clicked in the current frame (indexed by the id of the hand).'''
+        return self.gesture_engine.is_triggered("click")
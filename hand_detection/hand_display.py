@@ -11,26 +11,30 @@ class Display():
         draw_landmarks: draw the landmarks given by the list of articulations. If no list is given, it draws all the landmarks
         draw_barycenter: draw the barycenter of the hand on the image
         draw_frame_rate: display the frame rate on the image
+        draw_capture_stats: display the number of dropped frames and the age of the frame on the image
+        draw_gui_stats: display the number of elements of the interface drawn again on the image
     '''
 
     def __init__(self) -> None:
         pass
 
-    def draw_landmark(self, img:np.ndarray, lmList:list, index: int) -> None:
+    def draw_landmark(self, img:np.ndarray, positions:np.ndarray, index: int) -> None:
         '''Draw a single landmark on an image.'''
-        cv2.circle(img, (lmList[index][1], lmList[index][2]), 3, (255, 0, 255), cv2.FILLED)
+        cv2.circle(img, (int(positions[index, 0]), int(positions[index, 1])), 3, (255, 0, 255), cv2.FILLED)
     
-    def draw_landmarks(self, img:np.ndarray, lmList: list, list_articulations: list[str] = "all") -> None:
-        '''Draw the landmarks given by the list of articulations. If no list is given, it draws all the landmarks.'''
-        if lmList:
+    def draw_landmarks(self, img:np.ndarray, positions: np.ndarray, list_articulations: list[str] = "all") -> None:
+        '''Draw the landmarks given by the list of articulations. If no list is given, it draws all the landmarks.
+        The positions are the array of shape (21, 2) of the hand, indexed by the id of the landmark.
+        '''
+        if positions is not None:
             if list_articulations == "all":
-                for articulation in constants.LANDMARKS.values():
-                    self.draw_landmark(img, lmList, articulation)
+                for x, y in positions.tolist():
+                    cv2.circle(img, (x, y), 3, (255, 0, 255), cv2.FILLED)
 
             else:
                 for articulation1 in list_articulations:
                     articulation = constants.LANDMARKS[articulation1]
-                    self.draw_landmark(img, lmList, articulation)
+                    self.draw_landmark(img, positions, articulation)
 
     def draw_barycenter(self, img:np.ndarray, barycenter: tuple) -> None:
         '''Draw the barycenter of the hand on the image.'''
@@ -38,4 +42,12 @@ class Display():
     
     def draw_frame_rate(self, img:np.ndarray, fps:int) -> None:
         '''Display the frame rate on the image.'''
-        cv2.putText(img, str(int(fps)), (10,40), cv2.FONT_HERSHEY_PLAIN, 2, (0,0,255), 2)
\ No newline at end of file
+        cv2.putText(img, str(int(fps)), (10,40), cv2.FONT_HERSHEY_PLAIN, 2, (0,0,255), 2)
+
+    def draw_capture_stats(self, img:np.ndarray, stats:dict) -> None:
+        '''Display the number of dropped frames and the age of the frame on the image.'''
+        cv2.putText(img, "dropped: {}  age: {} ms".format(stats["dropped"], int(stats["age_ms"])), (10,70), cv2.FONT_HERSHEY_PLAIN, 1.5, (0,0,255), 2)
+
+    def draw_gui_stats(self, img:np.ndarray, stats:dict) -> None:
+        '''Display the number of elements of the interface drawn again during the frame, and per frame on average, at the bottom of the image.'''
+        cv2.putText(img, "redrawn: {}  per frame: {:.1f}".format(stats["redrawn"], stats["redrawn_per_frame"]), (10, img.shape[0] - 20), cv2.FONT_HERSHEY_PLAIN, 1.5, (0,0,255), 2)
\ No newline at end of file
@@ -3,82 +3,111 @@ import numpy as np
 from hand_detection import constants
 
 
-class Hand():
-    '''This class is used to modelize a hand object, and all its properties.
+class Hands():
+    '''This class is used to modelize all the hands of an image, processed together in a single vectorized pass.
+    Each hand is kept in a slot of the arrays : the index of the slot is the id of the hand, stable from one frame to another.
 
     Attributes:
-        landmarks (list): list of the landmarks of the hand
-        lmList (list): list of the landmarks of the hand, with the real position
-        barycenter (tuple[int]): barycenter of the hand
-        fingers (np.ndarray): state of the fingers
+        max_hands (int): maximum number of hands
+        max_distance (float): maximum move of the barycenter between two frames (normalized) to keep the same id
+        landmarks (np.ndarray): normalized landmarks of the hands, of shape (max_hands, 21, 2)
+        normalized_barycenters (np.ndarray): normalized barycenters of the hands, used to match the hands between two frames
+        positions (np.ndarray): real position (in pixels) of each landmark, of shape (max_hands, 21, 2)
+        barycenters (np.ndarray): barycenter of each hand, of shape (max_hands, 2)
+        fingers (np.ndarray): state of the fingers of each hand, of shape (max_hands, 4)
+        is_present (np.ndarray): True for the ids of the hands present in the image
+        is_new (np.ndarray): True for the ids of the hands that have appeared in this image
+        is_lost (np.ndarray): True for the ids of the hands that have disappeared in this image
+        scale (np.ndarray): size (width, height) of the image, used to calculate the real positions
+        scaled_landmarks (np.ndarray): buffer used to calculate the real positions
 
     Methods:
-        find_position: calculate the real position of each landmark, and put it in the form of a list: [[id, x, y], ...]
-        calculate_barycenter: calculate the barycenter of the hand, based on 5 special landmarks
-        fingers_up: return the state of each finger thanks to a list of booleans
+        update: give the landmarks of the hands detected, and assign them to their id
+        assign_ids: return the id of each hand detected, by matching it with the closest hand of the previous frame
+        find_positions: calculate the real position of each landmark of each hand
+        calculate_barycenters: calculate the barycenter of each hand, based on 5 special landmarks
+        fingers_up: calculate the state of each finger of each hand
+        get_barycenter: return the barycenter of a hand as a tuple
     '''
 
-    def __init__(self, landmarks: list) -> None:
-        self.landmarks = landmarks
-        self.lmList = []
-        self.barycenter = None
-        self.fingers = np.ndarray(constants.NB_FINGERS_CLICK, dtype=bool)
-
-    def find_position(self, img:np.ndarray) -> None:
-        '''Calculate the real position of each landmark, and put it in the form of a list: [[id, x, y], ...]'''
-        h, w, _ = img.shape
-        for id, lm in enumerate(self.landmarks):
-            x_pixel, y_pixel = int(lm.x * w), int(lm.y * h)
-            self.lmList.append([id, x_pixel, y_pixel])
-    
-    def calculate_barycenter(self) -> tuple[int]:
-        '''Calculate the barycenter of the hand, based on 5 special landmarks: 
-            - wrist
-            - index finger MCP
-            - middle finger MCP
-            - ring finger MCP
-            - pinky MCP.
+    __slots__ = ("max_hands", "max_distance", "landmarks", "normalized_barycenters", "positions", "barycenters", "fingers", "is_present", "is_new", "is_lost", "scale", "scaled_landmarks")
+
+    def __init__(self, max_hands: int = constants.MAX_HANDS, max_distance: float = constants.HAND_ID_MAX_DISTANCE) -> None:
+        self.max_hands = max_hands
+        self.max_distance = max_distance
+        self.landmarks = np.zeros((max_hands, constants.NB_LANDMARKS, 2), dtype=np.float32)
+        self.normalized_barycenters = np.zeros((max_hands, 2), dtype=np.float32)
+        self.positions = np.zeros((max_hands, constants.NB_LANDMARKS, 2), dtype=np.int32)
+        self.barycenters = np.zeros((max_hands, 2), dtype=np.int32)
+        self.fingers = np.zeros((max_hands, constants.NB_FINGERS_CLICK), dtype=bool)
+        self.is_present = np.zeros(max_hands, dtype=bool)
+        self.is_new = np.zeros(max_hands, dtype=bool)
+        self.is_lost = np.zeros(max_hands, dtype=bool)
+        self.scale = np.zeros(2, dtype=np.float32)
+        self.scaled_landmarks = np.empty((max_hands, constants.NB_LANDMARKS, 2), dtype=np.float32)
+
+    def update(self, landmarks: np.ndarray) -> None:
+        '''Give the normalized landmarks of the hands detected, of shape (nb_hands, 21, 2), and put each hand in the slot of its id.'''
+        landmarks = landmarks[:self.max_hands]
+        barycenters = constants.BARYCENTER_WEIGHTS @ landmarks
+        ids, is_matched = self.assign_ids(barycenters)
+
+        # The hands of the previous frame that are not matched are lost, even when a new hand reuses their id
+        self.is_lost[:] = self.is_present
+        self.is_lost[ids[is_matched]] = False
+        self.is_present[:] = False
+        self.is_present[ids] = True
+        self.is_new[:] = False
+        self.is_new[ids[~is_matched]] = True
+        self.landmarks[ids] = landmarks
+        self.normalized_barycenters[ids] = barycenters
+
+    def assign_ids(self, barycenters: np.ndarray) -> tuple[np.ndarray]:
+        '''Return the id of each hand detected, by matching its barycenter with the closest hand of the previous frame.
+        The hands that are not matched take an id that was not used in the previous frame, or else the id of a hand lost in this frame.
+        Also return True for the hands matched with a hand of the previous frame.
         '''
-        if self.lmList:
-            x1 = self.lmList[constants.LANDMARKS["WRIST"]][1]
-            y1 = self.lmList[constants.LANDMARKS["WRIST"]][2]
-            x2 = self.lmList[constants.LANDMARKS["INDEX_FINGER_MCP"]][1]
-            y2 = self.lmList[constants.LANDMARKS["INDEX_FINGER_MCP"]][2]
-            x3 = self.lmList[constants.LANDMARKS["MIDDLE_FINGER_MCP"]][1]
-            y3 = self.lmList[constants.LANDMARKS["MIDDLE_FINGER_MCP"]][2]
-            x4 = self.lmList[constants.LANDMARKS["RING_FINGER_MCP"]][1]
-            y4 = self.lmList[constants.LANDMARKS["RING_FINGER_MCP"]][2]
-            x5 = self.lmList[constants.LANDMARKS["PINKY_MCP"]][1]
-            y5 = self.lmList[constants.LANDMARKS["PINKY_MCP"]][2]
-        # We put a weight of 3 on the wrist, and a weight of 1 on the other landmarks.
-        self.barycenter = (int((constants.WEIGHTS_WRIST*x1 + x2 + x3 + x4 + x5) / constants.NB_WEIGHS_BARYCENTER), int((constants.WEIGHTS_WRIST*y1 + y2 + y3 + y4 + y5) / constants.NB_WEIGHS_BARYCENTER))
-        return self.barycenter
-    
-    def fingers_up(self) -> None:
-        '''This function returns the state of each finger thanks to a list of booleans.
-        it is based on the y coordinates of the landmarks of two articulations of each finger:
-            - the TIP
-            - the PIP
-        If the y coordinate of the tip is lower than the y coordinate of the PIP, the finger is bent.
+        ids = np.full(len(barycenters), -1, dtype=np.intp)
+        is_matched = np.zeros(len(barycenters), dtype=bool)
+        if len(barycenters) == 0:
+            return ids, is_matched
+
+        # Greedy matching, the closest pairs first
+        distances = np.linalg.norm(barycenters[:, None, :] - self.normalized_barycenters[None, :, :], axis=2)
+        distances[:, ~self.is_present] = np.inf
+        for _ in range(min(len(barycenters), int(self.is_present.sum()))):
+            i, hand_id = np.unravel_index(np.argmin(distances), distances.shape)
+            if distances[i, hand_id] > self.max_distance:
+                break
+            ids[i] = hand_id
+            is_matched[i] = True
+            distances[i, :] = np.inf
+            distances[:, hand_id] = np.inf
+
+        # The new hands take the free ids first, then the ids of the hands of the previous frame that are not matched
+        free_ids = [hand_id for hand_id in np.argsort(self.is_present, kind="stable") if hand_id not in ids]
+        for i in np.flatnonzero(~is_matched):
+            ids[i] = free_ids.pop(0)
+        return ids, is_matched
+
+    def find_positions(self, img: np.ndarray) -> None:
+        '''Calculate the real position of each landmark of each hand, in the array positions of shape (max_hands, 21, 2).'''
+        self.scale[0] = img.shape[1]
+        self.scale[1] = img.shape[0]
+        np.multiply(self.landmarks, self.scale, out=self.scaled_landmarks)
+        # The conversion to int32 truncates the values, like int()
+        self.positions[:] = self.scaled_landmarks
+
+    def calculate_barycenters(self) -> None:
+        '''Calculate the barycenter of each hand, based on 5 special landmarks : the wrist and the MCP of the index, middle, ring and pinky fingers.
+        We put a weight of 3 on the wrist and a weight of 1 on the other landmarks : it is a single weighted sum of the positions of all the hands.
         '''
-        if self.lmList:
-            # Index
-            if self.lmList[constants.LANDMARKS["INDEX_FINGER_TIP"]][2] < self.lmList[constants.LANDMARKS["INDEX_FINGER_PIP"]][2]:
-                self.fingers[0] = 1
-            else:
-                self.fingers[0] = 0
-            # Middle
-            if self.lmList[constants.LANDMARKS["MIDDLE_FINGER_TIP"]][2] < self.lmList[constants.LANDMARKS["MIDDLE_FINGER_PIP"]][2]:
-                self.fingers[1] = 1
-            else:
-                self.fingers[1] = 0
-            # Ring
-            if self.lmList[constants.LANDMARKS["RING_FINGER_TIP"]][2] < self.lmList[constants.LANDMARKS["RING_FINGER_PIP"]][2]:
-                self.fingers[2] = 1
-            else:
-                self.fingers[2] = 0
-            # Pinky
-            if self.lmList[constants.LANDMARKS["PINKY_TIP"]][2] < self.lmList[constants.LANDMARKS["PINKY_PIP"]][2]:
-                self.fingers[3] = 1
-            else:    
-                self.fingers[3] = 0
\ No newline at end of file
+        self.barycenters[:] = constants.BARYCENTER_WEIGHTS @ self.positions
+
+    def fingers_up(self) -> None:
+        '''Calculate the state of each finger (index, middle, ring, pinky) of each hand, by comparing the y coordinates of the TIP and the PIP.'''
+        np.less(self.positions[:, constants.FINGERS_TIP, 1], self.positions[:, constants.FINGERS_PIP, 1], out=self.fingers)
+
+    def get_barycenter(self, hand_id: int) -> tuple[int]:
+        '''Return the barycenter of a hand as a tuple, as expected by the rest of the project.'''
+        return (int(self.barycenters[hand_id, 0]), int(self.barycenters[hand_id, 1]))
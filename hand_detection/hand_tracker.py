@@ -0,0 +1,110 @@
+import numpy as np
+import cv2
+
+from hand_detection import constants
+
+
+class HandTracker():
+    '''This class is used to follow the landmarks of the hands between two detections of MediaPipe.
+    The landmarks are propagated with a sparse optical flow (Lucas-Kanade), computed only in a region of interest around each hand.
+
+    Attributes:
+        detection_interval (int): a full detection is done every detection_interval frames
+        min_confidence (float): ratio of landmarks that must be tracked, under which the hand is detected again
+        max_error (float): maximum error of the optical flow for a landmark to be considered as tracked
+        roi_margin (float): margin of the region of interest around the hand, relative to the size of the hand
+        lk_params (dict): parameters of the Lucas-Kanade optical flow
+        gray (np.ndarray): grayscale version of the current image
+        previous_gray (np.ndarray): grayscale version of the previous image
+        landmarks (np.ndarray): normalized landmarks of the hands in the previous image, of shape (nb_hands, 21, 2)
+        nb_tracked_frames (int): number of frames tracked since the last detection
+        confidence (float): ratio of landmarks tracked in the last frame, for the worst hand
+
+    Methods:
+        convert_to_gray: convert the image given to the detector in grayscale, in a reused buffer
+        needs_detection: return True if a full detection must be done on the current image
+        initialize: keep the landmarks given by a full detection
+        track: propagate the landmarks to the current image, return None if the tracking is lost
+        track_hand: propagate the landmarks of a single hand in its region of interest
+        calculate_roi: calculate the region of interest around a hand
+    '''
+
+    def __init__(self, detection_interval: int = constants.TRACKING_DETECTION_INTERVAL, min_confidence: float = constants.TRACKING_MIN_CONFIDENCE, max_error: float = constants.TRACKING_MAX_ERROR, roi_margin: float = constants.TRACKING_ROI_MARGIN) -> None:
+        self.detection_interval = detection_interval
+        self.min_confidence = min_confidence
+        self.max_error = max_error
+        self.roi_margin = roi_margin
+        self.lk_params = dict(winSize=(constants.TRACKING_WINDOW_SIZE, constants.TRACKING_WINDOW_SIZE), maxLevel=constants.TRACKING_PYRAMID_LEVELS, criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+        self.gray = None
+        self.previous_gray = None
+        self.landmarks = np.empty((0, len(constants.LANDMARKS), 2), dtype=np.float32)
+        self.nb_tracked_frames = 0
+        self.confidence = 0.0
+
+    def convert_to_gray(self, img: np.ndarray) -> np.ndarray:
+        '''Convert the image given to the detector in grayscale. The two buffers are swapped, so that no new image is allocated.'''
+        self.previous_gray, self.gray = self.gray, self.previous_gray
+        if self.gray is None or self.gray.shape != img.shape[:2]:
+            self.gray = np.empty(img.shape[:2], dtype=np.uint8)
+        cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        return self.gray
+
+    def needs_detection(self) -> bool:
+        '''Return True if a full detection must be done on the current image : no hand to follow, tracking lost or too many frames tracked.'''
+        if self.previous_gray is None or self.previous_gray.shape != self.gray.shape or len(self.landmarks) == 0:
+            return True
+        if self.confidence < self.min_confidence:
+            return True
+        return self.nb_tracked_frames >= self.detection_interval - 1
+
+    def initialize(self, landmarks: np.ndarray) -> None:
+        '''Keep the landmarks given by a full detection on the current image.'''
+        self.landmarks = landmarks
+        self.nb_tracked_frames = 0
+        self.confidence = 1.0
+
+    def track(self) -> np.ndarray:
+        '''Propagate the landmarks from the previous image to the current one. Return None if the tracking is lost.'''
+        tracked_landmarks = np.empty_like(self.landmarks)
+        self.confidence = 1.0
+        for i in range(len(self.landmarks)):
+            confidence = self.track_hand(self.landmarks[i], tracked_landmarks[i])
+            self.confidence = min(self.confidence, confidence)
+            if self.confidence < self.min_confidence:
+                return None
+
+        self.landmarks = tracked_landmarks
+        self.nb_tracked_frames += 1
+        return self.landmarks
+
+    def track_hand(self, landmarks: np.ndarray, tracked_landmarks: np.ndarray) -> float:
+        '''Propagate the landmarks of a single hand in its region of interest. Return the ratio of landmarks tracked.'''
+        h, w = self.gray.shape
+        x_min, x_max, y_min, y_max = self.calculate_roi(landmarks, w, h)
+        if x_max - x_min < 2 or y_max - y_min < 2:
+            return 0.0
+
+        # The optical flow is computed on the region of interest only, in pixel coordinates of this region
+        points = (landmarks * (w, h) - (x_min, y_min)).astype(np.float32).reshape(-1, 1, 2)
+        new_points, status, error = cv2.calcOpticalFlowPyrLK(self.previous_gray[y_min:y_max, x_min:x_max], self.gray[y_min:y_max, x_min:x_max], points, None, **self.lk_params)
+        tracked = (status.ravel() == 1) & (error.ravel() < self.max_error)
+        confidence = tracked.mean()
+        if not tracked.any():
+            return 0.0
+
+        # The landmarks lost follow the median movement of the hand
+        new_points = new_points.reshape(-1, 2)
+        points = points.reshape(-1, 2)
+        new_points[~tracked] = points[~tracked] + np.median(new_points[tracked] - points[tracked], axis=0)
+        tracked_landmarks[:] = (new_points + (x_min, y_min)) / (w, h)
+        # The landmarks moved out of the image are kept on its border, so that their positions stay in the image
+        np.clip(tracked_landmarks, 0, 1, out=tracked_landmarks)
+        return confidence
+
+    def calculate_roi(self, landmarks: np.ndarray, w: int, h: int) -> tuple[int]:
+        '''Calculate the region of interest around a hand : its bounding box, enlarged by the margin, and limited to the image.'''
+        x_min, y_min = landmarks.min(axis=0) * (w, h)
+        x_max, y_max = landmarks.max(axis=0) * (w, h)
+        margin_x = self.roi_margin * (x_max - x_min) + self.lk_params["winSize"][0]
+        margin_y = self.roi_margin * (y_max - y_min) + self.lk_params["winSize"][1]
+        return max(int(x_min - margin_x), 0), min(int(x_max + margin_x) + 1, w), max(int(y_min - margin_y), 0), min(int(y_max + margin_y) + 1, h)
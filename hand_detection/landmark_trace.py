@@ -0,0 +1,137 @@
+import os
+import struct
+
+import numpy as np
+
+from hand_detection import constants
+
+# Header of a trace file : magic, version, maximum number of hands, number of landmarks, size of a coordinate (in bytes)
+TRACE_MAGIC = b"HLMTRACE"
+TRACE_VERSION = 1
+TRACE_HEADER = struct.Struct("<8sBBBB4x")
+
+
+def trace_dtype(max_hands: int, landmarks_dtype: str) -> np.dtype:
+    '''This function returns the type of a record of a trace : one record per frame, of fixed size, so that the file can be memory mapped.'''
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("nb_hands", "u1"),
+        ("landmarks", np.dtype(landmarks_dtype).newbyteorder("<"), (max_hands, constants.NB_LANDMARKS, 3)),
+    ])
+
+
+def read_header(path: str) -> tuple[int, str]:
+    '''This function reads the header of a trace, and returns the maximum number of hands and the type of the landmarks.'''
+    with open(path, "rb") as file:
+        magic, version, max_hands, nb_landmarks, itemsize = TRACE_HEADER.unpack(file.read(TRACE_HEADER.size))
+    if magic != TRACE_MAGIC or version != TRACE_VERSION or nb_landmarks != constants.NB_LANDMARKS:
+        raise ValueError("The file {} is not a landmark trace of version {}".format(path, TRACE_VERSION))
+    return max_hands, "float{}".format(8*itemsize)
+
+
+def open_records(path: str) -> np.ndarray:
+    '''This function memory maps the records of a trace (an empty trace cannot be memory mapped).'''
+    max_hands, landmarks_dtype = read_header(path)
+    dtype = trace_dtype(max_hands, landmarks_dtype)
+    # A record partially written (session interrupted) is ignored
+    nb_records = (os.path.getsize(path) - TRACE_HEADER.size) // dtype.itemsize
+    if nb_records <= 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=TRACE_HEADER.size, shape=(nb_records,))
+
+
+class TraceRecorder():
+    '''This class records the landmarks of each frame in a compact binary trace : a header, then one record of fixed size per frame
+    (timestamp, number of hands, and 21x3 landmarks per hand). Records are appended to an existing trace.
+
+    Attributes:
+        path (str): path of the trace
+        max_hands (int): maximum number of hands in a record
+        record (np.ndarray): record reused for each frame
+        file (file): trace opened in append mode
+        start_time (float): time corresponding to the timestamp 0 of the trace
+        last_timestamp (float): timestamp of the last record already in the trace
+
+    Methods:
+        write: append the landmarks of a frame to the trace
+        close: close the trace
+    '''
+
+    def __init__(self, path: str, max_hands: int = constants.MAX_HANDS, landmarks_dtype: str = constants.TRACE_LANDMARKS_DTYPE) -> None:
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # We append to the trace : same format, and the timestamps continue after the last record
+            max_hands, landmarks_dtype = read_header(path)
+            records = open_records(path)
+            nb_records = len(records)
+            last_timestamp = float(records[-1]["timestamp"]) if nb_records else 0.0
+            del records
+            self.file = open(path, "ab")
+            # A record partially written would shift all the next ones
+            self.file.truncate(TRACE_HEADER.size + nb_records*trace_dtype(max_hands, landmarks_dtype).itemsize)
+        else:
+            last_timestamp = 0.0
+            self.file = open(path, "wb")
+            self.file.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, max_hands, constants.NB_LANDMARKS, np.dtype(landmarks_dtype).itemsize))
+        self.max_hands = max_hands
+        self.record = np.zeros(1, dtype=trace_dtype(max_hands, landmarks_dtype))
+        self.start_time = None
+        self.last_timestamp = last_timestamp
+
+    def write(self, timestamp: float, landmarks: np.ndarray, depths: np.ndarray) -> None:
+        '''Append the landmarks of a frame to the trace.
+
+        Parameters :
+            timestamp (float) : time of the frame (time.perf_counter())
+            landmarks (np.ndarray) : normalized landmarks of the hands, of shape (nb_hands, 21, 2)
+            depths (np.ndarray) : depth of the landmarks of the hands, of shape (nb_hands, 21), NaN for the frames tracked
+        '''
+        if self.start_time is None:
+            self.start_time = timestamp - self.last_timestamp
+        nb_hands = min(len(landmarks), self.max_hands)
+        record = self.record[0]
+        record["timestamp"] = timestamp - self.start_time
+        record["nb_hands"] = nb_hands
+        record["landmarks"][:nb_hands, :, :2] = landmarks[:nb_hands]
+        record["landmarks"][:nb_hands, :, 2] = depths[:nb_hands]
+        record["landmarks"][nb_hands:] = 0
+        self.file.write(self.record.tobytes())
+
+    def close(self) -> None:
+        '''Close the trace'''
+        self.file.close()
+
+
+class TraceReplay():
+    '''This class reads a trace recorded by TraceRecorder, frame after frame. The trace is memory mapped.
+
+    Attributes:
+        path (str): path of the trace
+        records (np.memmap): records of the trace
+        index (int): index of the next record
+
+    Methods:
+        read: return the timestamp and the landmarks of the next frame
+        is_over: return True if all the records have been read
+    '''
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.records = open_records(path)
+        self.index = 0
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def read(self) -> tuple:
+        '''Return the timestamp, the normalized landmarks (nb_hands, 21, 2) and their depths (nb_hands, 21) of the next frame, None at the end.'''
+        if self.index >= len(self.records):
+            return None
+        record = self.records[self.index]
+        self.index += 1
+        landmarks = record["landmarks"][:record["nb_hands"]].astype(np.float32)
+        return float(record["timestamp"]), landmarks[:, :, :2], landmarks[:, :, 2]
+
+    def is_over(self) -> bool:
+        '''Return True if all the records have been read'''
+        return self.index >= len(self.records)
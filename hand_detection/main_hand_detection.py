@@ -2,12 +2,12 @@ import numpy as np
 
 from hand_detection import hand_detector as htm
 from hand_detection import hand_display as hdi
-from hand_detection import hand_properties as hp 
 from hand_detection import constants
+from utils import events
 
 
-def main_hand_detection(img : np.ndarray, detector : htm.HandDetector, display : hdi.Display) -> [np.ndarray, tuple[int], tuple[int]]:
-    '''This function is the main function of the hand detection.
+def main_hands_detection(img : np.ndarray, detector : htm.HandDetector, display : hdi.Display) -> [np.ndarray, dict[int, tuple[tuple[int]]]]:
+    '''This function detects all the hands of the image, and processes them together.
 
     Parameters :
         img (np.ndarray) : image in which we detect hands
@@ -16,8 +16,7 @@ def main_hand_detection(img : np.ndarray, detector : htm.HandDetector, display :
 
     Returns :
         img (np.ndarray) : image in which we detect hands
-        coordinates_click (tuple[int]) : coordinates of the click
-        coordinates_hand (tuple[int]) : coordinates of the hand
+        hands_coordinates (dict[int, tuple[tuple[int]]]) : for the id of each hand, the coordinates of the click (None if no click) and the coordinates of the hand
     '''
 
     # We set the image attribute of the detector object
@@ -26,41 +25,76 @@ def main_hand_detection(img : np.ndarray, detector : htm.HandDetector, display :
     # We process the image in order to detect hands in it
     detector.process_image()
 
-    # We initialize the coordinates of the click
-    coordinates_click = None
-    coordinates_hand = None
+    # We give the landmarks of all the hands detected (or tracked) to the Hands object, which keeps the same id for each hand
+    hands = detector.detected_hands
+    hands.update(detector.landmarks)
+
+    # We calculate the real position of each landmark of each hand, in an array of shape (max_hands, 21, 2)
+    hands.find_positions(detector.img)
+
+    # We calculate the barycenter of each hand
+    hands.calculate_barycenters()
 
-    # If there are hands detected, we get the one designed by HAND_NUMBER
-    if detector.results.multi_hand_landmarks:
-        hand_lm = detector.results.multi_hand_landmarks[constants.HAND_NUMBER]
+    # We calculate the state of each finger except thumb of each hand: [index, middle, ring, pinky]
+    hands.fingers_up()
 
-        # We create an Hand object
-        hand = hp.Hand(hand_lm.landmark)
+    # We update the gestures of each hand, and check which hands are clicking
+    detector.gesture_engine.update(hands, detector.timestamp)
+    clicks = detector.click()
+
+    for hand_id in np.flatnonzero(hands.is_lost):
+        events.EVENTS.emit("hand_lost", hand_id)
+
+    hands_coordinates = {}
+    for hand_id in np.flatnonzero(hands.is_present):
+        barycenter = hands.get_barycenter(hand_id)
+        if hands.is_new[hand_id]:
+            events.EVENTS.emit("hand_seen", hand_id, *barycenter)
+        if clicks[hand_id]:
+            events.EVENTS.emit("click", hand_id, *barycenter)
+
+        hands_coordinates[int(hand_id)] = (barycenter if clicks[hand_id] else None, barycenter)
+
+    return img, hands_coordinates
+
+
+def draw_hands(img : np.ndarray, detector : htm.HandDetector, display : hdi.Display) -> None:
+    '''This function draws the landmarks and the barycenter of each hand. It is called after the graphical user interface,
+    so that the hands are drawn above it.
+
+    Parameters :
+        img (np.ndarray) : image on which we draw the hands
+        detector (HandDetector) : object used to detect hands
+        display (Display) : object used to display the results
+    '''
+    hands = detector.detected_hands
+    for hand_id in np.flatnonzero(hands.is_present):
+        display.draw_landmarks(img, hands.positions[hand_id])
+        display.draw_barycenter(img, hands.get_barycenter(hand_id))
 
-        # We calculate the real position of each landmark, and put it in the form of a list: [[id, x, y], ...]
-        hand.find_position(detector.img)
 
-        # We calculate the barycenter of the hand
-        hand.calculate_barycenter()
+def main_hand_detection(img : np.ndarray, detector : htm.HandDetector, display : hdi.Display) -> [np.ndarray, tuple[int], tuple[int]]:
+    '''This function is the main function of the hand detection.
 
-        # We calculate the state of each finger except thumb, and put it in the form of a list: [index, middle, ring, pinky]
-        hand.fingers_up()
+    Parameters :
+        img (np.ndarray) : image in which we detect hands
+        detector (HandDetector) : object used to detect hands
+        display (Display) : object used to display the results
 
-        # We draw the landmarks that we want
-        display.draw_landmarks(detector.img, hand.lmList)
+    Returns :
+        img (np.ndarray) : image in which we detect hands
+        coordinates_click (tuple[int]) : coordinates of the click
+        coordinates_hand (tuple[int]) : coordinates of the hand
+    '''
+    img, hands_coordinates = main_hands_detection(img, detector, display)
 
-        # We draw the barycenter
-        display.draw_barycenter(detector.img, hand.barycenter)
+    # We initialize the coordinates of the click
+    coordinates_click = None
+    coordinates_hand = None
 
-        # We check if we are clicking
-        detector.fingers_bent(hand)
-        if detector.click():
-            print("clicking")
-            coordinates_click = hand.barycenter
-        else:
-            print("not clicking")
-        
-        # We keep the coordinates of the hand if there is one.
-        coordinates_hand = hand.barycenter
+    # If there are hands detected, we get the one designed by HAND_NUMBER, or the first one if it is not there
+    if hands_coordinates:
+        hand_id = constants.HAND_NUMBER if constants.HAND_NUMBER in hands_coordinates else min(hands_coordinates)
+        coordinates_click, coordinates_hand = hands_coordinates[hand_id]
 
     return img, coordinates_click, coordinates_hand
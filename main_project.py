@@ -1,70 +1,184 @@
-import cv2
+import argparse
+import sys
 import time
+
+import cv2
+import capture
+import output
 import hand_detection as hd
 import graphical_user_interface as gui
-import utils.utils as utils
+import utils.profiling as profiling
+import utils.events as events
+
+def main(source = None, fast : bool = False, record : str = None, replay : str = None, profile_output : str = None, profile_overlay : bool = False, log_file : str = None, log_level : str = "info",
+         headless : bool = False, output_path : str = None, max_frames : int = None, duration : float = None, resolution : tuple[int] = None) -> None:
+    '''This function is the main function of the project.
 
-def main():
-    '''This function is the main function of the project.'''
+    Parameters :
+        source (int or str) : number of the camera, video file, directory of images or .npy stack of frames (camera CAMERA_NUMBER if None)
+        fast (bool) : True to process the frames as fast as possible, without displaying them
+        record (str) : path of the trace in which the landmarks of each frame are recorded
+        replay (str) : path of a trace whose landmarks are used instead of detecting the hand
+        profile_output (str) : file (.csv or .json) in which the duration of each stage is regularly dumped
+        profile_overlay (bool) : True to display the duration of each stage on the image
+        log_file (str) : file in which the events are written (stderr if None)
+        log_level (str) : minimum level of the events written (debug, info or warning)
+        headless (bool) : True to send the composited frames to a sink instead of a window
+        output_path (str) : sink of the headless mode : video file, "-" or .raw file for the raw frames, http://HOST:PORT for the browsers, nothing if None
+        max_frames (int) : number of frames after which the game stops (no limit if None)
+        duration (float) : time (in seconds) after which the game stops (no limit if None)
+        resolution (tuple[int]) : width and height of the frames processed (WIDTH_CAMERA x HEIGHT_CAMERA if None), the interface is laid out for them
+    '''
+    width, height = (gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA) if resolution is None else resolution
 
-    # Initialize the webcam
-    #######################
-    time.sleep(1) 
-    cap = cv2.VideoCapture(gui.CAMERA_NUMBER)
-    cap.set(3, gui.WIDTH_CAMERA)
-    cap.set(4, gui.HEIGHT_CAMERA)
+    # Initialize the events, written by a background thread
+    ########################################################
+    events.EVENTS.configure(log_file, log_level)
+
+    # Initialize the landmark traces
+    ################################
+    recorder = hd.landmark_trace.TraceRecorder(record) if record is not None else None
+    trace = hd.landmark_trace.TraceReplay(replay) if replay is not None else None
+
+    # Initialize the source of frames
+    #################################
+    # A camera is read on a background thread, we only get the newest frame
+    # A trace replayed without its video is played on black frames
+    if source is None and trace is not None:
+        cap = capture.frame_sources.BlankSource(width, height, len(trace))
+    else:
+        cap = capture.frame_sources.open_source(gui.CAMERA_NUMBER if source is None else source, width, height)
+    cap.start()
+    # The frames are resized and flipped into preallocated buffers, and stay in BGR
+    preparation = capture.frame_preparation.FramePreparation(width, height)
+
+    # Initialize the output of the frames and the stop conditions
+    ##############################################################
+    # In headless mode, the frames are encoded on a background thread, and the game stops on a signal instead of 'q'
+    sink = output.sinks.open_sink(output_path).start() if headless else None
+    stop = output.stop_condition.StopCondition(max_frames, duration).start()
+    show_window = not fast and not headless
 
     # Initialize the objects
     ########################
-    detector = hd.hand_detector.HandDetector()
+    detector = hd.hand_detector.HandDetector(recorder=recorder, replay=trace)
     display = hd.hand_display.Display()
+    # The geometry of the interface is computed from the size of the frames
+    layout = gui.layout.Layout(width, height)
     if gui.MAIN_GRID_SIZE == 4:
-        grid = gui.interface_grid.Grid(gui.MAIN_GRID_COORDINATES, gui.LIST_DIGITS_INITIAL_4_1)
+        grid = gui.interface_grid.Grid(layout, gui.LIST_DIGITS_INITIAL_4_1)
     elif gui.MAIN_GRID_SIZE == 9:
-        grid = gui.interface_grid.Grid(gui.MAIN_GRID_COORDINATES, gui.LIST_DIGITS_INITIAL_9)
+        grid = gui.interface_grid.Grid(layout, gui.LIST_DIGITS_INITIAL_9)
 
-    # initialize the time to calculate the frame rate
-    #################################################
-    pTime = 0 
+    # Initialize the measure of each stage and of the frame rate
+    ############################################################
+    profiler = profiling.PROFILER
+    profiler.dump_path = profile_output
+    nb_frames = 0
+    start_time = time.perf_counter()
 
     while True:
 
         # Acquisition of the image
         ##########################
-        _, img = cap.read()
-        img = cv2.flip(img, 1)  # 1 for horizontal flip
-        img = cv2.resize(img, (gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA))
-        img = utils.convert_to_RGB(img)
+        with profiler.span("capture"):
+            success, img = cap.read()
+        if not success or (trace is not None and trace.is_over()):
+            break
+        with profiler.span("conversion"):
+            img = preparation.prepare(img)
 
         # main_detector of the hand
         ###########################
-        img, coordinates_click, hand_barycenter = hd.main_hand_detection.main_hand_detection(img, detector, display)
+        with profiler.span("detection"):
+            img, coordinates_click, hand_barycenter = hd.main_hand_detection.main_hand_detection(img, detector, display)
+
+        # Input events sent back by the output (clicks and moves in the browser), used instead of the hand for testing
+        if sink is not None:
+            for event_type, x, y in sink.get_input_events():
+                hand_barycenter = (x, y)
+                if event_type == "click":
+                    coordinates_click = hand_barycenter
 
         # main_interface
         ################
-        gui.main_interface.main_interface(img, grid, coordinates_click, hand_barycenter)
+        with profiler.span("gui"):
+            gui.main_interface.main_interface(img, grid, coordinates_click, hand_barycenter)
+
+        # The hands are drawn above the interface
+        hd.main_hand_detection.draw_hands(img, detector, display)
 
         # Display the image and the frame rate
         ######################################
-        detector.img = utils.convert_to_BGR(detector.img)
-        fps, pTime = utils.calculate_frame_rate(pTime)
-        display.draw_frame_rate(detector.img, fps)
-        cv2.imshow("Image", detector.img)
-
-        # Quit if 'q' is pressed
-        ########################
-        if cv2.waitKey(1) & 0xFF == ord('q'):
+        with profiler.span("display"):
+            display.draw_frame_rate(detector.img, profiler.get_fps())
+            display.draw_capture_stats(detector.img, cap.get_stats())
+            if profile_overlay:
+                profiler.draw_overlay(detector.img)
+                display.draw_gui_stats(detector.img, grid.get_render_stats())
+            nb_frames += 1
+
+            # In fast and headless modes, nothing is displayed and the loop is not paced by waitKey
+            if sink is not None:
+                sink.write(detector.img)
+            if show_window:
+                cv2.imshow("Image", detector.img)
+                key = cv2.waitKey(1) & 0xFF
+        profiler.end_frame()
+
+        # Quit if 'q' is pressed, or if a stop condition is reached
+        ###########################################################
+        if show_window and key == ord('q'):
+            break
+        if stop.is_over(nb_frames):
             break
 
-    # Release the camera and close the window
+    # Release the source and close the window
     #########################################
     cap.release()
-    cv2.destroyAllWindows()
-    
+    stop.release()
+    grid.release()
+    if sink is not None:
+        sink.release()
+    if show_window:
+        cv2.destroyAllWindows()
+    if recorder is not None:
+        recorder.close()
+    if profile_output is not None:
+        profiler.dump()
+    events.EVENTS.close()
+
+    # Throughput of the whole pipeline
+    ##################################
+    # It is written on stderr, the standard output can receive the raw frames
+    if not show_window:
+        elapsed = time.perf_counter() - start_time
+        print("{} frames in {:.2f} s : {:.1f} frames per second".format(nb_frames, elapsed, nb_frames / elapsed if elapsed > 0 else 0), file=sys.stderr)
+        print("frame preparation : {allocations} buffers allocated".format(**preparation.get_stats()), file=sys.stderr)
+        print("interface : {redrawn_per_frame:.2f} elements drawn again per frame".format(**grid.get_render_stats()), file=sys.stderr)
+        if sink is not None:
+            print("output : {written} frames written, {dropped} frames dropped".format(**sink.get_stats()), file=sys.stderr)
+
 
 
 # Launch the main function
 ##########################
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Virtual sudoku played with the hand.")
+    parser.add_argument("--source", default=None, help="number of the camera, video file, directory of images or .npy stack of frames")
+    parser.add_argument("--fast", action="store_true", help="process the frames as fast as possible, without displaying them")
+    parser.add_argument("--record", default=None, help="record the landmarks of each frame in this trace")
+    parser.add_argument("--replay", default=None, help="replay the landmarks of this trace instead of detecting the hand")
+    parser.add_argument("--profile-output", default=None, help="file (.csv or .json) in which the duration of each stage is regularly dumped")
+    parser.add_argument("--profile-overlay", action="store_true", help="display the duration of each stage on the image")
+    parser.add_argument("--log-file", default=None, help="file in which the events are written (stderr if not given)")
+    parser.add_argument("--log-level", default="info", choices=list(events.constants.EVENTS_LEVELS), help="minimum level of the events written")
+    parser.add_argument("--headless", action="store_true", help="send the composited frames to --output instead of a window")
+    parser.add_argument("--output", default=None, help="video file, '-' or .raw file for the raw BGR frames, http://HOST:PORT to stream to browsers, nothing written if not given")
+    parser.add_argument("--max-frames", type=int, default=None, help="stop after this number of frames")
+    parser.add_argument("--duration", type=float, default=None, help="stop after this time (in seconds)")
+    parser.add_argument("--resolution", type=gui.layout.parse_resolution, default=None, help="size of the frames processed, as WIDTHxHEIGHT (lower is faster), {}x{} if not given".format(gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA))
+    args = parser.parse_args()
+    main(args.source, args.fast, args.record, args.replay, args.profile_output, args.profile_overlay, args.log_file, args.log_level,
+         args.headless, args.output, args.max_frames, args.duration, args.resolution)
     
\ No newline at end of file
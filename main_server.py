@@ -0,0 +1,57 @@
+import argparse
+
+import graphical_user_interface as gui
+import server
+
+
+def print_metrics(metrics: dict[int, dict]) -> None:
+    '''This function prints the last metrics of each session.'''
+    print("{:>8} {:>8} {:>10} {:>8} {:>12} {:>12} {:>10} {:>9}".format("session", "pid", "frames", "fps", "p50 (ms)", "p95 (ms)", "dropped", "restarts"))
+    for session_id in sorted(metrics):
+        m = metrics[session_id]
+        print("{:>8} {:>8} {:>10} {:>8.1f} {:>12.1f} {:>12.1f} {:>10} {:>9}".format(session_id, m["pid"], m["frames"], m["fps"], m["frame_p50_ms"], m["frame_p95_ms"], m["capture_dropped"] + m["output_dropped"], m.get("restarts", 0)))
+
+
+def main(sources : list, outputs : list = None, max_frames : int = None, duration : float = None, cpus_per_session : int = server.SESSION_CPUS, use_model_server : bool = True, resolution : tuple[int] = None) -> None:
+    '''This function runs one headless session per source, each one in its own process.
+
+    Parameters :
+        sources (list) : source of each session (number of a camera, video file, directory of images or .npy stack)
+        outputs (list) : output of each session (video file, .raw file, "-" or "null"), nothing written if None
+        max_frames (int) : number of frames after which each session stops (no limit if None)
+        duration (float) : time (in seconds) after which each session stops (no limit if None)
+        cpus_per_session (int) : number of CPU cores given to each session (0 not to pin them)
+        use_model_server (bool) : True to share a single model server between the sessions
+        resolution (tuple[int]) : width and height of the frames of each session (WIDTH_CAMERA x HEIGHT_CAMERA if None)
+    '''
+    if outputs is not None and len(outputs) != len(sources):
+        raise ValueError("One output must be given per source : {} outputs for {} sources".format(len(outputs), len(sources)))
+
+    # Description of each session
+    #############################
+    configs = [{"source": source, "output": outputs[i] if outputs is not None else None, "max_frames": max_frames, "duration": duration, "resolution": resolution} for i, source in enumerate(sources)]
+
+    # Run the sessions until they are all over, or until Ctrl+C
+    ###########################################################
+    manager = server.session_manager.SessionManager(configs, cpus_per_session, use_model_server).start()
+    try:
+        manager.run(print_metrics)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.stop()
+
+
+# Launch the main function
+##########################
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Several virtual sudoku sessions, one per camera or recorded source, in a pool of processes.")
+    parser.add_argument("sources", nargs="+", help="source of each session : number of a camera, video file, directory of images or .npy stack")
+    parser.add_argument("--outputs", nargs="+", default=None, help="output of each session : video file, .raw file, '-' or 'null'")
+    parser.add_argument("--max-frames", type=int, default=None, help="stop each session after this number of frames")
+    parser.add_argument("--duration", type=float, default=None, help="stop each session after this time (in seconds)")
+    parser.add_argument("--cpus-per-session", type=int, default=server.SESSION_CPUS, help="number of CPU cores given to each session (0 not to pin them)")
+    parser.add_argument("--no-model-server", action="store_true", help="each session loads its own digit recognition model")
+    parser.add_argument("--resolution", type=gui.layout.parse_resolution, default=None, help="size of the frames of each session, as WIDTHxHEIGHT (lower is faster)")
+    args = parser.parse_args()
+    main(args.sources, args.outputs, args.max_frames, args.duration, args.cpus_per_session, not args.no_model_server, args.resolution)
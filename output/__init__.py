@@ -0,0 +1,2 @@
+from output import sinks, web_server, stop_condition, constants
+from output.constants import *
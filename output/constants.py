@@ -0,0 +1,45 @@
+######################################
+#  GENERAL PARAMETERS OF THE OUTPUT  #
+######################################
+
+# ENCODING
+##########
+
+# Number of frames waiting to be encoded, the next ones are dropped if the encoding is late
+OUTPUT_QUEUE_SIZE = 4
+# Codec of the video files written
+OUTPUT_FOURCC = "mp4v"
+# Frame rate of the video files written
+OUTPUT_FPS = 30
+
+# SINKS
+#######
+
+# Name of the sink that discards the frames (pure benchmarking)
+OUTPUT_NULL = "null"
+# Name of the sink that writes the raw frames on the standard output
+OUTPUT_STDOUT = "-"
+# Extension of the files in which the raw frames are written
+OUTPUT_RAW_EXTENSION = ".raw"
+
+# WEB FRONT-END
+###############
+
+# Prefix of the outputs served to the browsers of the network (http://HOST:PORT)
+OUTPUT_HTTP_PREFIX = "http://"
+# Quality of the JPEG images sent to a new client, and its limits when it is adapted to the speed of the client
+WEB_JPEG_QUALITY = 80
+WEB_MIN_JPEG_QUALITY = 30
+WEB_MAX_JPEG_QUALITY = 90
+WEB_JPEG_QUALITY_STEP = 10
+# Limits of the frame rate sent to each client
+WEB_MAX_FPS = 30
+WEB_MIN_FPS = 2
+# Maximum time (in seconds) waited for the server to listen
+WEB_START_TIMEOUT = 5.0
+# Maximum time (in seconds) to send a frame to a client before it is disconnected
+WEB_SEND_TIMEOUT = 5.0
+# Number of input events (click, move) sent by the browsers kept until the main loop reads them
+WEB_INPUT_QUEUE_SIZE = 64
+# Maximum size (in bytes) of the body of an input event sent by a browser
+WEB_MAX_INPUT_SIZE = 4096
@@ -0,0 +1,220 @@
+import abc
+import os
+import queue
+import stat
+import sys
+import threading
+
+import numpy as np
+import cv2
+
+from output import constants
+
+
+class FrameSink(abc.ABC):
+    '''This class is the common interface of the outputs of the composited frames, in headless mode.
+    The frames are copied into preallocated buffers and written by a background thread : the main loop never waits for the encoding.
+    When all the buffers are waiting to be written, the new frame is dropped.
+
+    Attributes :
+        queue_size (int) : number of frames that can wait to be written
+        buffers (list[np.ndarray]) : buffers in which the frames are copied, allocated with the first frame
+        free_buffers (queue.Queue) : indices of the buffers that can be used
+        pending (queue.Queue) : indices of the buffers waiting to be written (None to stop the thread)
+        nb_written (int) : number of frames written
+        nb_dropped (int) : number of frames dropped because the writing was late
+        thread (threading.Thread) : writing thread
+
+    Methods :
+        start : start the writing thread
+        write : give a frame to the sink, without waiting
+        update : loop of the writing thread
+        open : open the output, with the size of the first frame (implemented by each sink)
+        write_frame : write a frame (implemented by each sink)
+        close : close the output (implemented by each sink)
+        get_stats : return the statistics of the sink
+        get_input_events : return the input events sent back by the output (none for most sinks)
+        release : write the waiting frames, stop the thread and close the output
+    '''
+
+    def __init__(self, queue_size: int = constants.OUTPUT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.buffers = []
+        self.free_buffers = queue.Queue()
+        self.pending = queue.Queue()
+        self.nb_written = 0
+        self.nb_dropped = 0
+        self.thread = None
+
+    def start(self) -> 'FrameSink':
+        '''Start the writing thread'''
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.update, name=type(self).__name__, daemon=True)
+            self.thread.start()
+        return self
+
+    def write(self, frame: np.ndarray) -> bool:
+        '''Copy the frame in a free buffer and give it to the writing thread. Return False if the frame is dropped.'''
+        if not self.buffers:
+            # The buffers are allocated with the size of the first frame, and the output is opened with it
+            self.buffers = [np.empty_like(frame) for _ in range(self.queue_size)]
+            for index in range(self.queue_size):
+                self.free_buffers.put(index)
+            self.open(frame.shape[1], frame.shape[0])
+        try:
+            index = self.free_buffers.get_nowait()
+        except queue.Empty:
+            self.nb_dropped += 1
+            return False
+        np.copyto(self.buffers[index], frame)
+        self.pending.put(index)
+        return True
+
+    def update(self) -> None:
+        '''Loop of the writing thread : write the frames in the order they were given, until None is received'''
+        while True:
+            index = self.pending.get()
+            if index is None:
+                break
+            self.write_frame(self.buffers[index])
+            self.nb_written += 1
+            self.free_buffers.put(index)
+
+    def open(self, width: int, height: int) -> None:
+        '''Open the output, with the size of the first frame'''
+        pass
+
+    @abc.abstractmethod
+    def write_frame(self, frame: np.ndarray) -> None:
+        '''Write a frame'''
+
+    def close(self) -> None:
+        '''Close the output'''
+        pass
+
+    def get_stats(self) -> dict:
+        '''Return the statistics of the sink : frames written and frames dropped'''
+        return {"written": self.nb_written, "dropped": self.nb_dropped}
+
+    def get_input_events(self) -> list[tuple]:
+        '''Return the input events (type, x, y) sent back by the output since the last call'''
+        return []
+
+    def release(self) -> None:
+        '''Write the waiting frames, stop the writing thread and close the output'''
+        if self.thread is not None:
+            self.pending.put(None)
+            self.thread.join()
+            self.thread = None
+        if self.buffers:
+            self.close()
+
+
+class NullSink(FrameSink):
+    '''This class discards the frames, to measure the pipeline alone. No thread is started and nothing is copied.'''
+
+    def start(self) -> 'NullSink':
+        '''Nothing to start'''
+        return self
+
+    def write(self, frame: np.ndarray) -> bool:
+        '''Count the frame'''
+        self.write_frame(frame)
+        self.nb_written += 1
+        return True
+
+    def write_frame(self, frame: np.ndarray) -> None:
+        '''Discard the frame'''
+        pass
+
+
+class VideoWriterSink(FrameSink):
+    '''This class encodes the frames in a video file with cv2.VideoWriter.
+
+    Attributes :
+        path (str) : path of the video file
+        fps (float) : frame rate of the video
+        fourcc (str) : codec of the video
+        writer (cv2.VideoWriter) : object used to encode the video
+    '''
+
+    def __init__(self, path: str, fps: float = constants.OUTPUT_FPS, fourcc: str = constants.OUTPUT_FOURCC, queue_size: int = constants.OUTPUT_QUEUE_SIZE):
+        super().__init__(queue_size)
+        self.path = path
+        self.fps = fps
+        self.fourcc = fourcc
+        self.writer = None
+
+    def open(self, width: int, height: int) -> None:
+        '''Open the video file'''
+        self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+        if not self.writer.isOpened():
+            raise ValueError("The video {} cannot be written with the codec {}".format(self.path, self.fourcc))
+
+    def write_frame(self, frame: np.ndarray) -> None:
+        '''Encode a frame in the video'''
+        self.writer.write(frame)
+
+    def close(self) -> None:
+        '''Close the video file'''
+        self.writer.release()
+
+
+class PipeSink(FrameSink):
+    '''This class writes the raw BGR frames (height x width x 3 bytes each) in a pipe, a file or the standard output,
+    for example to be encoded by another program (ffmpeg -f rawvideo -pix_fmt bgr24 -s WIDTHxHEIGHT -i -).
+
+    Attributes :
+        path (str) : path of the pipe or of the file (standard output if OUTPUT_STDOUT)
+        file (file) : output opened in binary mode
+        is_broken (bool) : True if the reader of the pipe has stopped
+    '''
+
+    def __init__(self, path: str = constants.OUTPUT_STDOUT, queue_size: int = constants.OUTPUT_QUEUE_SIZE):
+        super().__init__(queue_size)
+        self.path = path
+        self.file = None
+        self.is_broken = False
+
+    def open(self, width: int, height: int) -> None:
+        '''Open the pipe'''
+        self.file = sys.stdout.buffer if self.path == constants.OUTPUT_STDOUT else open(self.path, "wb")
+
+    def write_frame(self, frame: np.ndarray) -> None:
+        '''Write the bytes of a frame'''
+        if self.is_broken:
+            return
+        try:
+            self.file.write(frame.data)
+        except BrokenPipeError:
+            # The reader has stopped : the next frames are discarded
+            self.is_broken = True
+
+    def close(self) -> None:
+        '''Close the pipe'''
+        if self.file is not sys.stdout.buffer:
+            self.file.close()
+        elif not self.is_broken:
+            self.file.flush()
+
+
+def open_sink(output: str = None, fps: float = constants.OUTPUT_FPS) -> FrameSink:
+    '''This function opens the sink described by output.
+
+    Parameters :
+        output (str) : None or OUTPUT_NULL to discard the frames, http://HOST:PORT to serve them to browsers, OUTPUT_STDOUT, a named pipe or a .raw file for the raw frames, a video file otherwise
+        fps (float) : frame rate of the video files
+
+    Returns :
+        sink (FrameSink) : sink of the frames, not started
+    '''
+    if output is None or output == constants.OUTPUT_NULL:
+        return NullSink()
+    if output.startswith(constants.OUTPUT_HTTP_PREFIX):
+        # Imported here : the web server depends on this module
+        from output import web_server
+        host, _, port = output[len(constants.OUTPUT_HTTP_PREFIX):].rstrip("/").rpartition(":")
+        return web_server.WebSink(host, int(port))
+    if output == constants.OUTPUT_STDOUT or output.lower().endswith(constants.OUTPUT_RAW_EXTENSION) or (os.path.exists(output) and stat.S_ISFIFO(os.stat(output).st_mode)):
+        return PipeSink(output)
+    return VideoWriterSink(output, fps)
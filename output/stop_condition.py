@@ -0,0 +1,56 @@
+import signal
+import time
+
+
+class StopCondition():
+    '''This class decides when the main loop stops, without a window to press 'q' : after a number of frames,
+    after a duration, or when the process receives SIGINT or SIGTERM.
+
+    Attributes :
+        max_frames (int) : number of frames after which the loop stops (None for no limit)
+        duration (float) : time (in seconds) after which the loop stops (None for no limit)
+        start_time (float) : time at which the loop started
+        signal_received (int) : number of the signal received (None if no signal was received)
+        previous_handlers (dict) : handlers of the signals before they were replaced
+
+    Methods :
+        start : start the duration and catch the signals
+        handle_signal : remember the signal received, the loop stops at the end of the current frame
+        is_over : return True if the loop must stop
+        release : give the signals back to their previous handlers
+    '''
+
+    def __init__(self, max_frames: int = None, duration: float = None):
+        self.max_frames = max_frames
+        self.duration = duration
+        self.start_time = None
+        self.signal_received = None
+        self.previous_handlers = {}
+
+    def start(self) -> 'StopCondition':
+        '''Start the duration and catch SIGINT and SIGTERM (only possible from the main thread)'''
+        self.start_time = time.perf_counter()
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.previous_handlers[signal_number] = signal.signal(signal_number, self.handle_signal)
+            except ValueError:
+                pass
+        return self
+
+    def handle_signal(self, signal_number: int, frame) -> None:
+        '''Remember the signal received : the loop stops cleanly at the end of the current frame'''
+        self.signal_received = signal_number
+
+    def is_over(self, nb_frames: int) -> bool:
+        '''Return True if the loop must stop, after nb_frames frames'''
+        if self.signal_received is not None:
+            return True
+        if self.max_frames is not None and nb_frames >= self.max_frames:
+            return True
+        return self.duration is not None and time.perf_counter() - self.start_time >= self.duration
+
+    def release(self) -> None:
+        '''Give the signals back to their previous handlers'''
+        for signal_number, handler in self.previous_handlers.items():
+            signal.signal(signal_number, handler)
+        self.previous_handlers = {}
@@ -0,0 +1,297 @@
+import asyncio
+import concurrent.futures
+import json
+import queue
+import threading
+import time
+
+import numpy as np
+import cv2
+
+from output import constants
+from output import sinks
+
+# Page served to the browsers : the MJPEG stream, and the clicks and moves of the mouse sent back as input events
+INDEX_PAGE = b"""<!DOCTYPE html>
+<html>
+<head><title>Virtual sudoku</title></head>
+<body style="margin:0;background:#000">
+<img id="stream" src="/stream" style="width:100%;cursor:crosshair">
+<script>
+const stream = document.getElementById("stream");
+let lastMove = 0;
+function send(type, event) {
+    const rect = stream.getBoundingClientRect();
+    const x = Math.round((event.clientX - rect.left) * stream.naturalWidth / rect.width);
+    const y = Math.round((event.clientY - rect.top) * stream.naturalHeight / rect.height);
+    fetch("/input", {method: "POST", headers: {"Content-Type": "application/json"}, body: JSON.stringify({type: type, x: x, y: y})});
+}
+stream.addEventListener("mousedown", (event) => send("click", event));
+stream.addEventListener("mousemove", (event) => {
+    if (event.timeStamp - lastMove > 50) { lastMove = event.timeStamp; send("move", event); }
+});
+</script>
+</body>
+</html>
+"""
+# Boundary between two images of the MJPEG stream
+BOUNDARY = b"frame"
+# Types of the input events accepted
+INPUT_TYPES = ("click", "move")
+
+
+class WebSink(sinks.FrameSink):
+    '''This class serves the composited frames to the browsers of the network, instead of a window : a page, an MJPEG stream,
+    and the input events (click, move) sent back by the browsers, for testing without a hand.
+    The server runs an asyncio loop on its own thread, and the JPEG images are encoded in an executor.
+    The main loop only copies the frame : each client takes the newest frame when it is ready ("latest wins"),
+    and its JPEG quality and frame rate are lowered when it is slow, so a slow client never slows the main loop down.
+
+    Attributes :
+        host (str) : address on which the server listens
+        port (int) : port on which the server listens
+        frame (np.ndarray) : newest frame, allocated with the first frame
+        frame_id (int) : number of the newest frame
+        encode_buffer (np.ndarray) : copy of the frame being encoded
+        encoded (dict[int, tuple]) : last JPEG image encoded for each quality (frame id, bytes), shared by the clients
+        lock (threading.Lock) : lock protecting the frame between the main loop and the executor
+        input_events (queue.Queue) : input events sent by the browsers, waiting for the main loop
+        nb_clients (int) : number of clients receiving the stream
+        clients (dict[asyncio.Task, asyncio.StreamWriter]) : connection of each client being answered, closed when the server stops
+        loop (asyncio.AbstractEventLoop) : loop of the server
+        new_frame (asyncio.Event) : event set when a new frame is given, replaced by a new event
+        stopped (asyncio.Event) : event set when the server stops
+        executor (concurrent.futures.ThreadPoolExecutor) : thread encoding the JPEG images
+        ready (threading.Event) : event set when the server is listening, or has failed to start
+        error (Exception) : error raised when the server started (port already in use, wrong host), None if it is listening
+
+    Methods :
+        start : start the thread of the server
+        write : give a frame to the clients, without waiting
+        write_frame : copy the frame for the clients
+        notify : wake the clients up (in the loop of the server)
+        stop_server : stop the server and wake the clients up (in the loop of the server)
+        serve : run the server until it is stopped
+        encode : encode the newest frame in JPEG (in the executor)
+        get_jpeg : return the newest frame in JPEG, encoded only once per quality
+        handle_client : answer a request of a browser
+        send_response : send a complete HTTP response
+        stream : send the MJPEG stream to a client, adapted to its speed
+        read_input : read an input event sent by a browser
+        get_input_events : return the input events received since the last call
+        release : stop the server
+    '''
+
+    def __init__(self, host: str, port: int):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.frame = None
+        self.frame_id = 0
+        self.encode_buffer = None
+        self.encoded = {}
+        self.lock = threading.Lock()
+        self.input_events = queue.Queue(constants.WEB_INPUT_QUEUE_SIZE)
+        self.nb_clients = 0
+        self.clients = {}
+        self.loop = None
+        self.new_frame = None
+        self.stopped = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="WebSinkEncoder")
+        self.ready = threading.Event()
+        self.error = None
+
+    def start(self) -> 'WebSink':
+        '''Start the thread of the server, and wait until it listens. The error of the server is raised again if it cannot start.'''
+        if self.thread is None:
+            self.thread = threading.Thread(target=lambda: asyncio.run(self.serve()), name="WebSink", daemon=True)
+            self.thread.start()
+            if not self.ready.wait(constants.WEB_START_TIMEOUT):
+                self.error = TimeoutError("The web server has not started on {}:{} after {} s".format(self.host, self.port, constants.WEB_START_TIMEOUT))
+            if self.error is not None:
+                self.thread = None
+                self.executor.shutdown(wait=False)
+                raise self.error
+        return self
+
+    def write(self, frame: np.ndarray) -> bool:
+        '''Copy the frame for the clients and wake them up. The main loop never waits for a client.'''
+        self.write_frame(frame)
+        self.nb_written += 1
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.notify)
+        return True
+
+    def write_frame(self, frame: np.ndarray) -> None:
+        '''Copy the frame for the clients, in the main loop : the clients encode the newest frame themselves, there is no writing thread'''
+        with self.lock:
+            if self.frame is None or self.frame.shape != frame.shape:
+                self.frame = np.empty_like(frame)
+                self.encode_buffer = np.empty_like(frame)
+            np.copyto(self.frame, frame)
+            self.frame_id += 1
+
+    def notify(self) -> None:
+        '''Wake up the clients waiting for a frame'''
+        self.new_frame.set()
+        self.new_frame = asyncio.Event()
+
+    def stop_server(self) -> None:
+        '''Stop the server and wake the clients up so that they end (in the loop of the server)'''
+        self.stopped.set()
+        self.notify()
+
+    async def serve(self) -> None:
+        '''Run the server until it is stopped. An error at the start is kept for start, in the main thread.'''
+        try:
+            self.loop = asyncio.get_running_loop()
+            self.new_frame = asyncio.Event()
+            self.stopped = asyncio.Event()
+            server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        except Exception as error:
+            self.error = error
+            return
+        finally:
+            # start never waits forever, even if the server has failed
+            self.ready.set()
+        async with server:
+            await self.stopped.wait()
+            # The connections of the clients are closed, and their tasks end before the loop (a client may wait for an image of the executor)
+            for writer in self.clients.values():
+                writer.transport.abort()
+            await asyncio.gather(*self.clients, return_exceptions=True)
+
+    def encode(self, quality: int) -> tuple[int, bytes]:
+        '''Encode the newest frame in JPEG, in the executor. The frame is copied under the lock, and encoded outside of it.'''
+        with self.lock:
+            # The buffer is replaced by write when the size of the frame changes : the one filled here is the one encoded
+            encode_buffer = self.encode_buffer
+            np.copyto(encode_buffer, self.frame)
+            frame_id = self.frame_id
+        _, jpeg = cv2.imencode(".jpg", encode_buffer, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        return frame_id, jpeg.tobytes()
+
+    async def get_jpeg(self, quality: int) -> tuple[int, bytes]:
+        '''Return the newest frame in JPEG : the clients with the same quality share the same image'''
+        encoded = self.encoded.get(quality)
+        if encoded is None or encoded[0] != self.frame_id:
+            encoded = self.encoded[quality] = await self.loop.run_in_executor(self.executor, self.encode, quality)
+        return encoded
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''Answer a request of a browser : the page, the stream, a snapshot or an input event'''
+        task = asyncio.current_task()
+        self.clients[task] = writer
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+            if method == "GET" and path == "/":
+                await self.send_response(writer, b"200 OK", b"text/html", INDEX_PAGE)
+            elif method == "GET" and path == "/stream":
+                await self.stream(writer)
+            elif method == "GET" and path == "/snapshot.jpg" and self.frame is not None:
+                _, jpeg = await self.get_jpeg(constants.WEB_JPEG_QUALITY)
+                await self.send_response(writer, b"200 OK", b"image/jpeg", jpeg)
+            elif method == "POST" and path == "/input":
+                length = int(headers.get("content-length", 0))
+                if length > constants.WEB_MAX_INPUT_SIZE:
+                    # An input event is a few bytes : a larger body is refused without being read
+                    await self.send_response(writer, b"413 Payload Too Large", b"text/plain", b"")
+                else:
+                    body = await reader.readexactly(length)
+                    status = b"204 No Content" if self.read_input(body) else b"400 Bad Request"
+                    await self.send_response(writer, status, b"text/plain", b"")
+            else:
+                await self.send_response(writer, b"404 Not Found", b"text/plain", b"Not found")
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, asyncio.CancelledError):
+            # A broken or disconnected client is simply forgotten, like a client still connected when the loop ends
+            pass
+        finally:
+            del self.clients[task]
+            writer.close()
+
+    async def send_response(self, writer: asyncio.StreamWriter, status: bytes, content_type: bytes, body: bytes) -> None:
+        '''Send a complete HTTP response'''
+        writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Type: " + content_type + b"\r\nContent-Length: " + str(len(body)).encode() + b"\r\nConnection: close\r\n\r\n" + body)
+        await asyncio.wait_for(writer.drain(), constants.WEB_SEND_TIMEOUT)
+
+    async def stream(self, writer: asyncio.StreamWriter) -> None:
+        '''Send the MJPEG stream to a client. The time spent to send each image adapts the quality and the frame rate to the client :
+        a slow client receives smaller images less often, and the frames it could not receive are skipped.
+        '''
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace; boundary=" + BOUNDARY + b"\r\nCache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        quality = constants.WEB_JPEG_QUALITY
+        interval = 1 / constants.WEB_MAX_FPS
+        last_frame_id = 0
+        self.nb_clients += 1
+        try:
+            while not self.stopped.is_set():
+                # We wait for a frame newer than the last one sent
+                if self.frame_id == last_frame_id:
+                    await self.new_frame.wait()
+                    continue
+                start = time.perf_counter()
+                frame_id, jpeg = await self.get_jpeg(quality)
+                if last_frame_id:
+                    self.nb_dropped += max(frame_id - last_frame_id - 1, 0)
+                last_frame_id = frame_id
+                writer.write(b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\nContent-Length: " + str(len(jpeg)).encode() + b"\r\n\r\n" + jpeg + b"\r\n")
+                await asyncio.wait_for(writer.drain(), constants.WEB_SEND_TIMEOUT)
+                duration = time.perf_counter() - start
+
+                # Slow client : lower quality and frame rate. Fast client : they go back up slowly.
+                if duration > interval:
+                    quality = max(quality - constants.WEB_JPEG_QUALITY_STEP, constants.WEB_MIN_JPEG_QUALITY)
+                    interval = min(interval * 1.5, 1 / constants.WEB_MIN_FPS)
+                elif duration < interval / 4:
+                    quality = min(quality + constants.WEB_JPEG_QUALITY_STEP // 2, constants.WEB_MAX_JPEG_QUALITY)
+                    interval = max(interval / 1.25, 1 / constants.WEB_MAX_FPS)
+                await asyncio.sleep(max(interval - duration, 0))
+        finally:
+            self.nb_clients -= 1
+
+    def read_input(self, body: bytes) -> bool:
+        '''Read an input event sent by a browser ({"type": "click" or "move", "x": ..., "y": ...}), return False if it is not valid.
+        The event is dropped if the main loop has not read the previous ones.
+        '''
+        try:
+            event = json.loads(body)
+            event = (event["type"], int(event["x"]), int(event["y"]))
+        except (ValueError, KeyError, TypeError):
+            return False
+        if event[0] not in INPUT_TYPES:
+            return False
+        try:
+            self.input_events.put_nowait(event)
+        except queue.Full:
+            pass
+        return True
+
+    def get_input_events(self) -> list[tuple]:
+        '''Return the input events (type, x, y) received since the last call'''
+        input_events = []
+        while True:
+            try:
+                input_events.append(self.input_events.get_nowait())
+            except queue.Empty:
+                return input_events
+
+    def get_stats(self) -> dict:
+        '''Return the statistics of the sink : frames given, frames skipped for the slow clients and number of clients'''
+        return {"written": self.nb_written, "dropped": self.nb_dropped, "clients": self.nb_clients}
+
+    def release(self) -> None:
+        '''Stop the server, then the encoding thread once the loop has ended (the clients may still wait for an image)'''
+        if self.thread is not None:
+            self.loop.call_soon_threadsafe(self.stop_server)
+            self.thread.join(constants.WEB_SEND_TIMEOUT)
+            self.thread = None
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,2 @@
+from server import model_server, session, session_manager, constants
+from server.constants import *
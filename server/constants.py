@@ -0,0 +1,27 @@
+######################################
+#  GENERAL PARAMETERS OF THE SERVER  #
+######################################
+
+# SESSIONS
+##########
+
+# Number of CPU cores given to each session (0 not to pin the sessions)
+SESSION_CPUS = 1
+# Time (in seconds) between two metrics sent by a session
+SESSION_METRICS_INTERVAL = 1.0
+# Time (in seconds) between two checks of the sessions by the manager
+SESSION_MONITOR_INTERVAL = 0.5
+# Time (in seconds) waited before restarting a crashed session, doubled at each new crash
+SESSION_RESTART_DELAY = 1.0
+# Number of restarts of a session after which it is abandoned
+SESSION_MAX_RESTARTS = 5
+# Time (in seconds) given to the sessions to stop cleanly before being terminated
+SESSION_STOP_TIMEOUT = 5.0
+
+# MODEL SERVER
+##############
+
+# Methods of digit recognition loaded and warmed up when the model server starts
+MODEL_SERVER_METHODS = ("main",)
+# Maximum time (in seconds) a session waits for a recognized digit
+MODEL_SERVER_TIMEOUT = 10.0
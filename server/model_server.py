@@ -0,0 +1,148 @@
+import itertools
+import os
+import queue
+
+import numpy as np
+
+from server import constants
+from utils import events
+
+
+def serve(requests, responses: list, methods: tuple[str]) -> None:
+    '''This function is the loop of the model server process : TensorFlow and the models are loaded once, then the digits
+    sent by all the sessions are recognized one after the other.
+
+    Parameters :
+        requests (multiprocessing.Queue) : requests of the sessions (session id, request id, image, method), None to stop
+        responses (list[multiprocessing.Queue]) : queue of the answers (request id, digit) of each session
+        methods (tuple[str]) : methods loaded and warmed up at the start
+    '''
+    from digit_recognition import main_digit_recognition as mdr
+    from digit_recognition import model_registry as mr
+
+    # The models are given by their index in MODEL_PATHS : the events only carry numbers
+    method_index = {method: i for i, method in enumerate(mr.constants.MODEL_PATHS)}
+
+    try:
+        # The models are loaded and warmed up once, before the first request
+        for method in methods:
+            try:
+                mr.MODELS.get_model(method)
+            except Exception:
+                # The model may not be trained yet : it is loaded again with the first request
+                events.EVENTS.emit("model_load_failed", value=method_index.get(method, -1))
+
+        while True:
+            request = requests.get()
+            if request is None:
+                break
+            session_id, request_id, img, method = request
+            try:
+                digit = int(mdr.main_digit_recognition(img, method))
+            except Exception:
+                # A wrong request must not stop the server of all the sessions
+                events.EVENTS.emit("recognition_request_failed", x=session_id, value=request_id[1])
+                digit = None
+            responses[session_id].put((request_id, digit))
+
+        stats = mr.MODELS.get_stats()
+        events.EVENTS.emit("model_server_stopped", x=stats["loads"], y=stats["hits"])
+        for method, load_ms in stats["load_ms"].items():
+            inference_ms = stats["inference_ms"].get(method, [0, 0])
+            events.EVENTS.emit("model_stats", x=int(round(load_ms)), y=int(round(1000*inference_ms[1])), value=method_index.get(method, -1))
+    finally:
+        # The process of the server does not run the atexit functions : the last events are written here
+        events.EVENTS.close()
+
+
+class ModelClient():
+    '''This class is given to a session to recognize its digits with the model server, instead of loading TensorFlow.
+    It is called like main_digit_recognition, and can be sent to the process of the session.
+
+    Attributes :
+        session_id (int) : id of the session
+        requests (multiprocessing.Queue) : requests sent to the model server
+        responses (multiprocessing.Queue) : answers of the model server to this session
+        method (str) : method of digit recognition
+        timeout (float) : maximum time (in seconds) waited for an answer
+        request_ids (itertools.count) : id of the next request
+    '''
+
+    def __init__(self, session_id: int, requests, responses, method: str = "main", timeout: float = constants.MODEL_SERVER_TIMEOUT):
+        self.session_id = session_id
+        self.requests = requests
+        self.responses = responses
+        self.method = method
+        self.timeout = timeout
+        self.request_ids = itertools.count()
+
+    def __getstate__(self) -> dict:
+        # The counter cannot be sent to another process, it starts again in the session
+        state = self.__dict__.copy()
+        state["request_ids"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.request_ids = itertools.count()
+
+    def __call__(self, img: np.ndarray) -> int:
+        '''Return the digit of the image recognized by the model server. TimeoutError is raised if it does not answer in time.'''
+        # The pid makes the ids of a restarted session different from the ids of the crashed one
+        request_id = (os.getpid(), next(self.request_ids))
+        self.requests.put((self.session_id, request_id, img, self.method))
+        try:
+            while True:
+                answer_id, digit = self.responses.get(timeout=self.timeout)
+                # An answer arriving after its timeout is ignored
+                if answer_id == request_id:
+                    return digit
+        except queue.Empty:
+            # The recognition fails like any other error : the cell of the digit is left active
+            events.EVENTS.emit("recognition_timeout", x=self.session_id, y=int(1000*self.timeout), value=request_id[1])
+            raise TimeoutError("The model server has not answered the request {} of the session {}".format(request_id, self.session_id)) from None
+
+
+class ModelServer():
+    '''This class runs the digit recognition in a single process shared by all the sessions : TensorFlow is loaded
+    and the models are warmed up once, instead of once per session.
+
+    Attributes :
+        context (multiprocessing.context.BaseContext) : context used to create the process and the queues
+        methods (tuple[str]) : methods loaded and warmed up at the start
+        requests (multiprocessing.Queue) : requests of all the sessions
+        responses (list[multiprocessing.Queue]) : answers to each session
+        process (multiprocessing.Process) : process of the model server
+
+    Methods :
+        start : start the process of the model server
+        create_client : return the client used by a session
+        stop : stop the process of the model server
+    '''
+
+    def __init__(self, context, nb_sessions: int, methods: tuple[str] = constants.MODEL_SERVER_METHODS):
+        self.context = context
+        self.methods = methods
+        self.requests = context.Queue()
+        self.responses = [context.Queue() for _ in range(nb_sessions)]
+        self.process = None
+
+    def start(self) -> 'ModelServer':
+        '''Start the process of the model server'''
+        self.process = self.context.Process(target=serve, args=(self.requests, self.responses, self.methods), name="ModelServer", daemon=True)
+        self.process.start()
+        return self
+
+    def create_client(self, session_id: int, method: str = "main") -> ModelClient:
+        '''Return the client used by a session to recognize its digits'''
+        return ModelClient(session_id, self.requests, self.responses[session_id], method)
+
+    def stop(self) -> None:
+        '''Stop the process of the model server'''
+        if self.process is None:
+            return
+        self.requests.put(None)
+        self.process.join(constants.SESSION_STOP_TIMEOUT)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process = None
@@ -0,0 +1,167 @@
+import os
+import time
+
+import cv2
+
+import capture
+import output
+import hand_detection as hd
+import graphical_user_interface as gui
+from utils import profiling
+from utils import events
+from server import constants
+
+
+class Session():
+    '''This class is one station of the server : its own frame source, detector, grid and digit interface, run headless in its own process.
+    The digits are recognized by the model server shared by all the sessions.
+
+    Attributes :
+        session_id (int) : id of the session
+        config (dict) : description of the session : source, output, max_frames, duration, log_file and resolution
+        recognizer (Callable) : function returning the digit of an image (client of the model server), main_digit_recognition if None
+        metrics_queue (multiprocessing.Queue) : queue in which the metrics are sent to the manager, None not to send them
+        stop_event (multiprocessing.Event) : event set by the manager to stop the session
+        cpus (list[int]) : CPU cores on which the session runs, None not to pin it
+        cap (ThreadedCamera or FrameSource) : source of the frames
+        preparation (FramePreparation) : object used to resize and flip the frames
+        detector (HandDetector) : object used to detect the hands
+        display (Display) : object used to display the hands
+        grid (Grid) : grid of the sudoku, with its digit interface
+        sink (FrameSink) : output of the composited frames
+        stop (StopCondition) : stop conditions of the session
+        profiler (Profiler) : measures of each stage of the session
+        nb_frames (int) : number of frames processed
+        last_metrics_time (float) : time at which the last metrics were sent
+
+    Methods :
+        pin_cpus : run the process of the session on its CPU cores only
+        initialize : create the source, the detector, the grid and the output of the session
+        process_frame : process the next frame of the source
+        run : process the frames until a stop condition, and send the metrics regularly
+        get_metrics : return the metrics of the session
+        send_metrics : send the metrics to the manager
+        release : release the source and the output
+    '''
+
+    def __init__(self, session_id: int, config: dict, recognizer=None, metrics_queue=None, stop_event=None, cpus: list[int] = None):
+        self.session_id = session_id
+        self.config = config
+        self.recognizer = recognizer
+        self.metrics_queue = metrics_queue
+        self.stop_event = stop_event
+        self.cpus = cpus
+        self.cap = None
+        self.preparation = None
+        self.detector = None
+        self.display = None
+        self.grid = None
+        self.sink = None
+        self.stop = None
+        self.profiler = profiling.PROFILER
+        self.nb_frames = 0
+        self.last_metrics_time = 0.0
+
+    def pin_cpus(self) -> None:
+        '''Run the process of the session on its CPU cores only, so the sessions do not compete for the same cores'''
+        if not self.cpus or not hasattr(os, "sched_setaffinity"):
+            return
+        os.sched_setaffinity(0, self.cpus)
+        # OpenCV would start a thread per core of the machine otherwise
+        cv2.setNumThreads(len(self.cpus))
+
+    def initialize(self) -> None:
+        '''Create the source, the detector, the grid and the output of the session'''
+        events.EVENTS.configure(self.config.get("log_file"))
+        width, height = self.config.get("resolution") or (gui.WIDTH_CAMERA, gui.HEIGHT_CAMERA)
+        self.cap = capture.frame_sources.open_source(self.config["source"], width, height).start()
+        self.preparation = capture.frame_preparation.FramePreparation(width, height)
+        self.detector = hd.hand_detector.HandDetector()
+        self.display = hd.hand_display.Display()
+        list_digits = gui.LIST_DIGITS_INITIAL_4_1 if gui.MAIN_GRID_SIZE == 4 else gui.LIST_DIGITS_INITIAL_9
+        self.grid = gui.interface_grid.Grid(gui.layout.Layout(width, height), list_digits, self.recognizer)
+        self.sink = output.sinks.open_sink(self.config.get("output")).start()
+        self.stop = output.stop_condition.StopCondition(self.config.get("max_frames"), self.config.get("duration")).start()
+
+    def process_frame(self) -> bool:
+        '''Process the next frame of the source, return False at the end of the source'''
+        with self.profiler.span("capture"):
+            success, img = self.cap.read()
+        if not success:
+            return False
+        with self.profiler.span("conversion"):
+            img = self.preparation.prepare(img)
+        with self.profiler.span("detection"):
+            img, coordinates_click, hand_barycenter = hd.main_hand_detection.main_hand_detection(img, self.detector, self.display)
+        # Input events sent back by the output (clicks and moves in the browser), used instead of the hand for testing
+        for event_type, x, y in self.sink.get_input_events():
+            hand_barycenter = (x, y)
+            if event_type == "click":
+                coordinates_click = hand_barycenter
+        with self.profiler.span("gui"):
+            gui.main_interface.main_interface(img, self.grid, coordinates_click, hand_barycenter)
+        hd.main_hand_detection.draw_hands(img, self.detector, self.display)
+        with self.profiler.span("display"):
+            self.display.draw_frame_rate(img, self.profiler.get_fps())
+            self.sink.write(img)
+        self.profiler.end_frame()
+        self.nb_frames += 1
+        return True
+
+    def run(self) -> None:
+        '''Process the frames until the end of the source, a stop condition or the stop of the manager, and send the metrics regularly'''
+        self.pin_cpus()
+        try:
+            # The resources opened before an error of the initialization are released too
+            self.initialize()
+            while not self.stop.is_over(self.nb_frames) and not (self.stop_event is not None and self.stop_event.is_set()):
+                if not self.process_frame():
+                    break
+                if time.perf_counter() - self.last_metrics_time >= constants.SESSION_METRICS_INTERVAL:
+                    self.send_metrics()
+        finally:
+            self.release()
+            self.send_metrics()
+
+    def get_metrics(self) -> dict:
+        '''Return the metrics of the session : frames processed, frame rate, percentiles of the duration of a frame and dropped frames (0 for what has not been created)'''
+        stats = self.profiler.stats.get("frame")
+        p50, p95 = stats.percentiles((50, 95)) if stats is not None else (0.0, 0.0)
+        return {
+            "session": self.session_id,
+            "pid": os.getpid(),
+            "frames": self.nb_frames,
+            "fps": self.profiler.get_fps(),
+            "frame_p50_ms": float(p50),
+            "frame_p95_ms": float(p95),
+            "capture_dropped": self.cap.get_stats()["dropped"] if self.cap is not None else 0,
+            "output_dropped": self.sink.get_stats()["dropped"] if self.sink is not None else 0,
+            "gui_redrawn_per_frame": self.grid.get_render_stats()["redrawn_per_frame"] if self.grid is not None else 0.0,
+        }
+
+    def send_metrics(self) -> None:
+        '''Send the metrics to the manager'''
+        self.last_metrics_time = time.perf_counter()
+        if self.metrics_queue is not None:
+            self.metrics_queue.put(self.get_metrics())
+
+    def release(self) -> None:
+        '''Release the source, the output, the recognition and the events, only those that have been created'''
+        for resource in (self.cap, self.sink, self.stop, self.grid):
+            if resource is not None:
+                resource.release()
+        events.EVENTS.close()
+
+
+def run_session(session_id: int, config: dict, recognizer=None, metrics_queue=None, stop_event=None, cpus: list[int] = None) -> None:
+    '''This function is the target of the process of a session.
+
+    Parameters :
+        session_id (int) : id of the session
+        config (dict) : description of the session : source, output, max_frames, duration, log_file and resolution
+        recognizer (Callable) : client of the model server, main_digit_recognition if None
+        metrics_queue (multiprocessing.Queue) : queue in which the metrics are sent to the manager
+        stop_event (multiprocessing.Event) : event set by the manager to stop the session
+        cpus (list[int]) : CPU cores on which the session runs, None not to pin it
+    '''
+    Session(session_id, config, recognizer, metrics_queue, stop_event, cpus).run()
@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+import queue
+import time
+
+from server import constants
+from server import model_server as ms
+from server import session as ss
+from utils import events
+
+
+def assign_cpus(nb_sessions: int, cpus_per_session: int = constants.SESSION_CPUS) -> list[list[int]]:
+    '''This function gives CPU cores to each session, in turn among the cores available to the process.
+
+    Parameters :
+        nb_sessions (int) : number of sessions
+        cpus_per_session (int) : number of cores of each session (0 not to pin the sessions)
+
+    Returns :
+        cpus (list[list[int]]) : cores of each session (None for each session if they are not pinned)
+    '''
+    if cpus_per_session <= 0 or not hasattr(os, "sched_getaffinity"):
+        return [None]*nb_sessions
+    available = sorted(os.sched_getaffinity(0))
+    return [[available[(i*cpus_per_session + j) % len(available)] for j in range(cpus_per_session)] for i in range(nb_sessions)]
+
+
+class SessionManager():
+    '''This class runs several independent sessions (one per camera or player), each one in its own process,
+    with a single model server for the digit recognition. A session that crashes is restarted after a delay.
+
+    Attributes :
+        configs (list[dict]) : description of each session : source, output, max_frames, duration, log_file and resolution
+        use_model_server (bool) : True to share a model server between the sessions, False for each session to load its model
+        context (multiprocessing.context.BaseContext) : context used to create the processes ("spawn", safe with the threads of MediaPipe and TensorFlow)
+        cpus (list[list[int]]) : CPU cores of each session
+        model_server (ModelServer) : process recognizing the digits of all the sessions
+        metrics_queue (multiprocessing.Queue) : metrics sent by the sessions
+        stop_event (multiprocessing.Event) : event set to stop all the sessions
+        processes (list[multiprocessing.Process]) : process of each session
+        restarts (list[int]) : number of restarts of each session
+        restart_times (list[float]) : time at which each crashed session will be restarted (None if it is not waiting)
+        metrics (dict[int, dict]) : last metrics of each session
+
+    Methods :
+        start : start the model server and all the sessions
+        start_session : start the process of a session
+        check_sessions : restart the sessions that have crashed
+        collect_metrics : read the metrics sent by the sessions
+        is_running : return True if a session is running or will be restarted
+        run : check the sessions until they are all over
+        stop : stop all the sessions and the model server
+    '''
+
+    def __init__(self, configs: list[dict], cpus_per_session: int = constants.SESSION_CPUS, use_model_server: bool = True):
+        self.configs = configs
+        self.use_model_server = use_model_server
+        self.context = multiprocessing.get_context("spawn")
+        self.cpus = assign_cpus(len(configs), cpus_per_session)
+        self.model_server = ms.ModelServer(self.context, len(configs)) if use_model_server else None
+        self.metrics_queue = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.processes = [None]*len(configs)
+        self.restarts = [0]*len(configs)
+        self.restart_times = [None]*len(configs)
+        self.metrics = {}
+
+    def start(self) -> 'SessionManager':
+        '''Start the model server and all the sessions'''
+        if self.model_server is not None:
+            self.model_server.start()
+        for session_id in range(len(self.configs)):
+            self.start_session(session_id)
+        return self
+
+    def start_session(self, session_id: int) -> None:
+        '''Start the process of a session'''
+        recognizer = self.model_server.create_client(session_id) if self.model_server is not None else None
+        args = (session_id, self.configs[session_id], recognizer, self.metrics_queue, self.stop_event, self.cpus[session_id])
+        self.processes[session_id] = self.context.Process(target=ss.run_session, args=args, name="Session-{}".format(session_id), daemon=True)
+        self.processes[session_id].start()
+        self.restart_times[session_id] = None
+
+    def check_sessions(self) -> None:
+        '''Restart the sessions that have crashed, after a delay doubled at each new crash. A session that ends normally is not restarted.'''
+        now = time.perf_counter()
+        for session_id, process in enumerate(self.processes):
+            if self.restart_times[session_id] is not None:
+                if now >= self.restart_times[session_id] and not self.stop_event.is_set():
+                    self.start_session(session_id)
+                continue
+            if process is None or process.is_alive() or process.exitcode == 0:
+                continue
+            if self.restarts[session_id] >= constants.SESSION_MAX_RESTARTS:
+                events.EVENTS.emit("session_abandoned", x=session_id, value=self.restarts[session_id])
+                self.processes[session_id] = None
+                continue
+            delay = constants.SESSION_RESTART_DELAY * 2**self.restarts[session_id]
+            events.EVENTS.emit("session_crashed", x=session_id, y=int(1000*delay), value=process.exitcode)
+            self.restart_times[session_id] = now + delay
+            self.restarts[session_id] += 1
+
+    def collect_metrics(self) -> dict[int, dict]:
+        '''Read the metrics sent by the sessions, and return the last metrics of each session'''
+        while True:
+            try:
+                metrics = self.metrics_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.metrics[metrics["session"]] = metrics
+        for session_id in self.metrics:
+            self.metrics[session_id]["restarts"] = self.restarts[session_id]
+        return self.metrics
+
+    def is_running(self) -> bool:
+        '''Return True if a session is running or will be restarted (a crash not checked yet counts as running)'''
+        return any((process is not None and (process.is_alive() or process.exitcode != 0)) or restart_time is not None for process, restart_time in zip(self.processes, self.restart_times))
+
+    def run(self, on_metrics=None, metrics_interval: float = constants.SESSION_METRICS_INTERVAL) -> None:
+        '''Check the sessions until they are all over, and give their metrics to on_metrics regularly.'''
+        last_metrics_time = time.perf_counter()
+        while self.is_running():
+            time.sleep(constants.SESSION_MONITOR_INTERVAL)
+            self.check_sessions()
+            if on_metrics is not None and time.perf_counter() - last_metrics_time >= metrics_interval:
+                on_metrics(self.collect_metrics())
+                last_metrics_time = time.perf_counter()
+        if on_metrics is not None:
+            on_metrics(self.collect_metrics())
+
+    def stop(self) -> None:
+        '''Stop all the sessions (cleanly if possible) and the model server'''
+        self.stop_event.set()
+        deadline = time.perf_counter() + constants.SESSION_STOP_TIMEOUT
+        for process in self.processes:
+            if process is None:
+                continue
+            process.join(max(deadline - time.perf_counter(), 0))
+            if process.is_alive():
+                process.terminate()
+        self.restart_times = [None]*len(self.configs)
+        if self.model_server is not None:
+            self.model_server.stop()
@@ -0,0 +1,47 @@
+#####################################
+#  GENERAL PARAMETERS OF THE UTILS  #
+#####################################
+
+# PROFILING
+###########
+
+# Number of measures kept for each stage (rolling window)
+PROFILING_WINDOW = 300
+# Number of frames between two updates of the percentiles displayed on the image
+PROFILING_OVERLAY_REFRESH = 15
+# Time (in seconds) between two dumps of the percentiles in a file
+PROFILING_DUMP_INTERVAL = 5.0
+# Percentiles computed for each stage
+PROFILING_PERCENTILES = (50, 95, 99)
+
+# EVENTS
+########
+
+# Levels of the events, only the events of a level greater or equal to the level chosen are written
+EVENTS_LEVELS = {"debug": 10, "info": 20, "warning": 30}
+EVENTS_LEVEL = "info"
+# Level of each type of event, and the message written for it
+EVENTS_TYPES = {
+    "hand_seen": ("info", "hand {hand} seen at ({x}, {y})"),
+    "hand_lost": ("info", "hand {hand} lost"),
+    "click": ("debug", "hand {hand} clicks at ({x}, {y})"),
+    "cell_selected": ("info", "cell ({x}, {y}) selected"),
+    "digit_recognized": ("info", "digit {value} recognized"),
+    "recognition_failed": ("warning", "digit recognition failed, cell ({x}, {y}) left active"),
+    "grid_validated": ("info", "grid validated, correct : {value}"),
+    "layout_changed": ("info", "layout computed for frames of {x}x{y}"),
+    "session_crashed": ("warning", "session {x} crashed (exit code {value}), restarted in {y} ms"),
+    "session_abandoned": ("warning", "session {x} abandoned after {value} restarts"),
+    "model_load_failed": ("warning", "model {value} of MODEL_PATHS cannot be loaded, it is loaded again with the first request"),
+    "recognition_request_failed": ("warning", "recognition request {value} of the session {x} failed in the model server"),
+    "recognition_timeout": ("warning", "no answer of the model server to the request {value} of the session {x} after {y} ms"),
+    "model_stats": ("info", "model {value} of MODEL_PATHS : loaded in {x} ms, inference p95 {y} us"),
+    "model_server_stopped": ("info", "model server stopped : {x} models loaded, {y} cache hits"),
+    "threads_not_configured": ("warning", "threads of TensorFlow not set ({x} intra-op, {y} inter-op asked), TensorFlow was already initialized"),
+}
+# Number of events kept in the buffer before being written, the next ones are dropped if the writer is late
+EVENTS_BUFFER_SIZE = 1024
+# Time (in seconds) between two writes of the events
+EVENTS_FLUSH_INTERVAL = 0.5
+# Maximum number of events of each type per second, the next ones are dropped
+EVENTS_RATE_LIMIT = 20
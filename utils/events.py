@@ -0,0 +1,179 @@
+import atexit
+import sys
+import threading
+import time
+
+import numpy as np
+
+from utils import constants
+
+# Type of an event in the buffer : only numbers, the message is built by the writer thread
+EVENT_DTYPE = np.dtype([
+    ("timestamp", "f8"),
+    ("type", "u1"),
+    ("hand", "i2"),
+    ("x", "i4"),
+    ("y", "i4"),
+    ("value", "i4"),
+])
+
+
+class EventLog():
+    '''This class records typed events (hand seen or lost, click, cell selected, digit recognized, grid validated) in a preallocated ring buffer.
+    A background thread writes them in batches to a file or to stderr, so the main loop never waits for the terminal.
+    The events below the level chosen are ignored, and each type of event is limited to a number of events per second.
+
+    Attributes:
+        path (str): file in which the events are written (stderr if None)
+        level (int): minimum level of the events written
+        flush_interval (float): time (in seconds) between two writes
+        rate_limit (int): maximum number of events of each type per second
+        names (list[str]): name of each type of event
+        type_index (dict[str, int]): index of each type of event
+        type_levels (np.ndarray): level of each type of event
+        messages (list[str]): message of each type of event
+        records (np.ndarray): ring buffer of the events
+        head (int): number of events put in the buffer since the start
+        tail (int): number of events written since the start
+        window_start (np.ndarray): start of the current second of each type of event, for the rate limit
+        window_count (np.ndarray): number of events of each type in the current second
+        nb_dropped (int): number of events dropped because the buffer was full
+        nb_limited (int): number of events dropped by the rate limit
+        nb_reported (int): number of dropped events already reported in the output
+        start_time (float): time corresponding to the timestamp 0 of the output
+        lock (threading.Lock): lock protecting the buffer
+        wake (threading.Event): event waking the writer thread up
+        thread (threading.Thread): writer thread, started with the first event
+        file (file): output of the events
+
+    Methods:
+        configure: choose the output and the level, before the first event
+        emit: put an event in the buffer
+        start: open the output and start the writer thread
+        run: loop of the writer thread
+        flush: write the events of the buffer
+        format: return the line written for an event
+        close: stop the writer thread after writing the last events
+    '''
+
+    def __init__(self, path: str = None, level: str = constants.EVENTS_LEVEL, buffer_size: int = constants.EVENTS_BUFFER_SIZE,
+                 flush_interval: float = constants.EVENTS_FLUSH_INTERVAL, rate_limit: int = constants.EVENTS_RATE_LIMIT) -> None:
+        self.path = path
+        self.level = constants.EVENTS_LEVELS[level]
+        self.flush_interval = flush_interval
+        self.rate_limit = rate_limit
+        self.names = list(constants.EVENTS_TYPES)
+        self.type_index = {name: i for i, name in enumerate(self.names)}
+        self.type_levels = np.array([constants.EVENTS_LEVELS[level] for level, _ in constants.EVENTS_TYPES.values()])
+        self.messages = [message for _, message in constants.EVENTS_TYPES.values()]
+        self.records = np.zeros(buffer_size, dtype=EVENT_DTYPE)
+        self.head = 0
+        self.tail = 0
+        self.window_start = np.zeros(len(self.names), dtype=np.float64)
+        self.window_count = np.zeros(len(self.names), dtype=np.int64)
+        self.nb_dropped = 0
+        self.nb_limited = 0
+        self.nb_reported = 0
+        self.start_time = time.perf_counter()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.thread = None
+        self.file = None
+
+    def configure(self, path: str = None, level: str = constants.EVENTS_LEVEL) -> None:
+        '''Choose the output (stderr if None) and the level of the events, before the first event'''
+        if self.thread is not None:
+            raise RuntimeError("The output of the events cannot be changed once they are written")
+        self.path = path
+        self.level = constants.EVENTS_LEVELS[level]
+
+    def emit(self, event_type: str, hand: int = -1, x: int = -1, y: int = -1, value: int = -1) -> bool:
+        '''Put an event in the buffer, without waiting for the output. Return False if the event is ignored or dropped.
+
+        Parameters :
+            event_type (str) : type of the event, key of EVENTS_TYPES
+            hand (int) : id of the hand
+            x (int) : first coordinate (of the hand or of the cell)
+            y (int) : second coordinate (of the hand or of the cell)
+            value (int) : value of the event (digit recognized, grid correct or not)
+        '''
+        index = self.type_index[event_type]
+        if self.type_levels[index] < self.level:
+            return False
+
+        # The events may come from several threads (the recognition, the web server) : the counters are updated under the lock
+        with self.lock:
+            # Rate limit : a given number of events of each type per second
+            now = time.perf_counter()
+            if now - self.window_start[index] >= 1:
+                self.window_start[index] = now
+                self.window_count[index] = 0
+            if self.window_count[index] >= self.rate_limit:
+                self.nb_limited += 1
+                return False
+            self.window_count[index] += 1
+
+            # The writer is late : the new event is dropped, the main loop does not wait
+            if self.head - self.tail >= len(self.records):
+                self.nb_dropped += 1
+                return False
+            self.records[self.head % len(self.records)] = (now - self.start_time, index, hand, x, y, value)
+            self.head += 1
+
+            # The writer thread is started once, by the first event
+            if self.thread is None:
+                self.start()
+        return True
+
+    def start(self) -> None:
+        '''Open the output and start the writer thread (called under the lock)'''
+        self.file = open(self.path, "a") if self.path is not None else sys.stderr
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        # A log closed then written again is still closed only once at exit
+        atexit.unregister(self.close)
+        atexit.register(self.close)
+
+    def run(self) -> None:
+        '''Loop of the writer thread : write the events every flush_interval seconds, until the log is closed'''
+        while not self.wake.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        '''Write the events of the buffer in a single write'''
+        # We copy the events under the lock, and build the lines outside of it
+        with self.lock:
+            indices = np.arange(self.tail, self.head) % len(self.records)
+            records = self.records[indices]
+            self.tail = self.head
+            nb_dropped = self.nb_dropped + self.nb_limited
+        lines = [self.format(record) for record in records]
+        if nb_dropped > self.nb_reported:
+            lines.append("[{:10.3f} s] WARNING {} events dropped".format(time.perf_counter() - self.start_time, nb_dropped - self.nb_reported))
+            self.nb_reported = nb_dropped
+        if lines:
+            self.file.write("\n".join(lines) + "\n")
+            self.file.flush()
+
+    def format(self, record: np.void) -> str:
+        '''Return the line written for an event'''
+        index = int(record["type"])
+        level = constants.EVENTS_TYPES[self.names[index]][0].upper()
+        message = self.messages[index].format(hand=record["hand"], x=record["x"], y=record["y"], value=record["value"])
+        return "[{:10.3f} s] {} {}".format(record["timestamp"], level, message)
+
+    def close(self) -> None:
+        '''Stop the writer thread after writing the last events'''
+        if self.thread is None:
+            return
+        self.wake.set()
+        self.thread.join()
+        self.thread = None
+        self.flush()
+        if self.file is not sys.stderr:
+            self.file.close()
+        self.wake.clear()
+
+
+# Event log shared by the whole process, so that any module can record its events
+EVENTS = EventLog()
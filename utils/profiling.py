@@ -0,0 +1,185 @@
+import csv
+import functools
+import json
+import os
+import time
+
+import numpy as np
+import cv2
+
+from utils import constants
+
+
+class RollingStats():
+    '''This class keeps the last measures of a stage in a fixed-size ring buffer.
+
+    Attributes:
+        values (np.ndarray): last measures (in seconds)
+        index (int): index of the next measure in the buffer
+        count (int): number of measures in the buffer
+
+    Methods:
+        add: add a measure
+        percentiles: return the percentiles of the measures (in ms)
+        mean: return the mean of the measures (in ms)
+    '''
+
+    __slots__ = ("values", "index", "count")
+
+    def __init__(self, size: int = constants.PROFILING_WINDOW) -> None:
+        self.values = np.zeros(size, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        '''Add a measure (in seconds), the oldest one is replaced when the buffer is full'''
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        if self.count < len(self.values):
+            self.count += 1
+
+    def percentiles(self, percentiles: tuple[int] = constants.PROFILING_PERCENTILES) -> np.ndarray:
+        '''Return the percentiles of the measures (in ms)'''
+        if self.count == 0:
+            return np.zeros(len(percentiles))
+        return 1000*np.percentile(self.values[:self.count], percentiles)
+
+    def mean(self) -> float:
+        '''Return the mean of the measures (in ms)'''
+        if self.count == 0:
+            return 0.0
+        return 1000*float(self.values[:self.count].mean())
+
+
+class Span():
+    '''This class is a context manager measuring the duration of a stage. A single span is created for each stage, and reused.
+
+    Attributes:
+        stats (RollingStats): measures of the stage
+        start (float): time at which the span was entered
+    '''
+
+    __slots__ = ("stats", "start")
+
+    def __init__(self, stats: RollingStats) -> None:
+        self.stats = stats
+        self.start = 0.0
+
+    def __enter__(self) -> 'Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        self.stats.add(time.perf_counter() - self.start)
+        return False
+
+
+class Profiler():
+    '''This class measures where the time of each frame goes : each stage of the loop is measured with a span (context manager)
+    or with a decorator, and the last measures of each stage are kept in a fixed-size buffer.
+
+    Attributes:
+        window (int): number of measures kept for each stage
+        stats (dict[str, RollingStats]): measures of each stage, in the order of their first measure
+        spans (dict[str, Span]): span of each stage
+        last_frame_time (float): time of the end of the previous frame
+        nb_frames (int): number of frames since the start
+        summary (list[tuple]): percentiles of each stage displayed on the image, updated every few frames
+        dump_path (str): file in which the percentiles are dumped (.csv to append a line per stage, JSON otherwise), None not to dump
+        dump_interval (float): time (in seconds) between two dumps
+        last_dump_time (float): time of the last dump
+
+    Methods:
+        span: return the span (context manager) of a stage
+        timed: decorator measuring a function as a stage
+        end_frame: measure the duration of the frame, and dump the percentiles if it is time
+        get_fps: return the frame rate, on the rolling window
+        get_summary: return the percentiles and the mean of each stage
+        draw_overlay: display the percentiles of each stage on the image
+        dump: write the percentiles of each stage in the dump file
+    '''
+
+    def __init__(self, window: int = constants.PROFILING_WINDOW, dump_path: str = None, dump_interval: float = constants.PROFILING_DUMP_INTERVAL) -> None:
+        self.window = window
+        self.stats = {}
+        self.spans = {}
+        self.last_frame_time = None
+        self.nb_frames = 0
+        self.summary = []
+        self.dump_path = dump_path
+        self.dump_interval = dump_interval
+        self.last_dump_time = time.perf_counter()
+
+    def span(self, stage: str) -> Span:
+        '''Return the span of a stage, to be used as "with profiler.span(stage):"'''
+        span = self.spans.get(stage)
+        if span is None:
+            self.stats[stage] = RollingStats(self.window)
+            span = self.spans[stage] = Span(self.stats[stage])
+        return span
+
+    def timed(self, stage: str):
+        '''Decorator measuring each call of a function as the stage given'''
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def end_frame(self) -> None:
+        '''Measure the duration of the frame (time since the end of the previous one), and dump the percentiles if it is time'''
+        now = time.perf_counter()
+        if self.last_frame_time is not None and now > self.last_frame_time:
+            if "frame" not in self.stats:
+                self.span("frame")
+            self.stats["frame"].add(now - self.last_frame_time)
+        self.last_frame_time = now
+        self.nb_frames += 1
+        if self.dump_path is not None and now - self.last_dump_time >= self.dump_interval:
+            self.dump()
+            self.last_dump_time = now
+
+    def get_fps(self) -> float:
+        '''Return the frame rate, on the rolling window (0 before the second frame)'''
+        stats = self.stats.get("frame")
+        if stats is None or stats.count == 0:
+            return 0.0
+        return 1000 / stats.mean()
+
+    def get_summary(self) -> list[tuple]:
+        '''Return, for each stage, its name, its percentiles (in ms), its mean (in ms) and its number of measures'''
+        return [(stage, stats.percentiles(), stats.mean(), stats.count) for stage, stats in self.stats.items()]
+
+    def draw_overlay(self, img: np.ndarray) -> None:
+        '''Display the percentiles of each stage on the image. They are only computed again every few frames.'''
+        if not self.summary or self.nb_frames % constants.PROFILING_OVERLAY_REFRESH == 0:
+            self.summary = self.get_summary()
+        header = "stage  " + " / ".join("p{}".format(percentile) for percentile in constants.PROFILING_PERCENTILES) + " (ms)"
+        cv2.putText(img, header, (10, 100), cv2.FONT_HERSHEY_PLAIN, 1.2, (0, 0, 255), 1)
+        for i, (stage, percentiles, _, _) in enumerate(self.summary):
+            text = "{}  {}".format(stage, " / ".join("{:.1f}".format(value) for value in percentiles))
+            cv2.putText(img, text, (10, 125 + 22*i), cv2.FONT_HERSHEY_PLAIN, 1.2, (0, 0, 255), 1)
+
+    def dump(self) -> None:
+        '''Write the percentiles of each stage in the dump file : a line per stage appended to a .csv file, or the last values in a JSON file'''
+        summary = self.get_summary()
+        timestamp = time.time()
+        percentile_names = ["p{}_ms".format(percentile) for percentile in constants.PROFILING_PERCENTILES]
+        if self.dump_path.endswith(".csv"):
+            is_new = not os.path.exists(self.dump_path)
+            with open(self.dump_path, "a", newline="") as file:
+                writer = csv.writer(file)
+                if is_new:
+                    writer.writerow(["timestamp", "stage", *percentile_names, "mean_ms", "count"])
+                for stage, percentiles, mean, count in summary:
+                    writer.writerow([timestamp, stage, *np.round(percentiles, 3), round(mean, 3), count])
+        else:
+            stages = {stage: {**dict(zip(percentile_names, percentiles.tolist())), "mean_ms": mean, "count": count} for stage, percentiles, mean, count in summary}
+            with open(self.dump_path, "w") as file:
+                json.dump({"timestamp": timestamp, "nb_frames": self.nb_frames, "stages": stages}, file, indent=2)
+
+
+# Profiler shared by the whole process, so that any module can measure its stages
+PROFILER = Profiler()